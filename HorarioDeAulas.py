@@ -6,19 +6,157 @@ Author:
 
 from openpyxl import load_workbook  # Importação biblioteca para leitura de arquivos .xlsx
 from openpyxl import Workbook  # Importação para escrita de arquivos .xlsx
-from collections import Counter  # Importação para comparação de valores em dicionários
+from openpyxl.utils import get_column_letter  # Conversão do número da coluna para a letra
+import heapq  # Filas de prioridade para a escolha do próximo vértice
+import numpy as np  # Vetores compactos para o núcleo do grafo
 from os import path  # Biblioteca para leitura de arquivos
+import os  # Criação e remoção de arquivos do cache
+import hashlib  # Hash do conteúdo das planilhas para o cache
+import zipfile  # Erro de leitura de arquivos do cache truncados
+import json  # Metadados do cache e formatos de entrada e saída em JSON-lines
+import csv  # Formatos de entrada e saída em CSV
+import random  # Desempate aleatório na escolha dos vértices
+from concurrent.futures import ProcessPoolExecutor  # Execução de vários inícios e componentes em paralelo
 import time  # Biblioteca para analisar o tempo de execução do algoritmo
+from contextlib import contextmanager, nullcontext  # Medição do tempo das etapas
 import argparse
+import glob  # Padrões de arquivos do modo em lote
+import sys  # Entrada e saída do modo serviço
+import threading  # Escrita das respostas do modo serviço
+import re  # Identificador de requisições inválidas do modo serviço
+import cProfile  # Perfil detalhado das funções, opção --cprofile
+
+DIRETORIO_CACHE = '.cache_horarios'  # Diretório padrão do cache de instâncias já lidas
+AULAS_EM_BLOCOS = 'blocos'  # Valor de prioridade_aula_sequencial do modo de blocos de duas aulas seguidas
+# Valor de prioridade_aula_sequencial de cada opção de --aulas-sequenciais.
+MODOS_AULAS_SEQUENCIAIS = {'S': True, 'N': False, 'B': AULAS_EM_BLOCOS}
+# Etapas medidas pelo Perfil agrupadas nas fases exibidas no resumo do modo em lote.
+FASES_PERFIL = {
+    'carga': ('hash_cache', 'carrega_cache', 'abre_planilha', 'inicializa_vertices', 'inicializa_horarios',
+              'define_restricoes_professores', 'define_restricoes_turmas', 'define_preferencias_professores',
+              'junta_escolas', 'define_arestas', 'atualiza_restricoes_preferencias_vertices', 'salva_cache'),
+    'coloracao': ('limites_inferiores', 'multiplos_inicios', 'dsatur_com_heristica', 'componentes_em_processos',
+                  'busca_tabu'),
+    'exportacao': ('monta_grades', 'exporta_turmas', 'exporta_professores', 'gerar_solucao'),
+}
+
+# Erros de leitura de um arquivo do cache truncado, corrompido ou de outro formato. O arquivo é descartado e a
+# planilha é lida normalmente.
+ERROS_CACHE = (OSError, EOFError, ValueError, KeyError, IndexError, TypeError, zipfile.BadZipFile)
+PLANILHAS = ('Dados', 'Configuracoes', 'Restricao', 'Restricoes Turma', 'Preferencias')  # Planilhas de uma instância
+
+
+def primeiro_bit(mascara, inicio=0):
+    """
+    Encontra o índice do primeiro bit ligado de uma máscara, percorrendo circularmente a partir de um índice.
+
+    Args:
+        mascara (int): Máscara de bits.
+        inicio (int): Índice a partir do qual a busca é iniciada. Caso não haja bits ligados a partir dele, a busca
+            continua do índice 0.
+
+    Returns:
+        (int|None): Índice do primeiro bit ligado ou None caso a máscara seja 0.
+    """
+    if mascara == 0:
+        return None
+
+    restante = mascara >> inicio
+    if restante:
+        return inicio + (restante & -restante).bit_length() - 1
+    return (mascara & -mascara).bit_length() - 1
+
+
+def quantidade_bits(mascara):
+    """
+    Conta a quantidade de bits ligados de uma máscara.
+
+    Args:
+        mascara (int): Máscara de bits.
+
+    Returns:
+        (int): Quantidade de bits ligados.
+    """
+    return bin(mascara).count('1')
+
+
+def mascaras_para_bytes(mascaras, quantidade_bits_mascara):
+    """
+    Converte uma lista de máscaras de bits em uma matriz de bytes, com uma linha por máscara.
+
+    Args:
+        mascaras (list of int): Máscaras de bits.
+        quantidade_bits_mascara (int): Quantidade de bits de cada máscara.
+
+    Returns:
+        (numpy.ndarray): Matriz de bytes (little-endian) com uma linha por máscara.
+    """
+    largura = (quantidade_bits_mascara + 7) // 8
+    dados = b''.join(mascara.to_bytes(largura, 'little') for mascara in mascaras)
+    return np.frombuffer(dados, dtype=np.uint8).reshape(len(mascaras), largura)
+
+
+def bytes_para_mascaras(matriz):
+    """
+    Converte uma matriz de bytes gerada por mascaras_para_bytes() de volta em uma lista de máscaras de bits.
+
+    Args:
+        matriz (numpy.ndarray): Matriz de bytes com uma linha por máscara.
+
+    Returns:
+        (list of int): Máscaras de bits.
+    """
+    largura = matriz.shape[1]
+    if largura == 0:
+        return [0] * len(matriz)
+
+    dados = matriz.tobytes()
+    return [int.from_bytes(dados[inicio:inicio + largura], 'little') for inicio in range(0, len(dados), largura)]
+
+
+def emparelhamento_maximo(mascaras):
+    """
+    Calcula o tamanho do emparelhamento máximo entre itens e horários, em que cada item pode ser emparelhado com um dos
+    horários de sua máscara e cada horário com um único item (algoritmo de Kuhn, com caminhos aumentantes).
+
+    Args:
+        mascaras (list of int): Máscara de bits dos horários permitidos de cada item.
+
+    Returns:
+        (int): Quantidade máxima de itens que recebem horários distintos.
+    """
+    # Se todo item possui ao menos tantos horários quanto a quantidade de itens, a escolha gulosa já emparelha todos.
+    if all(quantidade_bits(mascara) >= len(mascaras) for mascara in mascaras):
+        return len(mascaras)
+
+    item_do_horario = dict()
+
+    def aumenta(item, visitados):
+        livres = mascaras[item]
+        while livres:
+            bit = livres & -livres
+            livres ^= bit
+            if visitados[0] & bit:
+                continue
+            visitados[0] |= bit
+            horario = bit.bit_length() - 1
+            if horario not in item_do_horario or aumenta(item_do_horario[horario], visitados):
+                item_do_horario[horario] = item
+                return True
+        return False
+
+    return sum(1 for item in range(len(mascaras)) if aumenta(item, [0]))
 
 
 class Restricao(object):
     """
     Classe para instanciar objetos que contenham algum tipo de restrição, como professores e turmas.
 
+    Os conjuntos de horários são armazenados como máscaras de bits, onde o bit i representa o horário de índice i.
+
     Attributes:
         nome (str): Nome do objeto que possui restrição.
-        restricoes (list of Horario): Lista de horários restritos.
+        restricoes (int): Máscara de bits dos horários restritos.
     """
 
     def __init__(self, nome):
@@ -29,16 +167,16 @@ class Restricao(object):
             nome (str): Nome do objeto que possui restrição.
         """
         self.nome = nome
-        self.restricoes = []
+        self.restricoes = 0
 
     def add_restricao(self, horario):
         """
         Metodo para adicionar um horário como restrição.
 
         Args:
-            horario (Horario): Objeto do tipo Horario que será adicionado a lista de restrições.
+            horario (Horario): Objeto do tipo Horario que será adicionado às restrições.
         """
-        self.restricoes.append(horario)
+        self.restricoes |= horario.mascara
 
 
 class Professor(Restricao):
@@ -46,8 +184,8 @@ class Professor(Restricao):
     Classe para instanciar objetos do tipo Professor. Essa classe herda de Restricao. Além de restrições, um objeto do tipo professor também possui preferências.
 
     Attributes:
-        preferencias (list of Horario): Lista de horários preferidos.
-        qtd_preferencias_atendidas (int): Quantidade de preferências atendidas.
+        preferencias (list of Horario): Lista de horários preferidos, na ordem em que foram lidos.
+        mascara_preferencias (int): Máscara de bits dos horários preferidos.
     """
 
     def __init__(self, nome):
@@ -60,7 +198,7 @@ class Professor(Restricao):
 
         super().__init__(nome)
         self.preferencias = []
-        self.qtd_preferencias_atendidas = 0
+        self.mascara_preferencias = 0
 
     def add_preferencia(self, horario):
         """
@@ -70,6 +208,7 @@ class Professor(Restricao):
             horario (Horario): Objeto do tipo Horario que será adicionado a lista de preferências.
         """
         self.preferencias.append(horario)
+        self.mascara_preferencias |= horario.mascara
 
     def tem_preferencia(self, horario):
         """
@@ -81,40 +220,47 @@ class Professor(Restricao):
         Returns:
             bool: True se o horário for preferência e False caso contrário.
         """
-        return horario in self.preferencias
+        return bool(self.mascara_preferencias & horario.mascara)
 
-    def qtd_preferencias_nao_atendidas(self):
+    def qtd_preferencias_nao_atendidas(self, qtd_preferencias_atendidas):
         """
         Retorna a quantidade de preferências não atendidas.
 
+        Args:
+            qtd_preferencias_atendidas (int): Quantidade de preferências do professor atendidas em uma solução.
+
         Returns:
             (int|None): Quantidade de preferências não atendidas ou None caso o professor não possua preferências.
         """
-        return None if len(self.preferencias) == 0 else len(self.preferencias) - self.qtd_preferencias_atendidas
-
-    def preferencia_atendida(self):
-        """
-        Incrementa em um a quantidade de preferências atendidas do professor.
-        """
-        self.qtd_preferencias_atendidas += 1
+        return None if len(self.preferencias) == 0 else len(self.preferencias) - qtd_preferencias_atendidas
 
 
 class Vertice(object):
     """
     Classe para instanciar vértices do grafo. São as aulas da instituição.
 
+    Os atributos que variam durante a coloração não pertencem ao vértice, e sim a uma solução (Solucao). Eles são lidos
+    e escritos diretamente nos vetores da solução atual da instância (HorarioDeAulas.solucao), na posição do índice do
+    vértice.
+
+    Os conjuntos de horários são armazenados como máscaras de bits, onde o bit i representa o horário de índice i.
+
     Attributes:
         materia (string): Matéria (disciplina) da aula.
         turma (Restricao): Turma da aula.
         professor (Professor): Professor que leciona a matéria para a turma.
+        indice (int): Índice do vértice no núcleo do grafo.
+        horarios_de_aula (HorarioDeAulas): Instância à qual o vértice pertence.
+        aula (int): Índice da aula do vértice no núcleo do grafo. O estado da coloração é compartilhado pelas cópias
+            não coloridas de uma mesma aula.
         grau_saturacao (int): Grau de saturação do vértice. Quantos vizinhos coloridos ele possui.
-        restricoes (list of Horario): Lista de horários restritos.
-        restricoes_leves (list of Horario): Lista de horários com restrições leves. Restrições que podem ser ignoradas, caso necessário.
-        preferencias (list of Horario): Lista de horários preferidos.
-        horarios_sequencia (list of Horario): Lista de horários em que a mesma aula é lecionada.
+        restricoes (int): Máscara de bits dos horários restritos.
+        restricoes_leves (int): Máscara de bits dos horários com restrições leves. Restrições que podem ser ignoradas, caso necessário.
+        preferencias (int): Máscara de bits dos horários preferidos.
+        horarios_sequencia (int): Máscara de bits dos horários em que a mesma aula é lecionada.
    """
 
-    def __init__(self, materia, turma, professor):
+    def __init__(self, materia, turma, professor, indice):
         """
         Construtor da classe Vertice.
 
@@ -122,15 +268,57 @@ class Vertice(object):
             materia (string): Matéria (disciplina) da aula.
             turma (Restricao): Turma da aula.
             professor (Professor): Professor que leciona a matéria para a turma.
+            indice (int): Índice do vértice no núcleo do grafo.
        """
         self.materia = materia
         self.turma = turma
         self.professor = professor
-        self.grau_saturacao = 0
-        self.restricoes = []
-        self.restricoes_leves = []  # 3 aulas seguidas da mesma matéria
-        self.preferencias = []
-        self.horarios_sequencia = []
+        self.indice = indice
+        self.horarios_de_aula = None
+
+    @property
+    def aula(self):
+        return int(self.horarios_de_aula.grafo.aula[self.indice])
+
+    @property
+    def grau_saturacao(self):
+        return int(self.horarios_de_aula.solucao.grau_saturacao[self.aula])
+
+    @grau_saturacao.setter
+    def grau_saturacao(self, valor):
+        self.horarios_de_aula.solucao.grau_saturacao[self.aula] = valor
+
+    @property
+    def restricoes(self):
+        return self.horarios_de_aula.solucao.restricoes[self.aula]
+
+    @restricoes.setter
+    def restricoes(self, valor):
+        self.horarios_de_aula.solucao.restricoes[self.aula] = valor
+
+    @property
+    def restricoes_leves(self):
+        return self.horarios_de_aula.solucao.restricoes_leves[self.aula]
+
+    @restricoes_leves.setter
+    def restricoes_leves(self, valor):
+        self.horarios_de_aula.solucao.restricoes_leves[self.aula] = valor
+
+    @property
+    def preferencias(self):
+        return self.horarios_de_aula.solucao.preferencias[self.aula]
+
+    @preferencias.setter
+    def preferencias(self, valor):
+        self.horarios_de_aula.solucao.preferencias[self.aula] = valor
+
+    @property
+    def horarios_sequencia(self):
+        return self.horarios_de_aula.solucao.horarios_sequencia[self.aula]
+
+    @horarios_sequencia.setter
+    def horarios_sequencia(self, valor):
+        self.horarios_de_aula.solucao.horarios_sequencia[self.aula] = valor
 
     def tem_restricao(self, horario, leves=False):
         """
@@ -144,8 +332,8 @@ class Vertice(object):
             bool: True caso haja restrição, False para o oposto.
         """
         if leves:
-            return horario in (self.restricoes + self.restricoes_leves)
-        return horario in self.restricoes
+            return bool((self.restricoes | self.restricoes_leves) & horario.mascara)
+        return bool(self.restricoes & horario.mascara)
 
     def qtd_restricao(self, leves=False):
         """
@@ -158,8 +346,21 @@ class Vertice(object):
             int: Quantidade de restrições que o vértice possui.
         """
         if not leves:
-            return len(self.restricoes)
-        return len(self.restricoes) + len(self.restricoes_leves)
+            return quantidade_bits(self.restricoes)
+        return quantidade_bits(self.restricoes) + quantidade_bits(self.restricoes_leves)
+
+    def add_restricoes(self, mascara):
+        """
+        Adiciona um conjunto de horários às restrições do vértice.
+
+        Além disso, remove os horários de self.preferencias e self.horarios_sequencia.
+
+        Args:
+            mascara (int): Máscara de bits dos horários a serem adicionados como restrição.
+        """
+        self.restricoes |= mascara
+        self.preferencias &= ~mascara
+        self.horarios_sequencia &= ~mascara
 
     def add_restricao(self, horario):
         """
@@ -170,27 +371,14 @@ class Vertice(object):
         Args:
             horario (Horario): Horário a ser adicionado como restrição.
         """
-
-        if horario is not None and horario in self.preferencias:
-            self.preferencias.remove(horario)
-
-        if horario is not None and horario in self.horarios_sequencia:
-            self.horarios_sequencia.remove(horario)
-
-        if not self.tem_restricao(horario):
-            self.restricoes.append(horario)
+        if horario is not None:
+            self.add_restricoes(horario.mascara)
 
     def atualiza_restricoes(self):
         """
         Atualiza as restrições do vértice de acordo com as restrições do professor e da turma.
-
-        Lê cada restrição e a adciona a lista de restrições do próprio vértice.
         """
-        for horario in self.professor.restricoes:
-            self.add_restricao(horario)
-
-        for horario in self.turma.restricoes:
-            self.add_restricao(horario)
+        self.add_restricoes(self.professor.restricoes | self.turma.restricoes)
 
     def tem_restricao_leve(self, horario):
         """
@@ -202,7 +390,7 @@ class Vertice(object):
         Returns:
             bool: True se o horário for restrição leve e False caso contrário.
         """
-        return horario in self.restricoes_leves
+        return bool(self.restricoes_leves & horario.mascara)
 
     def add_restricao_leve(self, horario):
         """
@@ -213,15 +401,10 @@ class Vertice(object):
         Args:
             horario (Horario): Horário a ser adicionado como restrição leve.
         """
-
-        if horario is not None and horario in self.preferencias:
-            self.preferencias.remove(horario)
-
-        if horario is not None and horario in self.horarios_sequencia:
-            self.horarios_sequencia.remove(horario)
-
-        if horario is not None and not self.tem_restricao_leve(horario):
-            self.restricoes_leves.append(horario)
+        if horario is not None:
+            self.preferencias &= ~horario.mascara
+            self.horarios_sequencia &= ~horario.mascara
+            self.restricoes_leves |= horario.mascara
 
     def qtd_preferencia(self):
         """
@@ -230,7 +413,7 @@ class Vertice(object):
         Returns:
             int: Quantidade de preferências que o vértice possui.
         """
-        return len(self.preferencias)
+        return quantidade_bits(self.preferencias)
 
     def add_preferencia(self, horario):
         """
@@ -241,16 +424,15 @@ class Vertice(object):
         """
         if (horario is not None
                 and not self.tem_restricao(horario, True)):
-            self.preferencias.append(horario)
+            self.preferencias |= horario.mascara
 
     def atualiza_preferencias(self):
         """
         Atualiza as preferências do vértice de acordo com as preferências do professor.
 
-        Lê cada preferência e a adciona a lista de preferências do próprio vértice.
+        São mantidas apenas as preferências que não são restrições do vértice.
         """
-        for horario in self.professor.preferencias:
-            self.add_preferencia(horario)
+        self.preferencias |= self.professor.mascara_preferencias & ~(self.restricoes | self.restricoes_leves)
 
     def add_horario_sequencia(self, horario):
         """
@@ -259,8 +441,7 @@ class Vertice(object):
         Args:
             horario (Horario): Horário a ser adicionado como horário em sequencia.
         """
-        if horario not in self.horarios_sequencia:
-            self.horarios_sequencia.append(horario)
+        self.horarios_sequencia |= horario.mascara
 
     def tem_horario_sequencia(self):
         """
@@ -269,7 +450,7 @@ class Vertice(object):
         Returns:
             int: Quantidade de horários sugeridos para que a aula seja ministrada em horário sequencial a outras aulas iguais.
         """
-        return len(self.horarios_sequencia)
+        return quantidade_bits(self.horarios_sequencia)
 
     def eh_horario_sequencia(self, horario):
         """
@@ -281,7 +462,7 @@ class Vertice(object):
         Returns:
              bool: True se horario é um horário sugerido, False caso contrário.
         """
-        return horario in self.horarios_sequencia
+        return bool(self.horarios_sequencia & horario.mascara)
 
     def eh_igual(self, outro_vertice):
         """
@@ -328,14 +509,36 @@ class Vertice(object):
         """
         self.grau_saturacao += 1
 
-    def horarios_preferidos(self):
+    def horarios_preferidos(self, lista_de_horarios, preferencias=None, horarios_sequencia=None):
         '''
         Retorna lista de horários preferidos.
 
+        Args:
+            lista_de_horarios (list of Horario): Lista de horários indexada pelo índice de cada horário.
+            preferencias (int|None): Máscara de bits dos horários preferidos do vértice em uma solução. None para
+                utilizar a solução atual.
+            horarios_sequencia (int|None): Máscara de bits dos horários em sequência do vértice em uma solução. None
+                para utilizar a solução atual.
+
         Return:
-            list of Horario: Lista de horários por ordem de frequência na lista de preferências concatenada com a lista de horários em sequência.
+            list of Horario: Lista de horários que são preferências e sugestões de horário em sequência, seguida dos
+            que são apenas preferências e dos que são apenas sugestões de horário em sequência.
         '''
-        return [horario[0] for horario in Counter(self.preferencias + self.horarios_sequencia).most_common()]
+        preferencias = self.preferencias if preferencias is None else preferencias
+        horarios_sequencia = self.horarios_sequencia if horarios_sequencia is None else horarios_sequencia
+
+        ambos = preferencias & horarios_sequencia
+        horarios = [horario for horario in self.professor.preferencias if ambos & horario.mascara]
+        horarios += [horario for horario in self.professor.preferencias
+                     if preferencias & ~ambos & horario.mascara]
+
+        sequencia = horarios_sequencia & ~ambos
+        while sequencia:
+            menor = sequencia & -sequencia
+            horarios.append(lista_de_horarios[menor.bit_length() - 1])
+            sequencia ^= menor
+
+        return horarios
 
     def dados(self):
         return 'Mat: {}, Tur: {}, Pro: {}'.format(self.materia, self.turma.nome, self.professor.nome)
@@ -348,777 +551,4360 @@ class Horario(object):
     Attributes:
         dia (str): Dia da semana.
         hora (str): Hora.
-        vertices (list of Vertice): Aulas ministradas nesse horário.
+        indice (int): Índice do horário na lista de horários (cores).
+        mascara (int): Máscara de bits com apenas o bit do índice do horário ligado.
     """
 
-    def __init__(self, dia, hora):
+    def __init__(self, dia, hora, indice):
         """
         Construtor da classe Horario.
 
         Args:
             dia (str): Dia da semana.
             hora (str): Hora.
-            vertices (list of Vertice): Aulas ministradas nesse horário.
+            indice (int): Índice do horário na lista de horários (cores).
         """
 
         self.dia = dia
         self.hora = hora
-        self.vertices = []
-
-    def add_vertice(self, vertice):
-        """
-        Adiciona vértices (aulas) ao horário.
-
-        Args:
-            vertice (Vertice): Aula alocada para esse horário.
-        """
-        igual = False
-        for colorido in self.vertices:
-            igual = vertice.eh_igual(colorido)
-
-        self.vertices.append(vertice)
-
-    def turma_tem_aula(self, turma):
-        for vertice in self.vertices:
-            if vertice.turma.nome == turma:
-                return [vertice.materia, vertice.professor.nome]
-        return False
+        self.indice = indice
+        self.mascara = 1 << indice
 
     def dados(self):
         return '{} {}'.format(self.dia, self.hora)
 
 
-class HorarioDeAulas(object):
+class Grafo(object):
     """
-    Classe com métodos para ler uma planilha, analisar os dados e alocar as aulas nos horários permitidos.
+    Núcleo compacto do grafo de conflitos, com os vértices numerados de 0 a V-1.
+
+    Como dois vértices são vizinhos se, e somente se, possuem a mesma turma ou o mesmo professor, o grafo é a união das
+    cliques formadas pelas aulas de cada turma e de cada professor. As cliques são armazenadas no formato CSR
+    (Compressed Sparse Row): os vértices da turma t são aulas_turma[inicio_turma[t]:inicio_turma[t + 1]], e o mesmo vale
+    para os professores. Assim, a memória utilizada é linear na quantidade de vértices, e não na de arestas. O grafo não
+    é alterado pela coloração, cujo estado fica em um objeto Solucao.
+
+    As cópias de uma mesma aula (mesma matéria, turma e professor) são vértices vizinhos entre si e com os mesmos
+    vizinhos, restrições e preferências. Por isso, o grafo também é representado pelas aulas distintas, cada uma com a
+    quantidade de cópias que precisam de horários distintos (vértices de multiplicidade). O estado da coloração e as
+    restrições iniciais são guardados por aula, e apenas o horário é guardado por vértice.
 
     Attributes:
-        arquivo (str): Nome do arquivo passado como parâmetro.
-        planilha (Workbook): Arquivo .xlsx lido com a biblioteca openpyxl
-        turmas (dict of str: Restricao): Dicionário indexado pelo nome da turma e objeto do tipo Restricao como valor.
-        professores (dict of str: Professor): Dicionário indexado pelo nome do professor e objeto do tipo Professor como valor.
-        horarios (dict of str: (dict of str: Horario)): Dicionário indexado na primeira camada com os nomes dos dias e na segunda com horários.
-        aulas_por_dia (int): Número de aulas que a instituição oferece por dia.
-        vertice (list of Vertice): Lista de vértices (aulas) do grafo.
-        quantidade_vertices_sem_horario (int): Quantidade de vertices sem horário definido.
-        lista_adjacencia (dict of Vertice: (list of Vertice)): Dicionário indexado por objetos Vertice que possuem uma lista de objetos Vertice adjacentes.
-        total_preferencias (int): Total de preferências dos professores
-        preferencias_atendidas (int): Total de preferências atendidas após aplicação do algoritmo de coloração
-        prioridade_aula_sequencial (bool): True para priorizar o máximo de aulas em sequencia igual a 2, False para não analisar isso. False é o valor default.
+        quantidade_vertices (int): Quantidade de vértices do grafo.
+        turma (numpy.ndarray): Índice da turma de cada vértice.
+        professor (numpy.ndarray): Índice do professor de cada vértice.
+        aula (numpy.ndarray): Índice da aula (matéria, turma e professor) de cada vértice. Vértices iguais possuem o
+            mesmo índice.
+        inicio_turma (numpy.ndarray): Posição em aulas_turma onde se iniciam os vértices de cada turma.
+        aulas_turma (numpy.ndarray): Vértices agrupados por turma.
+        inicio_professor (numpy.ndarray): Posição em aulas_professor onde se iniciam os vértices de cada professor.
+        aulas_professor (numpy.ndarray): Vértices agrupados por professor.
+        grau (numpy.ndarray): Grau de cada vértice.
+        quantidade_aulas (int): Quantidade de aulas distintas.
+        inicio_copias (numpy.ndarray): Posição em copias onde se iniciam os vértices de cada aula.
+        copias (numpy.ndarray): Vértices agrupados por aula, em ordem crescente dentro de cada aula.
+        turma_aula (numpy.ndarray): Índice da turma de cada aula.
+        professor_aula (numpy.ndarray): Índice do professor de cada aula.
+        grau_aula (numpy.ndarray): Grau de cada cópia de cada aula.
+        inicio_turma_aula (numpy.ndarray): Posição em aulas_da_turma onde se iniciam as aulas de cada turma.
+        aulas_da_turma (numpy.ndarray): Aulas agrupadas por turma.
+        inicio_professor_aula (numpy.ndarray): Posição em aulas_do_professor onde se iniciam as aulas de cada professor.
+        aulas_do_professor (numpy.ndarray): Aulas agrupadas por professor.
+        restricoes (list of int): Máscara de bits dos horários restritos de cada aula pelas restrições de sua turma e de
+            seu professor.
+        preferencias (list of int): Máscara de bits dos horários preferidos pelo professor de cada aula, exceto os
+            restritos.
     """
 
-    def __init__(self, arquivo, prioridade_aula_sequencial=False):
+    # Vetores que descrevem a estrutura do grafo.
+    VETORES_ESTRUTURA = ('turma', 'professor', 'aula', 'inicio_turma', 'aulas_turma', 'inicio_professor',
+                         'aulas_professor', 'grau')
+
+    def __init__(self, turma, professor, aula):
         """
-        Construtor da classe HorarioDeAulas.
+        Construtor da classe Grafo.
 
         Args:
-            arquivo (str): Caminho do arquivo que se deseja ler.
-            prioridade_aula_sequencial (bool): True para priorizar o máximo de aulas em sequencia igual a 2, False para não analisar isso. False é o valor default.
+            turma (list of int): Índice da turma de cada vértice.
+            professor (list of int): Índice do professor de cada vértice.
+            aula (list of int): Índice da aula de cada vértice.
         """
-        self.arquivo = arquivo
-        self.planilha = load_workbook(arquivo)
-        self.turmas = dict()
-        self.professores = dict()
-        self.horarios = dict()
-        self.aulas_por_dia = 0
-        self.vertices = list()
-        self.quantidade_vertices_sem_horario = 0
-        self.lista_adjacencia = dict()
-        self.total_preferencias = 0
-        self.preferencias_atendidas = 0
-        self.prioridade_aula_sequencial = prioridade_aula_sequencial
+        self.quantidade_vertices = len(turma)
+        self.turma = np.asarray(turma, dtype=np.int32)
+        self.professor = np.asarray(professor, dtype=np.int32)
+        self.aula = np.asarray(aula, dtype=np.int32)
+
+        self.inicio_turma, self.aulas_turma = self.agrupa(self.turma)
+        self.inicio_professor, self.aulas_professor = self.agrupa(self.professor)
+
+        # Vértices com a mesma turma e o mesmo professor são contados nas duas cliques, por isso são descontados uma
+        # vez. O próprio vértice também é descontado.
+        quantidade_professores = len(self.inicio_professor) - 1
+        par = self.turma.astype(np.int64) * quantidade_professores + self.professor
+        _, indice_par, aulas_par = np.unique(par, return_inverse=True, return_counts=True)
+        self.grau = (np.diff(self.inicio_turma)[self.turma] + np.diff(self.inicio_professor)[self.professor]
+                     - aulas_par[indice_par] - 1).astype(np.int32)
+
+        self.inicializa_aulas()
+
+    @classmethod
+    def a_partir_de_vetores(cls, vetores):
+        """
+        Cria o grafo a partir dos vetores de estrutura já calculados, como os armazenados no cache.
 
-        self.inicializa_vertices()
-        self.inicializa_horarios()
-        self.define_restricoes_professores()
-        self.define_restricoes_turmas()
-        self.define_preferencias_professores()
-        self.atualiza_restricoes_preferencias_vertices()
-        self.define_arestas()
+        Args:
+            vetores (dict of str: numpy.ndarray): Vetores indexados pelos nomes em Grafo.VETORES_ESTRUTURA.
 
-    def inicializa_vertices(self):
+        Returns:
+            (Grafo): Grafo com os vetores informados, sem restrições nem preferências.
         """
-        Lê a planilha Dados e cria vértices a partir desses dados.
-
-        Além disso, atribui valores às listas de professores e turmas.
+        grafo = cls.__new__(cls)
+        for nome in cls.VETORES_ESTRUTURA:
+            setattr(grafo, nome, vetores[nome])
+        grafo.quantidade_vertices = len(grafo.turma)
+        grafo.inicializa_aulas()
+        return grafo
+
+    def inicializa_aulas(self):
         """
-        informacoes = self.planilha['Dados']
-
-        if informacoes.max_row == 1:
-            # Verifica se a planilha possui apenas o cabeçalho.
-            # Em caso verdadeiro, abandona aqui a execução do método.
-            return
+        Monta a representação por aulas distintas a partir dos vetores dos vértices, sem restrições nem preferências.
+        """
+        self.inicio_copias, self.copias = self.agrupa(self.aula)
+        self.quantidade_aulas = len(self.inicio_copias) - 1
+        primeiras = self.copias[self.inicio_copias[:-1]]
+        self.turma_aula = self.turma[primeiras]
+        self.professor_aula = self.professor[primeiras]
+        self.grau_aula = self.grau[primeiras]
+        self.inicio_turma_aula, self.aulas_da_turma = self.agrupa(self.turma_aula)
+        self.inicio_professor_aula, self.aulas_do_professor = self.agrupa(self.professor_aula)
+        # Uma turma ou um professor sem aulas não aparece nos vetores agrupados por aula.
+        self.inicio_turma_aula = np.pad(self.inicio_turma_aula,
+                                        (0, len(self.inicio_turma) - len(self.inicio_turma_aula)), mode='edge')
+        self.inicio_professor_aula = np.pad(self.inicio_professor_aula,
+                                            (0, len(self.inicio_professor) - len(self.inicio_professor_aula)),
+                                            mode='edge')
+        self.restricoes = [0] * self.quantidade_aulas
+        self.preferencias = [0] * self.quantidade_aulas
+
+    @staticmethod
+    def agrupa(grupos):
+        """
+        Agrupa os vértices no formato CSR de acordo com o grupo (turma ou professor) de cada um.
 
-        informacoes.delete_rows(1)  # Remove cabecalho
+        Args:
+            grupos (numpy.ndarray): Índice do grupo de cada vértice.
 
-        # Laço para criar vertices com a tupla (Matéria, Turma, Professor)
-        for linha in informacoes:
-            materia = linha[0].value
-            turma = linha[1].value
-            professor = linha[2].value
-            quantidade = linha[3].value
+        Returns:
+            tuple of (numpy.ndarray, numpy.ndarray): Posição de início de cada grupo e vértices ordenados por grupo.
+            Dentro de um grupo, os vértices mantêm a ordem original.
+        """
+        quantidade_grupos = int(grupos.max()) + 1 if len(grupos) > 0 else 0
+        inicio = np.zeros(quantidade_grupos + 1, dtype=np.int64)
+        np.cumsum(np.bincount(grupos, minlength=quantidade_grupos), out=inicio[1:])
+        return inicio, np.argsort(grupos, kind='stable').astype(np.int32)
 
-            # Verifica se a turma já está no dicionario de turmas
-            # Se nao estiver, cria uma nova turma do tipo Restricao e adiciona ao dicionario
-            if turma in self.turmas:
-                turma = self.turmas[turma]
-            else:
-                turma = Restricao(turma)
-                self.turmas[turma.nome] = turma
+    def vertices_turma(self, turma):
+        """
+        Retorna os vértices de uma turma.
 
-            # Verifica se o professor já está no dicionario de professores
-            # Se nao estiver, cria um novo professor do tipo Professor e adiciona ao dicionario
-            if professor in self.professores:
-                professor = self.professores[professor]
-            else:
-                professor = Professor(professor)
-                self.professores[professor.nome] = professor
+        Args:
+            turma (int): Índice da turma.
 
-            # Insere os vertices
-            self.insere_vertice((materia, turma, professor), quantidade)
+        Returns:
+            (numpy.ndarray): Vértices da turma.
+        """
+        return self.aulas_turma[self.inicio_turma[turma]:self.inicio_turma[turma + 1]]
 
-    def inicializa_horarios(self):
+    def vertices_professor(self, professor):
         """
-        Lê a planilha Configuracoes e instância objetos do tipo Horario.
+        Retorna os vértices de um professor.
 
-        Além disso, atribui valores ao dicionário de horários da classe.
+        Args:
+            professor (int): Índice do professor.
+
+        Returns:
+            (numpy.ndarray): Vértices do professor.
         """
-        informacoes = self.planilha['Configuracoes']
+        return self.aulas_professor[self.inicio_professor[professor]:self.inicio_professor[professor + 1]]
 
-        if informacoes.max_row == 1:
-            # Verifica se a planilha possui apenas o cabeçalho.
-            # Em caso verdadeiro, abandona aqui a execução do método.
-            return
+    def vizinhos(self, vertice):
+        """
+        Encontra todos os vizinhos de um vértice a partir das cliques de sua turma e de seu professor.
 
-        informacoes.delete_rows(1)  # Remove cabecalho
+        Args:
+            vertice (int): Índice do vértice.
 
-        dias = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta']
-        # Laço para inicializar horarios
-        for dia in dias:
-            self.horarios[dia] = dict()
+        Returns:
+            (numpy.ndarray): Vizinhos do vértice.
+        """
+        turma = self.turma[vertice]
+        da_turma = self.vertices_turma(turma)
+        do_professor = self.vertices_professor(self.professor[vertice])
+        # Vértices do professor que são da mesma turma já estão entre os vértices da turma.
+        return np.concatenate((da_turma[da_turma != vertice], do_professor[self.turma[do_professor] != turma]))
 
-            for hora in informacoes:
-                horario = Horario(dia, str(hora[0].value))
-                self.horarios[dia][str(hora[0].value)] = horario
+    def aulas_vizinhas(self, aula):
+        """
+        Encontra as aulas da mesma turma ou do mesmo professor de uma aula, incluindo a própria aula, cujas cópias são
+        vizinhas entre si.
 
-            self.aulas_por_dia = len(self.horarios[dia])
+        Args:
+            aula (int): Índice da aula.
 
-    def define_restricoes_professores(self):
+        Returns:
+            (numpy.ndarray): Aulas vizinhas, sem repetições.
         """
-        Lê a planilha Restricao e adiciona restrições aos objetos do tipo Professor.
+        turma = self.turma_aula[aula]
+        professor = self.professor_aula[aula]
+        da_turma = self.aulas_da_turma[self.inicio_turma_aula[turma]:self.inicio_turma_aula[turma + 1]]
+        do_professor = self.aulas_do_professor[self.inicio_professor_aula[professor]:
+                                               self.inicio_professor_aula[professor + 1]]
+        # Aulas do professor que são da mesma turma já estão entre as aulas da turma.
+        return np.concatenate((da_turma, do_professor[self.turma_aula[do_professor] != turma]))
+
+    def componentes(self):
         """
-        informacoes = self.planilha['Restricao']
+        Encontra as componentes conexas do grafo.
 
-        if informacoes.max_row == 1:
-            # Verifica se a planilha possui apenas o cabeçalho.
-            # Em caso verdadeiro, abandona aqui a execução do método.
-            return
+        Como as arestas ligam apenas aulas da mesma turma ou do mesmo professor, as componentes são encontradas unindo
+        (union-find) cada turma aos professores de suas aulas, sem percorrer as arestas. Aulas de componentes diferentes
+        não conflitam entre si, como as de campi ou turnos que não compartilham turmas nem professores.
 
-        informacoes.delete_rows(1)  # Remove cabecalho
+        Returns:
+            (list of numpy.ndarray): Vértices de cada componente, em ordem crescente. As componentes são ordenadas pelo
+            seu menor vértice.
+        """
+        quantidade_turmas = len(self.inicio_turma) - 1
+        quantidade_professores = len(self.inicio_professor) - 1
+        # Os nós do union-find são as turmas, seguidas dos professores.
+        pai = list(range(quantidade_turmas + quantidade_professores))
+
+        def raiz(no):
+            while pai[no] != no:
+                pai[no] = pai[pai[no]]
+                no = pai[no]
+            return no
+
+        pares = np.unique(self.turma.astype(np.int64) * quantidade_professores + self.professor)
+        for par in pares.tolist():
+            turma = raiz(par // quantidade_professores)
+            professor = raiz(quantidade_turmas + par % quantidade_professores)
+            if turma != professor:
+                pai[max(turma, professor)] = min(turma, professor)
+
+        raizes = np.array([raiz(turma) for turma in range(quantidade_turmas)], dtype=np.int64)
+        # As componentes são numeradas pela ordem do seu primeiro vértice.
+        _, primeiro, rotulo = np.unique(raizes[self.turma], return_index=True, return_inverse=True)
+        numero = np.empty(len(primeiro), dtype=np.int32)
+        numero[np.argsort(primeiro)] = np.arange(len(primeiro), dtype=np.int32)
+        inicio, vertices = self.agrupa(numero[rotulo.reshape(-1)])
+        return [vertices[inicio[componente]:inicio[componente + 1]] for componente in range(len(inicio) - 1)]
+
+
+class Solucao(object):
+    """
+    Estado de uma coloração do grafo.
 
-        for restricao in informacoes:
-            professor = restricao[0].value
-            hora = str(restricao[1].value)
-            dia = restricao[2].value
+    A instância (HorarioDeAulas, com seus vértices, horários e o Grafo) não é alterada pela coloração: tudo o que muda
+    durante a coloração fica em um objeto Solucao. Criar uma solução vazia custa apenas a cópia das restrições e das
+    preferências iniciais de cada vértice, de forma que várias colorações podem ser feitas sobre a mesma instância, uma
+    após a outra, sem ler a planilha novamente.
 
-            if (professor in self.professores
-                    and dia in self.horarios
-                    and hora in list(self.horarios.values())[0]):
-                # Verifica se o professor foi alocado em algum vértice,
-                # se o dia, é um dia letivo
-                # e se o horário é um horário de inicio de aula.
-                horario = self.horarios[dia][hora]
-                self.professores[professor].add_restricao(horario)
+    Attributes:
+        grafo (Grafo): Núcleo do grafo colorido.
+        horario (numpy.ndarray): Índice do horário (cor) de cada vértice, ou -1 caso o vértice não esteja colorido.
+        grau_saturacao (numpy.ndarray): Grau de saturação das cópias ainda não coloridas de cada aula.
+        restricoes (list of int): Máscara de bits dos horários restritos das cópias ainda não coloridas de cada aula.
+        restricoes_leves (list of int): Máscara de bits dos horários com restrições leves de cada aula.
+        preferencias (list of int): Máscara de bits dos horários preferidos de cada aula.
+        horarios_sequencia (list of int): Máscara de bits dos horários sugeridos em sequência de cada aula.
+        horarios_utilizados (int): Máscara de bits dos horários que já possuem alguma aula.
+        quantidade_vertices_sem_horario (int): Quantidade de vértices sem horário definido.
+        preferencias_atendidas (int): Total de preferências atendidas.
+        preferencias_atendidas_professor (list of int): Quantidade de preferências atendidas de cada professor, indexada
+            pelo índice do professor no grafo.
+    """
 
-    def define_restricoes_turmas(self):
+    def __init__(self, grafo):
         """
-        Lê a planilha Restricao Turma e adiciona restrições aos objetos do tipo Turma.
-        """
-        informacoes = self.planilha['Restricoes Turma']
-
-        if informacoes.max_row == 1:
-            # Verifica se a planilha possui apenas o cabeçalho.
-            # Em caso verdadeiro, abandona aqui a execução do método.
-            return
+        Construtor da classe Solucao. Cria uma solução sem nenhum vértice colorido.
 
-        informacoes.delete_rows(1)  # Remove cabecalho
+        Args:
+            grafo (Grafo): Núcleo do grafo a ser colorido.
+        """
+        self.grafo = grafo
+        self.horario = np.full(grafo.quantidade_vertices, -1, dtype=np.int32)
+        self.grau_saturacao = np.zeros(grafo.quantidade_aulas, dtype=np.int32)
+        self.restricoes = list(grafo.restricoes)
+        self.restricoes_leves = [0] * grafo.quantidade_aulas
+        self.preferencias = list(grafo.preferencias)
+        self.horarios_sequencia = [0] * grafo.quantidade_aulas
+        self.horarios_utilizados = 0
+        self.quantidade_vertices_sem_horario = grafo.quantidade_vertices
+        self.preferencias_atendidas = 0
+        self.preferencias_atendidas_professor = [0] * (len(grafo.inicio_professor) - 1)
 
-        for restricao in informacoes:
-            turma = restricao[0].value
-            hora = str(restricao[1].value)
-            dia = restricao[2].value
+    def add_restricoes(self, aula, mascara):
+        """
+        Adiciona um conjunto de horários às restrições de uma aula, removendo-os das preferências e dos horários em
+        sequência.
 
-            if (turma in self.turmas
-                    and dia in self.horarios
-                    and hora in list(self.horarios.values())[0]):
-                # Verifica se a turma exite na lista de turmas,
-                # se o dia é um dia letivo
-                # e se o horário é um horário de início de aula.
-                horario = self.horarios[dia][hora]
-                self.turmas[turma].add_restricao(horario)
+        Args:
+            aula (int): Índice da aula.
+            mascara (int): Máscara de bits dos horários.
+        """
+        self.restricoes[aula] |= mascara
+        self.preferencias[aula] &= ~mascara
+        self.horarios_sequencia[aula] &= ~mascara
 
-    def define_preferencias_professores(self):
+    def add_restricoes_leves(self, aula, mascara):
         """
-        Lê a planilha Preferencias e adiciona as preferências aos objetos do tipo Professor.
+        Adiciona um conjunto de horários às restrições leves de uma aula, removendo-os das preferências e dos horários
+        em sequência.
+
+        Args:
+            aula (int): Índice da aula.
+            mascara (int): Máscara de bits dos horários.
         """
-        informacoes = self.planilha['Preferencias']
+        self.restricoes_leves[aula] |= mascara
+        self.preferencias[aula] &= ~mascara
+        self.horarios_sequencia[aula] &= ~mascara
 
-        if informacoes.max_row == 1:
-            # Verifica se a planilha possui apenas o cabeçalho.
-            # Em caso verdadeiro, abandona aqui a execução do método.
-            return
 
-        informacoes.delete_rows(1)  # Remove cabecalho
+class IndiceDePrioridade(object):
+    """
+    Índice de prioridade das aulas com cópias ainda não coloridas, utilizado na escolha do próximo vértice a ser
+    colorido.
 
-        for preferencia in informacoes:
-            professor = preferencia[0].value
-            hora = str(preferencia[1].value)
-            dia = preferencia[2].value
+    Mantém um heap global e um heap para cada turma e para cada professor, com uma entrada por aula (vértice de
+    multiplicidade), e não por cópia. Como dois vértices são vizinhos se, e somente se, possuem a mesma turma ou o mesmo
+    professor, o melhor vizinho não colorido de um vértice é o melhor dentre os topos dos heaps da sua turma e do seu
+    professor. As entradas desatualizadas são descartadas apenas quando chegam ao topo de um heap (remoção preguiçosa),
+    de forma que atualizar a prioridade de uma aula custa O(log A).
 
-            if (professor in self.professores
-                    and dia in self.horarios
-                    and hora in list(self.horarios.values())[0]):
-                # Verifica se o professor foi alocado em algum vértice,
-                # se o dia, é um dia letivo
-                # e se o horário é um horário de inicio de aula.
-                horario = self.horarios[dia][hora]
-                self.professores[professor].add_preferencia(horario)
-                self.total_preferencias += 1
+    A chave de prioridade reproduz a ordem dos filtros de HorarioDeAulas.escolher_vertice(): maior quantidade de
+    restrições, maior grau de saturação, maior grau, possuir horário em sequência e maior quantidade de preferências.
+    As cópias não coloridas de uma aula possuem sempre a mesma chave, então a aula concorre com a sua próxima cópia na
+    ordem de desempate, que por padrão é o índice dos vértices. Assim, as escolhas são as mesmas de um índice com uma
+    entrada por vértice.
 
-    def atualiza_restricoes_preferencias_vertices(self):
+    Attributes:
+        solucao (Solucao): Solução em coloração.
+        grafo (Grafo): Núcleo do grafo.
+        ordem (list of int): Ordem de desempate de cada vértice.
+        quantidade (int): Quantidade de vértices no índice.
+        restantes (list of (list of int)): Cópias não coloridas de cada aula, da última para a próxima na ordem de
+            desempate.
+        versao (list of int): Versão atual da chave de cada aula, ou -1 caso a aula não possua cópias no índice.
+        heap_global (list of tuple): Heap com todas as aulas com cópias não coloridas.
+        heaps_turma (list of (list of tuple)): Heaps das aulas com cópias não coloridas de cada turma.
+        heaps_professor (list of (list of tuple)): Heaps das aulas com cópias não coloridas de cada professor.
+        atualizacoes (int): Quantidade de atualizações de prioridade realizadas.
+        descartadas (int): Quantidade de entradas desatualizadas descartadas dos heaps.
+    """
+
+    def __init__(self, solucao, ordem=None, vertices=None):
         """
-        Para cada vértice, chama os respectivos métodos para atualizar as restrições e as preferências dos vértices.
+        Construtor da classe IndiceDePrioridade.
+
+        Args:
+            solucao (Solucao): Solução em coloração, de onde são lidos os critérios de prioridade.
+            ordem (list of int|None): Ordem de desempate de cada vértice. None para desempatar pelo índice.
+            vertices (numpy.ndarray|None): Vértices inseridos no índice, como os de uma componente do grafo. None para
+                inserir todos os vértices do grafo.
         """
-        for vertice in self.vertices:
-            vertice.atualiza_restricoes()
-            vertice.atualiza_preferencias()
+        grafo = solucao.grafo
+        self.solucao = solucao
+        self.grafo = grafo
+        self.ordem = list(range(grafo.quantidade_vertices)) if ordem is None else ordem
+        self.atualizacoes = 0
+        self.descartadas = 0
+
+        vertices = range(grafo.quantidade_vertices) if vertices is None else vertices.tolist()
+        if ordem is not None:
+            vertices = sorted(vertices, key=ordem.__getitem__)
+        self.quantidade = len(vertices)
+        self.restantes = [[] for _ in range(grafo.quantidade_aulas)]
+        aula = grafo.aula.tolist()
+        for vertice in reversed(vertices):
+            self.restantes[aula[vertice]].append(vertice)
+
+        self.versao = [0 if len(copias) > 0 else -1 for copias in self.restantes]
+        aulas = [indice for indice, copias in enumerate(self.restantes) if len(copias) > 0]
+        self.heap_global = [self.entrada(indice) for indice in aulas]
+        self.heaps_turma = [[] for _ in range(len(grafo.inicio_turma) - 1)]
+        self.heaps_professor = [[] for _ in range(len(grafo.inicio_professor) - 1)]
+        for entrada, turma, professor in zip(self.heap_global, grafo.turma_aula[aulas].tolist(),
+                                             grafo.professor_aula[aulas].tolist()):
+            self.heaps_turma[turma].append(entrada)
+            self.heaps_professor[professor].append(entrada)
+
+        heapq.heapify(self.heap_global)
+        for heap in self.heaps_turma:
+            heapq.heapify(heap)
+        for heap in self.heaps_professor:
+            heapq.heapify(heap)
+
+    def __len__(self):
+        return self.quantidade
+
+    def __contains__(self, vertice):
+        return vertice in self.restantes[self.grafo.aula[vertice]]
+
+    def entrada(self, aula):
+        """
+        Monta a entrada do heap de uma aula. Os critérios são negados pois o heapq é um heap de mínimo.
 
-    def define_arestas(self):
+        Args:
+            aula (int): Índice da aula.
+
+        Returns:
+            tuple: Chave de prioridade seguida da ordem de desempate e do índice da próxima cópia, do índice e da versão
+            da aula.
+        """
+        solucao = self.solucao
+        copia = self.restantes[aula][-1]
+        return (-quantidade_bits(solucao.restricoes[aula]),
+                -int(solucao.grau_saturacao[aula]),
+                -int(self.grafo.grau_aula[aula]),
+                0 if solucao.horarios_sequencia[aula] else 1,
+                -quantidade_bits(solucao.preferencias[aula]),
+                self.ordem[copia],
+                copia,
+                aula,
+                self.versao[aula])
+
+    def insere(self, aula):
         """
-        Cria as arestas do grafo.
+        Insere nos heaps uma nova entrada de uma aula, invalidando as anteriores.
 
-        Percorre cada vértice. Ao percorrer, verifica quais vertices devem ser vizinhos através do metodo deve_ser_vizinho().
+        Args:
+            aula (int): Índice da aula.
+        """
+        self.versao[aula] += 1
+        entrada = self.entrada(aula)
+        heapq.heappush(self.heap_global, entrada)
+        heapq.heappush(self.heaps_turma[self.grafo.turma_aula[aula]], entrada)
+        heapq.heappush(self.heaps_professor[self.grafo.professor_aula[aula]], entrada)
 
+    def atualiza(self, aula):
         """
-        for indice_v1 in range(len(self.vertices)):
-            vertice_1 = self.vertices[indice_v1]
-            self.lista_adjacencia[vertice_1] = []
+        Atualiza a prioridade de uma aula com cópias não coloridas após alguma alteração em seus atributos.
 
-            for indice_v2 in range(len(self.vertices)):
-                if indice_v1 != indice_v2:
-                    vertice_2 = self.vertices[indice_v2]
+        Args:
+            aula (int): Índice da aula alterada.
+        """
+        if self.versao[aula] < 0:
+            return
 
-                    if vertice_1.deve_ser_vizinho(vertice_2):
-                        # Se o vértice deve ser vizinho, o adiciona à lista de adjacência.
-                        self.lista_adjacencia[vertice_1].append(vertice_2)
+        self.atualizacoes += 1
+        self.insere(aula)
 
-    def insere_vertice(self, dados, qtd=1):
+    def remove(self, vertice):
         """
-        Cria objetos do tipo Vertice e adiciona-os à lista de vértices.
+        Remove um vértice do índice. Se ainda houver cópias da sua aula, a aula passa a concorrer com a próxima cópia.
+        As entradas antigas nos heaps são descartadas quando chegarem ao topo.
 
         Args:
-            dados (tuple of (str, Restricao, Professor)): Dados do vértice (aula).
-            qtd (int): Quantidade que aulas desse tipo devem ser ministradas.
+            vertice (int): Índice do vértice a ser removido.
         """
-        materia = dados[0]
-        turma = dados[1]
-        professor = dados[2]
-        for i in range(qtd):
-            self.quantidade_vertices_sem_horario += 1
-            self.vertices.append(Vertice(materia, turma, professor))
+        aula = self.grafo.aula[vertice]
+        copias = self.restantes[aula]
+        if copias[-1] == vertice:
+            copias.pop()
+        else:
+            copias.remove(vertice)
+        self.quantidade -= 1
 
-    '''
-    Aqui se inicia os algoritmos para coloração.
+        if len(copias) > 0:
+            self.insere(aula)
+        else:
+            self.versao[aula] = -1
 
-    Foi utilizado o algoritmo de DSATUR com algumas adaptações.
-    No algoritmo original, prioriza-se apenas os vértices com maior grau de saturação.
-    Nessa heurística são priorizados em ordem:
-        - Vértices com maior número de restrições;
-        - Vértices com maior grau de saturação;
-        - Vértices com maior grau no grafo original;
-        - Vértices com possibilidade de horário em sequência;
-        - Vértices com mais preferências.
-    '''
+    def topo(self, heap):
+        """
+        Descarta as entradas desatualizadas do topo de um heap e retorna a entrada válida do topo.
+
+        Args:
+            heap (list of tuple): Heap a ser consultado.
 
-    def dsatur_com_heristica(self):
+        Returns:
+            (tuple|None): Entrada do topo ou None caso o heap não possua aulas com cópias não coloridas.
         """
-        Método para atribuição dos horários à cada aula.
+        while len(heap) > 0:
+            entrada = heap[0]
+            if self.versao[entrada[-2]] == entrada[-1]:
+                return entrada
+            heapq.heappop(heap)
+            self.descartadas += 1
+        return None
+
+    def melhor(self):
+        """
+        Encontra o melhor vértice dentre todos os vértices não coloridos.
 
         Returns:
-            list of Vertice: Lista de vértices com horário não definido.
+            (int|None): Índice do melhor vértice ou None caso não haja vértices não coloridos.
         """
-        lista_de_horarios = []  # Lista com objetos Horario (cores) possiveis.
-        for dia in self.horarios:
-            for horario in self.horarios[dia]:
-                # Percorre cada objeto no dicionario de horários e os adiciona a lista_de_horarios
-                lista_de_horarios.append(self.horarios[dia][horario])
+        entrada = self.topo(self.heap_global)
+        return None if entrada is None else entrada[-3]
 
-        vertices_nao_coloridos = self.vertices.copy()
-        vertices_nao_alocados = []
+    def melhor_vizinho(self, vertice):
+        """
+        Encontra o melhor vizinho não colorido de um vértice.
 
-        # Inicia aqui a escolha do vertice a ser colorido
-        # e o processo de coloração (atribuição dos horários)
-        vertice_escolhido = self.escolher_vertice(vertices_nao_coloridos)
-        vertices_nao_coloridos.remove(vertice_escolhido)
-        horario = self.escolher_horario(vertice_escolhido, lista_de_horarios)
-        self.define_horario(vertice_escolhido, horario, lista_de_horarios, vertices_nao_coloridos)
-
-        while len(vertices_nao_coloridos) > 0:
-            vertice_escolhido = self.escolher_vertice(
-                self.vizinhos_nao_coloridos(vertice_escolhido, vertices_nao_coloridos))
-            # Se não houver vizinhos sem cor, escolhe um vértice dentre todos os vértices não coloridos.
-            vertice_escolhido = self.escolher_vertice(
-                vertices_nao_coloridos) if vertice_escolhido is None else vertice_escolhido
-            vertices_nao_coloridos.remove(vertice_escolhido)
-            horario = self.escolher_horario(vertice_escolhido, lista_de_horarios)
+        Args:
+            vertice (int): Índice do vértice cujos vizinhos serão analisados. Não deve estar no índice.
 
-            if horario is not None:
-                # Se encontrar um horário em que o vértice se encaixa, define esse horário.
-                if not vertice_escolhido.tem_restricao(horario):
-                    self.define_horario(vertice_escolhido, horario, lista_de_horarios, vertices_nao_coloridos)
-                else:
-                    vertices_nao_alocados.append(vertice_escolhido)
-            else:
-                # Caso não encontre um horário para o vértice, o separa em uma lista.
-                vertices_nao_alocados.append(vertice_escolhido)
+        Returns:
+            (int|None): Índice do melhor vizinho ou None caso o vértice não possua vizinhos não coloridos.
+        """
+        entradas = [entrada for entrada in (self.topo(self.heaps_turma[self.grafo.turma[vertice]]),
+                                            self.topo(self.heaps_professor[self.grafo.professor[vertice]]))
+                    if entrada is not None]
+        return None if len(entradas) == 0 else min(entradas)[-3]
 
-        return vertices_nao_alocados
 
-    def vertices_de_maior_grau(self, lista_de_vertices):
+class LimitesInferiores(object):
+    """
+    Limites inferiores da quantidade de aulas sem horário e da quantidade de horários (cores) de uma instância.
+
+    Todas as aulas de uma turma, assim como as de um professor, formam uma clique do grafo de conflitos e precisam de
+    horários distintos. Como duas aulas só são vizinhas se possuem a mesma turma ou o mesmo professor, toda clique do
+    grafo está contida na clique de uma turma ou de um professor, de forma que a busca gulosa por cliques se resume a
+    essas cliques. Os limites são:
+        - cliques: com todas as aulas alocadas, são necessários ao menos tantos horários quanto as aulas da maior
+          turma ou do maior professor;
+        - pares de cliques: as aulas de duas cliques A e B ocupam |A| + |B| horários, dos quais no máximo os horários
+          permitidos a ambas podem coincidir, então são necessários ao menos |A| + |B| - |permitidos de A e de B|
+          horários. Esse limite considera as restrições das turmas e dos professores;
+        - aulas sem horário: as aulas de cada turma (e de cada professor) que não cabem nos horários permitidos pelo
+          emparelhamento máximo entre aulas e horários ficam necessariamente sem horário. As turmas são disjuntas, então
+          suas faltas são somadas, assim como as dos professores.
+
+    Attributes:
+        maior_turma (int): Quantidade de aulas da maior turma.
+        maior_professor (int): Quantidade de aulas do professor com mais aulas.
+        cores_pares (int): Limite dos pares de cliques.
+        cores (int): Limite inferior da quantidade de horários utilizados por uma solução com todas as aulas alocadas.
+        sem_horario (int): Limite inferior da quantidade de aulas sem horário.
+    """
+
+    # Quantidade de cliques processadas por bloco no cálculo do limite dos pares, para limitar a memória.
+    TAMANHO_BLOCO = 512
+
+    def __init__(self, grafo, quantidade_horarios):
         """
-        Encontra os vértices com maior grau no grafo original dentre uma lista de vertices.
+        Construtor da classe LimitesInferiores. Calcula todos os limites.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
-
-        Returns:
-            (list of Vertice): Lista com os vértices de maior grau.
+            grafo (Grafo): Núcleo do grafo, com as restrições iniciais de cada aula.
+            quantidade_horarios (int): Quantidade de horários (cores) disponíveis.
         """
-        vertices = []
-        maior_grau = 0
+        todos = (1 << quantidade_horarios) - 1
+        cliques = ([grafo.vertices_turma(turma) for turma in range(len(grafo.inicio_turma) - 1)]
+                   + [grafo.vertices_professor(professor) for professor in range(len(grafo.inicio_professor) - 1)])
+        quantidade_turmas = len(grafo.inicio_turma) - 1
+
+        tamanhos = np.array([len(clique) for clique in cliques], dtype=np.int64)
+        self.maior_turma = int(tamanhos[:quantidade_turmas].max()) if quantidade_turmas > 0 else 0
+        self.maior_professor = int(tamanhos[quantidade_turmas:].max()) if len(cliques) > quantidade_turmas else 0
+
+        aulas = grafo.aula.tolist()
+        permitidos = [[todos & ~grafo.restricoes[aulas[vertice]] for vertice in clique.tolist()] for clique in cliques]
+        faltas = [len(mascaras) - emparelhamento_maximo(mascaras) for mascaras in permitidos]
+        self.sem_horario = max(sum(faltas[:quantidade_turmas]), sum(faltas[quantidade_turmas:]))
+
+        # Horários permitidos a ao menos uma aula de cada clique, em uma matriz com uma linha por clique.
+        uniao = [0] * len(cliques)
+        for indice, mascaras in enumerate(permitidos):
+            for mascara in mascaras:
+                uniao[indice] |= mascara
+        matriz = np.unpackbits(mascaras_para_bytes(uniao, quantidade_horarios), axis=1,
+                               bitorder='little').astype(np.float32)
+        self.cores_pares = 0
+        for inicio in range(0, len(cliques), self.TAMANHO_BLOCO):
+            fim = min(inicio + self.TAMANHO_BLOCO, len(cliques))
+            pares = tamanhos[inicio:fim, None] + tamanhos[None, :] - (matriz[inicio:fim] @ matriz.T).astype(np.int64)
+            # Uma clique não forma par com ela mesma.
+            pares[np.arange(fim - inicio), np.arange(inicio, fim)] = 0
+            self.cores_pares = max(self.cores_pares, int(pares.max()))
+
+        self.cores = max(self.maior_turma, self.maior_professor, self.cores_pares)
+
+
+class Ocupacao(object):
+    """
+    Ocupação dos horários de uma coloração por turma e por professor, com as penalidades das restrições desejáveis
+    mantidas de forma incremental a cada alteração de horário. É a base da BuscaTabu e do Editor.
 
-        for vertice in lista_de_vertices:
-            grau = len(self.lista_adjacencia[vertice])
-            if grau > maior_grau:
-                maior_grau = grau
-                vertices = [vertice]
-            elif grau == maior_grau:
-                vertices.append(vertice)
+    A variação do objetivo causada por um movimento é calculada sem aplicá-lo (variacao()), recontando apenas os dias
+    das turmas afetadas, em tempo proporcional à quantidade de aulas por dia.
 
-        return vertices
+    As penalidades são as mesmas do Verificador:
+        - R5: aulas da mesma matéria que formam a terceira (ou posterior) aula seguida de uma turma em um dia;
+        - R6: janelas, ou seja, horários vagos entre a primeira e a última aula de uma turma em um dia;
+        - R7: preferências de professores não atendidas.
 
-    def vertices_maior_grau_saturacao(self, lista_de_vertices):
+    Attributes:
+        horarios_de_aula (HorarioDeAulas): Instância colorida.
+        aulas_por_dia (int): Número de aulas por dia.
+        quantidade_horarios (int): Quantidade de horários (cores).
+        pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
+        turma (list of int): Índice da turma de cada vértice.
+        professor (list of int): Índice do professor de cada vértice.
+        materia (list of object): Matéria de cada vértice.
+        proibidos (list of int): Máscara de bits dos horários restritos de cada vértice (restrições da turma e do
+            professor).
+        preferidos (list of int): Máscara de bits dos horários preferidos pelo professor de cada vértice.
+        horario (list of int): Horário atual de cada vértice, ou -1 caso o vértice esteja sem horário.
+        ocupacao_turma (list of (list of int)): Vértice de cada turma em cada horário, ou -1 caso o horário esteja vago.
+        ocupacao_professor (list of (list of int)): Vértice de cada professor em cada horário, ou -1.
+        nao_alocados (set of int): Vértices sem horário.
+        contagens_turma_dia (dict of (int, int): tuple): Quantidade de violações de R5 e R6 de cada turma em cada dia
+            (contagens_dia()).
+        penalidade_turma_dia (dict of (int, int): int): Penalidade R5 e R6 de cada turma em cada dia.
+        penalidade_turmas (int): Soma das penalidades de todas as turmas em todos os dias.
+        preferencias_nao_atendidas (int): Penalidade R7 atual, sem peso.
+        aulas_horario (list of int): Quantidade de aulas em cada horário.
+        cores (int): Quantidade de horários utilizados.
+    """
+
+    def __init__(self, horarios_de_aula, pesos=(1, 1, 1)):
         """
-        Encontra os vértices de maior grau de saturação dentre uma lista de vertices.
+        Construtor da classe Ocupacao.
 
-        Caso haja empate, encontra os vértices com maior grau no grafo original dentre os empatados.
+        Args:
+            horarios_de_aula (HorarioDeAulas): Instância já colorida. A ocupação parte da solução atual da instância.
+            pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
+        """
+        grafo = horarios_de_aula.grafo
+        self.horarios_de_aula = horarios_de_aula
+        self.aulas_por_dia = horarios_de_aula.aulas_por_dia
+        self.quantidade_horarios = len(horarios_de_aula.lista_de_horarios)
+        self.pesos = pesos
+        self.turma = grafo.turma.tolist()
+        self.professor = grafo.professor.tolist()
+        self.materia = [vertice.materia for vertice in horarios_de_aula.vertices]
+        self.proibidos = [vertice.turma.restricoes | vertice.professor.restricoes
+                          for vertice in horarios_de_aula.vertices]
+        self.preferidos = [vertice.professor.mascara_preferencias for vertice in horarios_de_aula.vertices]
+        self.horario = horarios_de_aula.solucao.horario.tolist()
+
+        self.ocupacao_turma = [[-1] * self.quantidade_horarios for _ in range(len(grafo.inicio_turma) - 1)]
+        self.ocupacao_professor = [[-1] * self.quantidade_horarios for _ in range(len(grafo.inicio_professor) - 1)]
+        self.nao_alocados = set()
+        for vertice, horario in enumerate(self.horario):
+            if horario < 0:
+                self.nao_alocados.add(vertice)
+            else:
+                self.ocupacao_turma[self.turma[vertice]][horario] = vertice
+                self.ocupacao_professor[self.professor[vertice]][horario] = vertice
+        self.aulas_horario = [0] * self.quantidade_horarios
+        for horario in self.horario:
+            if horario >= 0:
+                self.aulas_horario[horario] += 1
+        self.cores = sum(1 for aulas in self.aulas_horario if aulas > 0)
+
+        self.contagens_turma_dia = dict()
+        self.penalidade_turma_dia = dict()
+        for turma in range(len(self.ocupacao_turma)):
+            for dia in range(self.quantidade_horarios // max(self.aulas_por_dia, 1)):
+                self.contagens_turma_dia[(turma, dia)] = self.contagens_dia(turma, dia)
+                self.penalidade_turma_dia[(turma, dia)] = self.penalidade_dia(turma, dia)
+        self.penalidade_turmas = sum(self.penalidade_turma_dia.values())
+
+        self.preferencias_nao_atendidas = horarios_de_aula.total_preferencias - sum(
+            1 for vertice, horario in enumerate(self.horario)
+            if horario >= 0 and self.preferidos[vertice] >> horario & 1)
+
+    def contagens_dia(self, turma, dia):
+        """
+        Conta as violações de R5 e R6, sem peso, de uma turma em um dia.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+            turma (int): Índice da turma.
+            dia (int): Índice do dia.
 
         Returns:
-            (list of Vertice): Lista com os vértices de maior grau de saturação.
+            tuple of (int, int): Quantidade de aulas geminadas em excesso (R5) e de janelas (R6).
         """
-        vertices = []
-        maior_grau = 0
-
-        for vertice in lista_de_vertices:
-            grau = vertice.grau_saturacao
-            if grau > maior_grau:
-                maior_grau = grau
-                vertices = [vertice]
-            elif grau == maior_grau:
-                vertices.append(vertice)
+        inicio = dia * self.aulas_por_dia
+        return self.contagens_aulas(self.ocupacao_turma[turma][inicio:inicio + self.aulas_por_dia])
 
-        return self.vertices_de_maior_grau(vertices)
-
-    def vertices_com_mais_restricoes(self, lista_de_vertices):
+    def contagens_aulas(self, aulas):
         """
-        Encontra os vértices de maior quantidade de restrições dentre uma lista de vertices.
+        Conta as violações de R5 e R6, sem peso, de uma sequência de horários de um dia.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+            aulas (list of int): Vértice de cada horário do dia, ou -1 caso o horário esteja vago.
 
         Returns:
-            (list of Vertice): Lista com os vértices de maior quantidade de restrições.
+            tuple of (int, int): Quantidade de aulas geminadas em excesso (R5) e de janelas (R6).
         """
+        ocupados = [posicao for posicao, vertice in enumerate(aulas) if vertice >= 0]
+        janelas = ocupados[-1] - ocupados[0] + 1 - len(ocupados) if len(ocupados) > 0 else 0
+
+        geminadas = 0
+        sequencia = 0
+        materia_anterior = None
+        for vertice in aulas:
+            materia = self.materia[vertice] if vertice >= 0 else None
+            sequencia = sequencia + 1 if materia is not None and materia == materia_anterior else int(vertice >= 0)
+            if sequencia >= 3:
+                geminadas += 1
+            materia_anterior = materia
+
+        return geminadas, janelas
+
+    def penalidade_dia(self, turma, dia):
+        """
+        Calcula as penalidades R5 e R6, já ponderadas, de uma turma em um dia, a partir das contagens atuais
+        (contagens_turma_dia).
 
-        vertices = []
-        maior_quantidade = 0
+        Args:
+            turma (int): Índice da turma.
+            dia (int): Índice do dia.
 
-        for vertice in lista_de_vertices:
-            quantidade = vertice.qtd_restricao()
-            if quantidade > maior_quantidade:
-                maior_quantidade = quantidade
-                vertices = [vertice]
-            elif quantidade == maior_quantidade:
-                vertices.append(vertice)
+        Returns:
+            (int): Penalidade da turma no dia.
+        """
+        geminadas, janelas = self.contagens_turma_dia[(turma, dia)]
+        return self.pesos[0] * geminadas + self.pesos[1] * janelas
 
-        return vertices
+    def penalidade(self):
+        """
+        Calcula a penalidade total das restrições desejáveis da solução atual.
 
-    def vertices_com_horario_sequencia(self, lista_de_vertices):
+        Returns:
+            (int): Penalidade ponderada de R5, R6 e R7.
         """
-        Encontra os vértices que possuem sugestão de horário em sequencia dentre uma lista de vertices.
+        return self.penalidade_turmas + self.pesos[2] * self.preferencias_nao_atendidas
 
-        Caso nenhum vértice possua a sugestão, a lista passada como argumento é retornada.
+    def altera(self, alteracoes):
+        """
+        Altera o horário de um conjunto de vértices, atualizando a ocupação e as penalidades afetadas.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+            alteracoes (list of (int, int)): Pares (vértice, novo horário), com -1 para retirar o horário do vértice.
 
         Returns:
-            (list of Vertice): Lista com os vértices que possuem sugestão de horário.
+            (list of (int, int)): Alterações que desfazem as alterações realizadas, na ordem em que devem ser aplicadas.
         """
-        lista_aux = [vertice for vertice in lista_de_vertices if vertice.tem_horario_sequencia()]
+        desfazer = [(vertice, self.horario[vertice]) for vertice, _ in reversed(alteracoes)]
+        afetados = set()
+
+        for vertice, novo in alteracoes:
+            antigo = self.horario[vertice]
+            turma = self.turma[vertice]
+            professor = self.professor[vertice]
+
+            if antigo >= 0:
+                if self.ocupacao_turma[turma][antigo] == vertice:
+                    self.ocupacao_turma[turma][antigo] = -1
+                if self.ocupacao_professor[professor][antigo] == vertice:
+                    self.ocupacao_professor[professor][antigo] = -1
+                self.preferencias_nao_atendidas += self.preferidos[vertice] >> antigo & 1
+                self.aulas_horario[antigo] -= 1
+                self.cores -= self.aulas_horario[antigo] == 0
+                afetados.add((turma, antigo // self.aulas_por_dia))
+            else:
+                self.nao_alocados.discard(vertice)
+
+            if novo >= 0:
+                self.ocupacao_turma[turma][novo] = vertice
+                self.ocupacao_professor[professor][novo] = vertice
+                self.preferencias_nao_atendidas -= self.preferidos[vertice] >> novo & 1
+                self.cores += self.aulas_horario[novo] == 0
+                self.aulas_horario[novo] += 1
+                afetados.add((turma, novo // self.aulas_por_dia))
+            else:
+                self.nao_alocados.add(vertice)
 
-        return lista_aux if len(lista_aux) > 0 else lista_de_vertices
+            self.horario[vertice] = novo
 
-    def vertices_com_mais_preferencias(self, lista_de_vertices):
+        for turma, dia in afetados:
+            self.contagens_turma_dia[(turma, dia)] = self.contagens_dia(turma, dia)
+            penalidade = self.penalidade_dia(turma, dia)
+            self.penalidade_turmas += penalidade - self.penalidade_turma_dia[(turma, dia)]
+            self.penalidade_turma_dia[(turma, dia)] = penalidade
+
+        return desfazer
+
+    def variacao(self, alteracoes):
         """
-        Encontra os vértices com maior quantidade de preferências dentre uma lista de vertices.
+        Calcula a variação exata do objetivo causada por um movimento, sem aplicá-lo. Apenas os dias das turmas cujas
+        aulas mudam de horário são recontados, a partir de cópias dos seus horários com as aulas já movidas.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+            alteracoes (list of (int, int)): Pares (vértice, novo horário) do movimento, como em altera().
 
         Returns:
-            (list of Vertice): Lista com os vértices de maior quantidade de preferências.
+            tuple of (int, int, int, int, int): Variação da quantidade de aulas sem horário, das penalidades R5, R6 e
+            R7, sem peso, e da quantidade de cores.
         """
-        vertices = []
-        maior_quantidade = 0
-
-        for vertice in lista_de_vertices:
-            quantidade = vertice.qtd_preferencia()
-            if quantidade > maior_quantidade:
-                maior_quantidade = quantidade
-                vertices = [vertice]
-            elif quantidade == maior_quantidade:
-                vertices.append(vertice)
+        finais = dict(alteracoes)
+        sem_horario = preferencias = 0
+        aulas_horario = dict()
+        dias = dict()
+        for vertice, novo in finais.items():
+            antigo = self.horario[vertice]
+            if antigo == novo:
+                continue
+            turma = self.turma[vertice]
+            if antigo >= 0:
+                preferencias += self.preferidos[vertice] >> antigo & 1
+                aulas_horario[antigo] = aulas_horario.get(antigo, 0) - 1
+                dias.setdefault((turma, antigo // self.aulas_por_dia), [])
+            else:
+                sem_horario -= 1
+            if novo >= 0:
+                preferencias -= self.preferidos[vertice] >> novo & 1
+                aulas_horario[novo] = aulas_horario.get(novo, 0) + 1
+                dias.setdefault((turma, novo // self.aulas_por_dia), [])
+            else:
+                sem_horario += 1
+
+        geminadas = janelas = 0
+        for (turma, dia), aulas in dias.items():
+            inicio = dia * self.aulas_por_dia
+            aulas.extend(self.ocupacao_turma[turma][inicio:inicio + self.aulas_por_dia])
+            # As aulas movidas são retiradas dos horários antigos antes de ocuparem os novos, como em altera().
+            for vertice in finais:
+                antigo = self.horario[vertice]
+                if self.turma[vertice] == turma and 0 <= antigo - inicio < self.aulas_por_dia:
+                    if aulas[antigo - inicio] == vertice:
+                        aulas[antigo - inicio] = -1
+            for vertice, novo in finais.items():
+                if self.turma[vertice] == turma and 0 <= novo - inicio < self.aulas_por_dia:
+                    aulas[novo - inicio] = vertice
+            geminadas_antes, janelas_antes = self.contagens_turma_dia[(turma, dia)]
+            geminadas_depois, janelas_depois = self.contagens_aulas(aulas)
+            geminadas += geminadas_depois - geminadas_antes
+            janelas += janelas_depois - janelas_antes
+
+        cores = 0
+        for horario, diferenca in aulas_horario.items():
+            cores += (self.aulas_horario[horario] + diferenca > 0) - (self.aulas_horario[horario] > 0)
+
+        return sem_horario, geminadas, janelas, preferencias, cores
+
+    def avalia(self, alteracoes):
+        """
+        Avalia um movimento sem aplicá-lo (variacao()).
 
-        return vertices
+        Args:
+            alteracoes (list of (int, int)): Pares (vértice, novo horário) do movimento.
 
-    def escolher_vertice(self, lista_de_vertices):
+        Returns:
+            tuple of (int, int): Quantidade de aulas sem horário e penalidade da solução após o movimento.
         """
-        Escolhe o melhor vértice para aplicação da coloração de acordo com a heurística.
+        sem_horario, geminadas, janelas, preferencias, _ = self.variacao(alteracoes)
+        return (len(self.nao_alocados) + sem_horario,
+                self.penalidade() + self.pesos[0] * geminadas + self.pesos[1] * janelas + self.pesos[2] * preferencias)
 
-        Aplica-se, em sequência que respeite os critérios da heurística, os métodos para filtrar os vértices da lista
-        até que se encontre o melhor vértice.
+
+class BuscaTabu(Ocupacao):
+    """
+    Busca tabu com tempo limitado para melhorar uma coloração já existente, como a obtida por dsatur_com_heristica().
+
+    A busca parte dos horários atuais dos vértices e só realiza movimentos que respeitam as restrições obrigatórias
+    (R1 a R4). O objetivo é lexicográfico: primeiro minimizar a quantidade de aulas sem horário e depois a penalidade
+    das restrições desejáveis (R5, R6 e R7, ver Ocupacao).
+
+    A cada iteração um vértice é sorteado. Se houver aulas sem horário, sorteia-se uma delas e avalia-se sua inserção em
+    cada horário permitido, retirando do horário as aulas da mesma turma ou do mesmo professor que estejam nele
+    (movimento de ejeção). Caso contrário, sorteia-se uma aula com horário e avaliam-se sua mudança para horários livres
+    e sua troca de horário com as demais aulas da mesma turma. O melhor movimento não tabu é aplicado, mesmo que piore a
+    solução. Um movimento tabu só é aceito se levar a uma solução melhor que a melhor encontrada (critério de
+    aspiração). Após cada movimento, o retorno de um vértice ao horário que ele deixou é proibido por algumas iterações.
+
+    Attributes:
+        tabu (dict of (int, int): int): Iteração até a qual cada par (vértice, horário) é tabu.
+        curva (list of tuple): Evolução da melhor solução: (tempo, aulas sem horário, penalidade).
+        limite (tuple of (int, int)): Limite inferior do objetivo: aulas sem horário (LimitesInferiores) e penalidade
+            zero. A busca termina ao atingi-lo.
+        Além dos atributos de Ocupacao.
+    """
+
+    def __init__(self, horarios_de_aula, pesos=(1, 1, 1)):
+        """
+        Construtor da classe BuscaTabu.
 
         Args:
-            lista_de_vertices (list of Vertice): Lista com os vértices para busca.
+            horarios_de_aula (HorarioDeAulas): Instância já colorida. A busca parte da solução atual da instância.
+            pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
+        """
+        super().__init__(horarios_de_aula, pesos)
+        self.tabu = dict()
+        self.curva = []
+        self.limite = (horarios_de_aula.limites_inferiores().sem_horario, 0)
 
-        Returns:
-            (Vertice): Melhor vértice encontrado ou None caso não encontre nenhum.
+    def movimentos_insercao(self, vertice):
+        """
+        Gera os movimentos de inserção de uma aula sem horário, com a ejeção das aulas em conflito.
+
+        Args:
+            vertice (int): Índice do vértice sem horário.
 
+        Yields:
+            tuple of (int, list of (int, int)): Horário de destino e alterações do movimento.
         """
-        lista_de_vertices = self.vertices_com_mais_restricoes(lista_de_vertices)
-        lista_de_vertices = self.vertices_maior_grau_saturacao(lista_de_vertices)
-        lista_de_vertices = self.vertices_com_horario_sequencia(lista_de_vertices)
-        lista_de_vertices = self.vertices_com_mais_preferencias(lista_de_vertices)
+        turma = self.ocupacao_turma[self.turma[vertice]]
+        professor = self.ocupacao_professor[self.professor[vertice]]
+        for horario in range(self.quantidade_horarios):
+            if self.proibidos[vertice] >> horario & 1:
+                continue
+            ejetados = {turma[horario], professor[horario]} - {-1}
+            yield horario, [(ejetado, -1) for ejetado in ejetados] + [(vertice, horario)]
+
+    def movimentos_realocacao(self, vertice):
+        """
+        Gera os movimentos de uma aula com horário para horários livres e de troca com aulas da mesma turma.
 
-        return None if len(lista_de_vertices) == 0 else lista_de_vertices[0]
+        Args:
+            vertice (int): Índice do vértice com horário.
 
-    def escolher_horario(self, vertice, lista_de_horarios):
+        Yields:
+            tuple of (int, list of (int, int)): Horário de destino e alterações do movimento.
         """
-        Escolhe o melhor horário (cor) para um determinado vértice dada uma lista de horários.
+        atual = self.horario[vertice]
+        turma = self.ocupacao_turma[self.turma[vertice]]
+        professor = self.ocupacao_professor[self.professor[vertice]]
+        for horario in range(self.quantidade_horarios):
+            if horario == atual or self.proibidos[vertice] >> horario & 1:
+                continue
+
+            outro = turma[horario]
+            if outro < 0:
+                if professor[horario] < 0:
+                    yield horario, [(vertice, horario)]
+                continue
+
+            # Troca de horário com outra aula da mesma turma. O professor de cada aula deve estar livre no horário da
+            # outra, a não ser que seja o mesmo professor.
+            ocupacao_outro = self.ocupacao_professor[self.professor[outro]]
+            if (self.proibidos[outro] >> atual & 1
+                    or professor[horario] not in (-1, outro)
+                    or ocupacao_outro[atual] not in (-1, vertice)):
+                continue
+            yield horario, [(vertice, -1), (outro, atual), (vertice, horario)]
+
+    def executa(self, limite_tempo, semente=None, tamanho_tabu=10):
+        """
+        Executa a busca tabu até que o tempo limite seja atingido ou que a melhor solução atinja o limite inferior.
 
         Args:
-            vertice (Vertice): Vértice que se deseja definir horário (cor).
-            lista_de_horarios (list of Horario): Lista de horários (cores) disponíveis.
+            limite_tempo (float): Tempo limite, em segundos.
+            semente (int|None): Semente do sorteio dos vértices.
+            tamanho_tabu (int): Quantidade mínima de iterações em que um movimento permanece tabu. A cada movimento é
+                somado um valor aleatório de até tamanho_tabu iterações.
 
         Returns:
-            (Horario|None): Melhor horário encontrado ou None caso não encontre nenhum horário.
+            (list of int): Horário de cada vértice na melhor solução encontrada, ou -1 para vértices sem horário.
         """
-        horarios_preferidos = vertice.horarios_preferidos()
+        aleatorio = random.Random(semente)
+        inicio = time.perf_counter()
+        melhor = (len(self.nao_alocados), self.penalidade())
+        melhor_horario = list(self.horario)
+        self.curva.append((0.0, melhor[0], melhor[1]))
+
+        iteracao = 0
+        while melhor > self.limite and len(self.horario) > 0:
+            if iteracao % 64 == 0 and time.perf_counter() - inicio >= limite_tempo:
+                break
+            iteracao += 1
+
+            if len(self.nao_alocados) > 0:
+                vertice = aleatorio.choice(tuple(self.nao_alocados))
+                movimentos = self.movimentos_insercao(vertice)
+            else:
+                vertice = aleatorio.randrange(len(self.horario))
+                movimentos = self.movimentos_realocacao(vertice)
 
-        for horario in horarios_preferidos:
-            # Percorre cada horário preferido verificando se algum é horário restrito para o vértice.
-            if vertice.tem_restricao(horario):
-                # Caso seja, o retira da lista.
-                horarios_preferidos.remove(horario)
+            escolhido = None
+            for horario, alteracoes in movimentos:
+                resultado = self.avalia(alteracoes)
+                if self.tabu.get((vertice, horario), 0) >= iteracao and resultado >= melhor:
+                    continue
+                if escolhido is None or resultado < escolhido[0]:
+                    escolhido = (resultado, alteracoes)
 
-        if len(horarios_preferidos) > 0:
-            return horarios_preferidos[0]
-        else:
-            # Se não houver horários preferidos, deve-se buscar dentre todos os horários disponíveis iniciando do menor
-            # horário utilizado até o momento.
-            horarios_com_restricao_leve = []
-            id_horario = self.indice_menor_horario_utilizado(lista_de_horarios)
-            flag = 0
-            qtd_horarios = len(lista_de_horarios)
-            encontrado = False
-            while flag < qtd_horarios and not encontrado:
-                horario = lista_de_horarios[id_horario % qtd_horarios]
+            if escolhido is None:
+                continue
 
-                if vertice.tem_restricao_leve(horario) and not vertice.tem_restricao(horario):
-                    # Se o vértice possui apenas restrição leve (restrição de 3 aulas em sequência), adiciona horário na
-                    # lista de restrições leves
-                    horarios_com_restricao_leve.append(horario)
+            resultado, alteracoes = escolhido
+            for alterado, _ in alteracoes:
+                if self.horario[alterado] >= 0:
+                    duracao = tamanho_tabu + aleatorio.randint(0, tamanho_tabu)
+                    self.tabu[(alterado, self.horario[alterado])] = iteracao + duracao
+            self.altera(alteracoes)
 
-                if not vertice.tem_restricao(horario, True):
-                    encontrado = True
-                else:
-                    id_horario += 1
-                flag += 1
+            if resultado < melhor:
+                melhor = resultado
+                melhor_horario = list(self.horario)
+                self.curva.append((time.perf_counter() - inicio, melhor[0], melhor[1]))
 
-            if encontrado:
-                return lista_de_horarios[id_horario % qtd_horarios]
-            elif not encontrado and len(horarios_com_restricao_leve) > 0:
-                return horarios_com_restricao_leve[0]
-            else:
-                return None
+        return melhor_horario
 
-    def define_horario(self, vertice, horario, lista_de_horarios, vertices_nao_coloridos):
+
+class Editor(Ocupacao):
+    """
+    Consultas e ajustes manuais sobre uma coloração já existente, como os de um editor de horários: em quais horários
+    uma aula pode ser colocada, se duas aulas podem trocar de horário e qual o efeito de cada mudança nas restrições
+    desejáveis.
+
+    Além da ocupação de cada horário, o editor mantém a máscara de bits dos horários ocupados de cada turma e de cada
+    professor. Assim, os horários livres de uma aula são obtidos com operações sobre três máscaras, e as consultas de
+    movimento e de troca verificam as restrições obrigatórias (R1 a R4) em tempo constante. A avaliação e a aplicação
+    de uma mudança recalculam apenas as penalidades dos dias das turmas afetadas.
+
+    As mudanças são aplicadas apenas ao editor. Para substituir a solução da instância, utilize aplica().
+
+    Attributes:
+        todos (int): Máscara de bits com todos os horários.
+        ocupados_turma (list of int): Máscara de bits dos horários ocupados de cada turma.
+        ocupados_professor (list of int): Máscara de bits dos horários ocupados de cada professor.
+        Além dos atributos de Ocupacao.
+    """
+
+    def __init__(self, horarios_de_aula, pesos=(1, 1, 1)):
         """
-        Define horário (colore) de um determinado vértice.
+        Construtor da classe Editor.
 
         Args:
-            vertice (Vertice): Vértice que será definido um horário (cor).
-            horario (Horario): Horário (cor) definido para o vértice.
-            lista_de_horarios (list of Horario): Lista de horários disponíveis.
-            vertices_nao_coloridos (list of Vertice): Lista de vértices não coloridos)
+            horarios_de_aula (HorarioDeAulas): Instância já colorida. O editor parte da solução atual da instância.
+            pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
         """
-        horario.add_vertice(vertice)
-        self.quantidade_vertices_sem_horario -= 1
-        # Verifica se horário é preferência do professor e incrementa em um a quantidade de preferências atendidas.
-        if vertice.professor.tem_preferencia(horario):
-            vertice.professor.preferencia_atendida()
-            self.preferencias_atendidas = self.preferencias_atendidas + 1
-
-        horario_seguinte = lista_de_horarios.index(horario) + 1
-        horario_anterior = lista_de_horarios.index(horario) - 1
+        super().__init__(horarios_de_aula, pesos)
+        self.todos = (1 << self.quantidade_horarios) - 1
+        self.ocupados_turma = [0] * len(self.ocupacao_turma)
+        self.ocupados_professor = [0] * len(self.ocupacao_professor)
+        for vertice, horario in enumerate(self.horario):
+            if horario >= 0:
+                self.ocupados_turma[self.turma[vertice]] |= 1 << horario
+                self.ocupados_professor[self.professor[vertice]] |= 1 << horario
+
+    def altera(self, alteracoes):
+        """
+        Altera o horário de um conjunto de vértices (Ocupacao.altera()), atualizando também as máscaras dos horários
+        ocupados.
 
-        # Não faz sentido dar preferencia em aula em sequencia, caso ela seja a primeira do dia seguinte por isso a
-        # condicao após o and
-        horario_seguinte = (horario_seguinte if (horario_seguinte < len(lista_de_horarios)
-                                                 and horario_seguinte % self.aulas_por_dia != 0)
-                            else None)
+        Args:
+            alteracoes (list of (int, int)): Pares (vértice, novo horário), com -1 para retirar o horário do vértice.
 
-        # Não faz sentido dar preferencia em aula em sequencia, caso ela seja a última do dia anterior por isso a
-        # condicao após o and
-        horario_anterior = (horario_anterior if (horario_anterior >= 0
-                                                 and horario_anterior % self.aulas_por_dia != self.aulas_por_dia - 1)
-                            else None)
+        Returns:
+            (list of (int, int)): Alterações que desfazem as alterações realizadas, na ordem em que devem ser aplicadas.
+        """
+        antigos = [self.horario[vertice] for vertice, _ in alteracoes]
+        desfazer = super().altera(alteracoes)
+        for (vertice, novo), antigo in zip(alteracoes, antigos):
+            turma = self.turma[vertice]
+            professor = self.professor[vertice]
+            for horario in (antigo, novo):
+                if horario < 0:
+                    continue
+                bit = 1 << horario
+                if self.ocupacao_turma[turma][horario] >= 0:
+                    self.ocupados_turma[turma] |= bit
+                else:
+                    self.ocupados_turma[turma] &= ~bit
+                if self.ocupacao_professor[professor][horario] >= 0:
+                    self.ocupados_professor[professor] |= bit
+                else:
+                    self.ocupados_professor[professor] &= ~bit
+        return desfazer
 
-        for vizinho in self.vizinhos_nao_coloridos(vertice, vertices_nao_coloridos):
-            vizinho.incrementa_grau_saturacao()
-            # Adiciona o horário que está sendo colorido como restrição a todos os vértices vizinhos.
-            vizinho.add_restricao(horario)
-            if self.prioridade_aula_sequencial and vizinho.eh_igual(vertice):
-                if vertice.eh_horario_sequencia(horario):
-                    # Se o vértice que está sendo definido o horario já for uma aula em sequência, adiciona o horário seguinte e
-                    # anterior como restrição leve aos vértices vizinhos que são a mesma materia e turma.
-                    if horario_seguinte is not None:
-                        vizinho.add_restricao_leve(lista_de_horarios[horario_seguinte])
+    def mascara_livres(self, vertice):
+        """
+        Calcula a máscara de bits dos horários para os quais uma aula pode ser movida sem retirar outras aulas: horários
+        permitidos à turma e ao professor em que ambos estão vagos.
 
-                    if horario_anterior is not None:
-                        vizinho.add_restricao_leve(lista_de_horarios[horario_anterior])
-                else:
-                    # Se não for aula em sequência, adiciona o horário seguinte e anterior como preferencia aos vértices iguais.
-                    if horario_seguinte is not None:
-                        vizinho.add_horario_sequencia(lista_de_horarios[horario_seguinte])
+        Args:
+            vertice (int): Índice do vértice.
 
-                    if horario_anterior is not None:
-                        vizinho.add_horario_sequencia(lista_de_horarios[horario_anterior])
+        Returns:
+            (int): Máscara de bits dos horários livres.
+        """
+        return self.todos & ~(self.proibidos[vertice] | self.ocupados_turma[self.turma[vertice]]
+                              | self.ocupados_professor[self.professor[vertice]])
 
-    def vizinhos_nao_coloridos(self, vertice, vertices_nao_coloridos):
+    def horarios_livres(self, vertice):
         """
-        Encontra todos os vizinhos de um determinado vértice que ainda não estão coloridos.
+        Lista os horários para os quais uma aula pode ser movida sem retirar outras aulas.
 
         Args:
-            vertice (Vertice): Vértice que se deseja encontrar a vizinha descolorida.
-            vertices_nao_coloridos (list of Vertice): Lista de vértices não coloridos.
+            vertice (int): Índice do vértice.
 
-        Return:
-            (list of Vertice): Vizinhos não coloridos.
+        Returns:
+            (list of int): Índices dos horários livres, em ordem crescente.
         """
-        return [vizinho for vizinho in self.lista_adjacencia[vertice] if vizinho in vertices_nao_coloridos]
-
-    def indice_menor_horario_utilizado(self, lista_de_horarios):
+        livres = []
+        mascara = self.mascara_livres(vertice)
+        while mascara:
+            bit = mascara & -mascara
+            livres.append(bit.bit_length() - 1)
+            mascara ^= bit
+        return livres
+
+    def pode_mover(self, vertice, horario):
         """
-        Encontra o horário de menor índice utilizado em uma determinada lista de horários.
+        Verifica se uma aula pode ser movida para um horário sem retirar outras aulas.
 
         Args:
-            lista_de_horarios (list of Horario): Lista de horários.
+            vertice (int): Índice do vértice.
+            horario (int): Índice do horário de destino, ou -1 para retirar o horário da aula, o que é sempre possível.
 
         Returns:
-            (int): Menor índice como horário utilizado.
+            (bool): True se o movimento respeita as restrições obrigatórias.
         """
-        indice = 0;
-        encontrado = False
-        while not encontrado and indice < len(lista_de_horarios):
-            if len(lista_de_horarios[indice].vertices) > 0:
-                encontrado = True
-            else:
-                indice += 1
+        if horario < 0:
+            return True
+        return 0 <= horario < self.quantidade_horarios and bool(self.mascara_livres(vertice) >> horario & 1)
+
+    def pode_trocar(self, vertice, outro):
+        """
+        Verifica se duas aulas com horário podem trocar de horário entre si.
 
-        return indice
+        Args:
+            vertice (int): Índice do primeiro vértice.
+            outro (int): Índice do segundo vértice.
 
-    def proporcao_preferencias_atendidas(self):
+        Returns:
+            (bool): True se a troca respeita as restrições obrigatórias.
         """
-        Calcula a proporção entre a quantidade de preferências atendidas e o total de preferências existentes.
+        horario = self.horario[vertice]
+        horario_outro = self.horario[outro]
+        if horario < 0 or horario_outro < 0 or horario == horario_outro:
+            return False
+        if self.proibidos[vertice] >> horario_outro & 1 or self.proibidos[outro] >> horario & 1:
+            return False
+        # Cada aula só pode ocupar o horário da outra se a sua turma e o seu professor estiverem vagos nele ou
+        # ocupados pela própria outra aula.
+        return (self.ocupacao_turma[self.turma[vertice]][horario_outro] in (-1, outro)
+                and self.ocupacao_professor[self.professor[vertice]][horario_outro] in (-1, outro)
+                and self.ocupacao_turma[self.turma[outro]][horario] in (-1, vertice)
+                and self.ocupacao_professor[self.professor[outro]][horario] in (-1, vertice))
+
+    def alteracoes_troca(self, vertice, outro):
+        """
+        Monta as alterações da troca de horário entre duas aulas.
+
+        Args:
+            vertice (int): Índice do primeiro vértice.
+            outro (int): Índice do segundo vértice.
 
         Returns:
-            (float): Proporção entre quantidade de preferências atendidas e o total de preferências existentes.
+            (list of (int, int)): Alterações da troca.
         """
-        return self.preferencias_atendidas / self.total_preferencias
+        return [(vertice, -1), (outro, self.horario[vertice]), (vertice, self.horario[outro])]
 
-    def quantidade_horarios_utilizados(self):
+    def efeito(self, alteracoes):
         """
-        Encontra a quantidade de horários (cores) utilizados.
+        Calcula o efeito de um conjunto de alterações, sem aplicá-las (Ocupacao.variacao()).
+
+        Args:
+            alteracoes (list of (int, int)): Pares (vértice, novo horário).
 
         Returns:
-            (int): Quantidade de horários utilizados.
+            (dict): Variação da quantidade de preferências atendidas ('preferencias'), de aulas geminadas em excesso
+            ('R5'), de janelas ('R6'), de aulas sem horário ('sem_horario'), de cores ('cores') e da penalidade
+            ponderada ('penalidade').
         """
-        qtd = 0
-        for dia in self.horarios:
-            for horario in self.horarios[dia]:
-                if len(self.horarios[dia][horario].vertices) > 0:
-                    qtd += 1
-        return qtd
-
-    def gerar_horarios_por_turma(self, nome_arquivo_saida):
+        sem_horario, geminadas, janelas, preferencias, cores = self.variacao(alteracoes)
+        return {
+            'preferencias': -preferencias,
+            'R5': geminadas,
+            'R6': janelas,
+            'sem_horario': sem_horario,
+            'cores': cores,
+            'penalidade': self.pesos[0] * geminadas + self.pesos[1] * janelas + self.pesos[2] * preferencias,
+        }
+
+    def efeito_movimento(self, vertice, horario):
         """
-        Gera um arquivo .xlsx com os horários das turmas.
+        Calcula o efeito de mover uma aula para um horário (efeito()), sem verificar se o movimento é possível.
 
         Args:
-            nome_arquivo_saida (list of Horario): Nome do arquivo de saída.
+            vertice (int): Índice do vértice.
+            horario (int): Índice do horário de destino, ou -1 para retirar o horário da aula.
+
+        Returns:
+            (dict): Variações calculadas por efeito().
         """
-        dias = list(self.horarios.keys())
-        horas = list(self.horarios[dias[0]].keys())
+        return self.efeito([(vertice, horario)])
 
-        lista_de_horarios = []
-        for dia in dias:
-            for horario in horas:
-                lista_de_horarios.append(self.horarios[dia][horario])
+    def efeito_troca(self, vertice, outro):
+        """
+        Calcula o efeito da troca de horário entre duas aulas (efeito()), sem verificar se a troca é possível.
 
-        planilha = Workbook()
-        for turma in self.turmas:
-            horario = planilha.create_sheet(str(turma))
-            horario.cell(row=1, column=1, value=str(turma))
+        Args:
+            vertice (int): Índice do primeiro vértice.
+            outro (int): Índice do segundo vértice.
 
-            coluna = 2
-            for dia in dias:
-                horario.cell(row=2, column=coluna, value=dia)
-                coluna += 1
-                horario.column_dimensions[chr(coluna + 95)].width = 20
+        Returns:
+            (dict): Variações calculadas por efeito().
+        """
+        return self.efeito(self.alteracoes_troca(vertice, outro))
 
-            linha = 3
-            for hora in horas:
-                horario.cell(row=linha, column=1, value=hora)
-                linha += 1
+    def move(self, vertice, horario):
+        """
+        Move uma aula para um horário.
 
-        for horario in lista_de_horarios:
-            coluna = dias.index(horario.dia) + 2
-            linha = horas.index(horario.hora) + 3
-            for vertice in horario.vertices:
-                materia = vertice.materia
-                turma = str(vertice.turma.nome)
-                professor = vertice.professor.nome
+        Args:
+            vertice (int): Índice do vértice.
+            horario (int): Índice do horário de destino, ou -1 para retirar o horário da aula.
 
-                planilha[turma].cell(row=linha, column=coluna, value='{} ({})'.format(materia, professor))
+        Returns:
+            (dict): Variações causadas pelo movimento, como em efeito().
 
-        del planilha['Sheet']
-        planilha.save(nome_arquivo_saida + '.xlsx')
+        Raises:
+            ValueError: Caso o movimento não respeite as restrições obrigatórias.
+        """
+        if not self.pode_mover(vertice, horario):
+            raise ValueError('A aula {} não pode ser movida para o horário {}.'.format(vertice, horario))
+        efeito = self.efeito_movimento(vertice, horario)
+        self.altera([(vertice, horario)])
+        return efeito
 
-    def gerar_horarios_por_professor(self, nome_arquivo_saida):
+    def troca(self, vertice, outro):
         """
-        Gera um arquivo .xlsx com os horários dos professores.
+        Troca o horário de duas aulas.
 
         Args:
-            nome_arquivo_saida (list of Horario): Nome do arquivo de saída.
-        """
-        dias = list(self.horarios.keys())
-        horas = list(self.horarios[dias[0]].keys())
+            vertice (int): Índice do primeiro vértice.
+            outro (int): Índice do segundo vértice.
 
-        lista_de_horarios = []
-        for dia in dias:
-            for horario in horas:
-                lista_de_horarios.append(self.horarios[dia][horario])
+        Returns:
+            (dict): Variações causadas pela troca, como em efeito().
 
-        planilha = Workbook()
-        for professor in sorted(self.professores):
-            horario = planilha.create_sheet(str(professor))
-            horario.cell(row=1, column=1, value=str(professor))
+        Raises:
+            ValueError: Caso a troca não respeite as restrições obrigatórias.
+        """
+        if not self.pode_trocar(vertice, outro):
+            raise ValueError('As aulas {} e {} não podem trocar de horário.'.format(vertice, outro))
+        efeito = self.efeito_troca(vertice, outro)
+        self.altera(self.alteracoes_troca(vertice, outro))
+        return efeito
 
-            coluna = 2
-            for dia in dias:
-                horario.cell(row=2, column=coluna, value=dia)
-                coluna += 1
-                horario.column_dimensions[chr(coluna + 95)].width = 20
+    def aplica(self):
+        """
+        Substitui a solução da instância pela solução atual do editor (HorarioDeAulas.aplica_solucao()).
+        """
+        self.horarios_de_aula.aplica_solucao(list(self.horario))
 
-            linha = 3
-            for hora in horas:
-                horario.cell(row=linha, column=1, value=hora)
-                linha += 1
 
-        for horario in lista_de_horarios:
-            coluna = dias.index(horario.dia) + 2
-            linha = horas.index(horario.hora) + 3
-            for vertice in horario.vertices:
-                materia = vertice.materia
-                turma = str(vertice.turma.nome)
-                professor = vertice.professor.nome
+class Verificador(object):
+    """
+    Verificador de soluções, que confere as restrições obrigatórias (R1 a R4) e calcula as penalidades das restrições
+    desejáveis (R5 a R7) de qualquer atribuição de horários às aulas.
+
+    A verificação é feita com mapas de ocupação de cada horário por turma e por professor, montados com o numpy em
+    tempo linear na quantidade de aulas (mais turmas e professores vezes horários). As restrições das turmas e dos
+    professores e as preferências são convertidas em matrizes booleanas na construção do verificador, que pode então
+    ser utilizado para verificar várias soluções da mesma instância, como as de cada início ou de cada passo de uma
+    busca local. As penalidades são as mesmas da BuscaTabu.
+
+    As violações são dicionários com a restrição violada ('restricao'), o índice do horário ('horario') e os vértices
+    envolvidos ('vertices'):
+        - R1: aulas do mesmo professor no mesmo horário;
+        - R2: aulas da mesma turma no mesmo horário;
+        - R3: aula em um horário inexistente ou restrito à sua turma;
+        - R4: aula em um horário restrito ao seu professor.
+    As aulas sem horário também desrespeitam R3, mas são apenas contadas, já que a coloração pode não alocar todas.
 
-                planilha[professor].cell(row=linha, column=coluna, value='{} ({})'.format(turma, materia))
+    Attributes:
+        quantidade_horarios (int): Quantidade de horários (cores).
+        aulas_por_dia (int): Número de aulas por dia.
+        pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
+        turma (numpy.ndarray): Índice da turma de cada vértice.
+        professor (numpy.ndarray): Índice do professor de cada vértice.
+        materia (numpy.ndarray): Índice da matéria de cada vértice.
+        restrito_turma (numpy.ndarray): Matriz (turmas, horários) com True nos horários restritos de cada turma.
+        restrito_professor (numpy.ndarray): Matriz (professores, horários) com True nos horários restritos de cada
+            professor.
+        preferido_professor (numpy.ndarray): Matriz (professores, horários) com True nos horários preferidos de cada
+            professor.
+        total_preferencias (int): Total de preferências dos professores.
+    """
 
-        del planilha['Sheet']
-        planilha.save(nome_arquivo_saida + '.xlsx')
+    def __init__(self, horarios_de_aula, pesos=(1, 1, 1)):
+        """
+        Construtor da classe Verificador.
 
-    def imprimir_resultados(self):
+        Args:
+            horarios_de_aula (HorarioDeAulas): Instância cujas soluções serão verificadas.
+            pesos (tuple of (int, int, int)): Pesos das penalidades R5, R6 e R7.
         """
-        Método para impressão dos resultados obtidos.
+        grafo = horarios_de_aula.grafo
+        self.quantidade_horarios = len(horarios_de_aula.lista_de_horarios)
+        self.aulas_por_dia = horarios_de_aula.aulas_por_dia
+        self.pesos = pesos
+        self.turma = grafo.turma.astype(np.int64)
+        self.professor = grafo.professor.astype(np.int64)
+        materias = dict()
+        self.materia = np.array([materias.setdefault(vertice.materia, len(materias))
+                                 for vertice in horarios_de_aula.vertices], dtype=np.int64)
+        professores = list(horarios_de_aula.professores.values())
+        self.restrito_turma = self.matriz([turma.restricoes for turma in horarios_de_aula.turmas.values()])
+        self.restrito_professor = self.matriz([professor.restricoes for professor in professores])
+        self.preferido_professor = self.matriz([professor.mascara_preferencias for professor in professores])
+        self.total_preferencias = horarios_de_aula.total_preferencias
+
+    def matriz(self, mascaras):
         """
-        nome_escola = self.arquivo.split('/')[-1].split('.xlsx')[0]
-        print(nome_escola + ':')
-        print('\nQuantidade de cores:', self.quantidade_horarios_utilizados())
-        print('\nVértices não coloridos:', self.quantidade_vertices_sem_horario)
-        print('\nPreferências atendidas sobre o total de preferências:', self.proporcao_preferencias_atendidas())
-        print('\nQuantidade de preferências não atendidas para cada professor (somente dos professores que possuem preferências):')
-        for professor in sorted(self.professores):
-            professor = self.professores[professor]
-            if professor.qtd_preferencias_nao_atendidas() is not None:
-                print('{}: {}'.format(professor.nome, professor.qtd_preferencias_nao_atendidas()))
+        Converte máscaras de bits de horários em uma matriz booleana.
 
+        Args:
+            mascaras (list of int): Máscaras de bits.
 
-def main():
-    argumentos = argparse.ArgumentParser()
-    argumentos.add_argument('--file', action='store', dest='arquivo',
-                        default='', required=True,
-                        help='Arquivo de extensão .xlxs com os dados da escola.')
-
-    argumentos.add_argument('--aulas-sequenciais', action='store', dest='aulas_sequenciais',
-                        default='N', choices=['S', 'N'], required=False,
-                        help='[S/N] Opção de priorizar aulas sequencias.')
+        Returns:
+            (numpy.ndarray): Matriz (máscaras, horários) com True nos bits ligados.
+        """
+        bits = np.unpackbits(mascaras_para_bytes(mascaras, self.quantidade_horarios), axis=1, bitorder='little')
+        return bits[:, :self.quantidade_horarios].astype(bool)
 
-    argumentos.add_argument('--gerar-horarios-turmas', action='store', dest='horario_turma',
-                        default=False, required=False,
-                        help='Nome do desejado para o arquivo gerado com os horários de aula por turmas.')
+    def verifica(self, horarios):
+        """
+        Verifica uma atribuição de horários às aulas.
 
-    argumentos.add_argument('--gerar-horarios-professores', action='store', dest='horario_professor',
-                        default=False, required=False,
-                        help='Nome do desejado para o arquivo gerado com os horários de aula por professores.')
+        Args:
+            horarios (list of int|numpy.ndarray): Índice do horário de cada vértice, ou -1 para vértices sem horário.
+
+        Returns:
+            (dict): Violações das restrições obrigatórias ('violacoes', ordenadas pela restrição e pelos vértices),
+            quantidade de aulas sem horário ('sem_horario'), penalidades sem peso de cada restrição desejável ('R5',
+            'R6' e 'R7') e penalidade ponderada ('penalidade').
+        """
+        quantidade_horarios = self.quantidade_horarios
+        horario = np.asarray(horarios, dtype=np.int64)
+        violacoes = []
+
+        validos = (horario >= 0) & (horario < quantidade_horarios)
+        for vertice in np.flatnonzero(~validos & (horario != -1)).tolist():
+            violacoes.append({'restricao': 'R3', 'horario': int(horario[vertice]), 'vertices': [vertice]})
+        alocados = np.flatnonzero(validos)
+        horario = horario[alocados]
+        turma = self.turma[alocados]
+        professor = self.professor[alocados]
+
+        for restricao, grupo, quantidade_grupos in (('R1', professor, len(self.restrito_professor)),
+                                                    ('R2', turma, len(self.restrito_turma))):
+            # Cada par (grupo, horário) é uma posição do mapa de ocupação.
+            chave = grupo * quantidade_horarios + horario
+            ocupacao = np.bincount(chave, minlength=quantidade_grupos * quantidade_horarios)
+            conflitos = dict()
+            for posicao in np.flatnonzero(ocupacao[chave] > 1).tolist():
+                conflitos.setdefault(int(chave[posicao]), []).append(int(alocados[posicao]))
+            for posicao, vertices in conflitos.items():
+                violacoes.append({'restricao': restricao, 'horario': posicao % quantidade_horarios,
+                                  'vertices': vertices})
+
+        for restricao, restritos in (('R3', self.restrito_turma[turma, horario]),
+                                     ('R4', self.restrito_professor[professor, horario])):
+            for posicao in np.flatnonzero(restritos).tolist():
+                violacoes.append({'restricao': restricao, 'horario': int(horario[posicao]),
+                                  'vertices': [int(alocados[posicao])]})
+        violacoes.sort(key=lambda violacao: (violacao['restricao'], violacao['vertices']))
+
+        geminadas, janelas = self.penalidades_turmas(turma, horario, self.materia[alocados])
+        nao_atendidas = self.total_preferencias - int(np.count_nonzero(self.preferido_professor[professor, horario]))
+        return {
+            'violacoes': violacoes,
+            'sem_horario': int(np.count_nonzero(np.asarray(horarios) == -1)),
+            'R5': geminadas,
+            'R6': janelas,
+            'R7': nao_atendidas,
+            'penalidade': self.pesos[0] * geminadas + self.pesos[1] * janelas + self.pesos[2] * nao_atendidas,
+        }
+
+    def penalidades_turmas(self, turma, horario, materia):
+        """
+        Calcula as penalidades R5 e R6, sem peso, de todas as turmas em todos os dias, como BuscaTabu.penalidade_dia().
+
+        Args:
+            turma (numpy.ndarray): Turma de cada aula alocada.
+            horario (numpy.ndarray): Horário de cada aula alocada.
+            materia (numpy.ndarray): Matéria de cada aula alocada.
+
+        Returns:
+            tuple of (int, int): Aulas geminadas a partir da terceira seguida (R5) e janelas (R6).
+        """
+        aulas_por_dia = max(self.aulas_por_dia, 1)
+        dias = self.quantidade_horarios // aulas_por_dia
+        grade = np.full((len(self.restrito_turma), dias * aulas_por_dia), -1, dtype=np.int64)
+        dentro = horario < dias * aulas_por_dia
+        grade[turma[dentro], horario[dentro]] = materia[dentro]
+        grade = grade.reshape(len(self.restrito_turma), dias, aulas_por_dia)
+
+        # Janelas: horários vagos entre a primeira e a última aula de cada turma em cada dia.
+        ocupado = grade >= 0
+        aulas = ocupado.sum(axis=2)
+        primeira = ocupado.argmax(axis=2)
+        ultima = aulas_por_dia - 1 - ocupado[:, :, ::-1].argmax(axis=2)
+        janelas = int(np.where(aulas > 0, ultima - primeira + 1 - aulas, 0).sum())
+
+        # Geminadas: comprimento da sequência de aulas da mesma matéria que termina em cada horário.
+        geminadas = 0
+        sequencia = np.zeros(grade.shape[:2], dtype=np.int64)
+        anterior = np.full(grade.shape[:2], -1, dtype=np.int64)
+        for posicao in range(aulas_por_dia):
+            atual = grade[:, :, posicao]
+            sequencia = np.where((atual >= 0) & (atual == anterior), sequencia + 1, (atual >= 0).astype(np.int64))
+            geminadas += int(np.count_nonzero(sequencia >= 3))
+            anterior = atual
+        return geminadas, janelas
+
+
+class Perfil(object):
+    """
+    Registro do tempo de cada etapa da execução e de contadores das operações mais executadas.
+
+    Um mesmo objeto pode ser compartilhado por várias etapas e execuções: os tempos e os contadores de mesmo nome são
+    acumulados. Quando o HorarioDeAulas não recebe um Perfil, nenhuma medição é feita.
+
+    Attributes:
+        tempos (dict of str: float): Tempo acumulado, em segundos, de cada etapa.
+        contadores (dict of str: int): Valor de cada contador.
+    """
+
+    def __init__(self):
+        """
+        Construtor da classe Perfil.
+        """
+        self.tempos = dict()
+        self.contadores = dict()
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Mede o tempo do bloco executado dentro do with e o acumula no tempo da etapa.
+
+        Args:
+            nome (str): Nome da etapa.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] = self.tempos.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def conta(self, nome, quantidade=1):
+        """
+        Incrementa um contador.
+
+        Args:
+            nome (str): Nome do contador.
+            quantidade (int): Valor a ser somado ao contador.
+        """
+        self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def soma(self, nomes):
+        """
+        Soma os tempos de um conjunto de etapas. Etapas que não foram executadas são ignoradas.
+
+        Args:
+            nomes (iterable of str): Nomes das etapas.
+
+        Returns:
+            (float): Tempo total, em segundos.
+        """
+        return sum(self.tempos.get(nome, 0.0) for nome in nomes)
+
+    def como_dicionario(self):
+        """
+        Retorna os tempos e os contadores em um dicionário que pode ser convertido para JSON.
+
+        Returns:
+            (dict): Dicionário com as chaves 'tempos' e 'contadores'.
+        """
+        return {'tempos': dict(self.tempos), 'contadores': dict(self.contadores)}
+
+    def salva(self, nome_arquivo):
+        """
+        Salva os tempos e os contadores em um arquivo JSON.
+
+        Args:
+            nome_arquivo (str): Nome do arquivo gerado.
+        """
+        with open(nome_arquivo, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.como_dicionario(), arquivo, indent=2, ensure_ascii=False)
+
+
+class HorarioDeAulas(object):
+    """
+    Classe com métodos para ler uma planilha, analisar os dados e alocar as aulas nos horários permitidos.
+
+    A instância pode ser lida de três formatos, todos com as mesmas planilhas (Dados, Configuracoes, Restricao,
+    Restricoes Turma e Preferencias) e as mesmas colunas:
+        - arquivo .xlsx, com uma planilha para cada parte da instância;
+        - diretório com um arquivo .csv para cada planilha (por exemplo, 'Dados.csv'), cada um com uma linha de
+          cabeçalho;
+        - arquivo .jsonl, com um objeto JSON por linha no formato {"planilha": "Dados", "valores": [...]}, sem
+          cabeçalhos.
+
+    Attributes:
+        arquivo (str): Nome do arquivo (ou diretório) passado como parâmetro.
+        formato (str): Formato da instância: 'xlsx', 'csv' ou 'jsonl'.
+        planilha (Workbook): Arquivo .xlsx lido com a biblioteca openpyxl, aberto somente para leitura. O arquivo é
+            fechado ao final da leitura. None para os demais formatos.
+        turmas (dict of str: Restricao): Dicionário indexado pelo nome da turma e objeto do tipo Restricao como valor.
+        professores (dict of str: Professor): Dicionário indexado pelo nome do professor e objeto do tipo Professor como valor.
+        horarios (dict of str: (dict of str: Horario)): Dicionário indexado na primeira camada com os nomes dos dias e na segunda com horários.
+        horarios_por_dia_hora (dict of (str, str): Horario): Dicionário indexado pelo par (dia, hora) de cada horário.
+        aulas_por_dia (int): Número de aulas que a instituição oferece por dia.
+        lista_de_horarios (list of Horario): Lista de horários (cores) possíveis, indexada pelo índice de cada horário.
+        vertice (list of Vertice): Lista de vértices (aulas) do grafo, indexada pelo índice de cada vértice no núcleo.
+        grafo (Grafo): Núcleo do grafo, onde é realizada a coloração.
+        total_preferencias (int): Total de preferências dos professores
+        solucao (Solucao): Solução atual, resultado da última coloração. Os métodos de consulta e de geração de arquivos
+            utilizam essa solução.
+        limites (LimitesInferiores|None): Limites inferiores, calculados na primeira chamada de limites_inferiores().
+        verificador (Verificador|None): Verificador de soluções, montado na primeira chamada de verifica().
+        prioridade_aula_sequencial (bool|str): True para priorizar o máximo de aulas em sequencia igual a 2, False para não analisar isso. False é o valor default.
+            AULAS_EM_BLOCOS para o modo de blocos.
+        aulas_em_blocos (bool): True no modo de blocos, em que as cópias de uma aula são coloridas em pares de horários
+            seguidos do mesmo dia (define_bloco()).
+        sugere_horarios_sequencia (bool): True quando prioridade_aula_sequencial é True, em que os horários vizinhos de
+            cada cópia colorida são sugeridos às demais cópias da aula (define_horario()).
+        mascara_inicios_bloco (int|None): Máscara de bits dos horários que podem iniciar um bloco, calculada na primeira
+            chamada de escolher_bloco().
+        perfil (Perfil|None): Registro dos tempos das etapas e dos contadores, ou None para não medir a execução.
+    """
+
+    # Versão do formato do cache. Deve ser incrementada sempre que o conteúdo do cache mudar.
+    VERSAO_CACHE = 2
+
+    def __init__(self, arquivo, prioridade_aula_sequencial=False, diretorio_cache=None, perfil=None):
+        """
+        Construtor da classe HorarioDeAulas.
+
+        Args:
+            arquivo (str): Caminho do arquivo .xlsx ou .jsonl, ou do diretório com os arquivos .csv, que se deseja ler.
+            prioridade_aula_sequencial (bool|str): True para priorizar o máximo de aulas em sequencia igual a 2, False para não analisar isso. False é o valor default.
+                AULAS_EM_BLOCOS para colorir as aulas da mesma matéria e turma em blocos de duas aulas seguidas.
+            diretorio_cache (str|None): Diretório do cache de instâncias já lidas. None para não utilizar o cache.
+            perfil (Perfil|None): Registro dos tempos das etapas e dos contadores, ou None para não medir a execução.
+        """
+        self.inicializa_atributos(arquivo, prioridade_aula_sequencial, diretorio_cache, perfil)
+        self.formato = self.identifica_formato(arquivo)
+
+        with self.etapa('hash_cache'):
+            arquivo_cache = None if diretorio_cache is None else self.arquivo_cache(diretorio_cache)
+        if arquivo_cache is not None and path.exists(arquivo_cache):
+            try:
+                with self.etapa('carrega_cache'):
+                    self.carrega_cache(arquivo_cache)
+                self.solucao = Solucao(self.grafo)
+                return
+            except ERROS_CACHE:
+                # Um cache ilegível nunca impede a leitura da planilha: ele é removido, a instância parcialmente
+                # carregada é descartada e a planilha é lida e salva novamente no cache.
+                if self.perfil is not None:
+                    self.perfil.conta('cache_invalido')
+                try:
+                    os.remove(arquivo_cache)
+                except OSError:
+                    pass
+                self.inicializa_atributos(arquivo, prioridade_aula_sequencial, diretorio_cache, perfil)
+                self.formato = self.identifica_formato(arquivo)
+
+        if self.formato == 'xlsx':
+            with self.etapa('abre_planilha'):
+                self.planilha = load_workbook(arquivo, read_only=True)
+        with self.etapa('inicializa_vertices'):
+            self.inicializa_vertices()
+        with self.etapa('inicializa_horarios'):
+            self.inicializa_horarios()
+        with self.etapa('define_restricoes_professores'):
+            self.define_restricoes_professores()
+        with self.etapa('define_restricoes_turmas'):
+            self.define_restricoes_turmas()
+        with self.etapa('define_preferencias_professores'):
+            self.define_preferencias_professores()
+        if self.planilha is not None:
+            self.planilha.close()
+        with self.etapa('define_arestas'):
+            self.define_arestas()
+        with self.etapa('atualiza_restricoes_preferencias_vertices'):
+            self.atualiza_restricoes_preferencias_vertices()
+
+        if arquivo_cache is not None:
+            with self.etapa('salva_cache'):
+                try:
+                    self.salva_cache(arquivo_cache)
+                except OSError:
+                    # Sem permissão ou espaço no diretório do cache, a instância é utilizada sem ser salva.
+                    pass
+
+        self.solucao = Solucao(self.grafo)
+
+    def inicializa_atributos(self, arquivo, prioridade_aula_sequencial, diretorio_cache, perfil):
+        """
+        Inicializa os atributos da instância, ainda sem nenhum dado lido.
+
+        Args:
+            arquivo (str): Caminho da instância.
+            prioridade_aula_sequencial (bool|str): Opção de priorizar aulas sequenciais, ou AULAS_EM_BLOCOS para
+                colorir as aulas em blocos de duas aulas seguidas.
+            diretorio_cache (str|None): Diretório do cache de instâncias já lidas.
+            perfil (Perfil|None): Registro dos tempos das etapas e dos contadores.
+        """
+        self.arquivo = arquivo
+        self.diretorio_cache = diretorio_cache
+        self.formato = None
+        self.planilha = None
+        self.turmas = dict()
+        self.professores = dict()
+        self.horarios = dict()
+        self.horarios_por_dia_hora = dict()
+        self.aulas_por_dia = 0
+        self.lista_de_horarios = list()
+        self.vertices = list()
+        self.grafo = None
+        self.total_preferencias = 0
+        self.solucao = None
+        self.limites = None
+        self.verificador = None
+        self.ultima_ordem_desempate = (None, None)
+        self.prioridade_aula_sequencial = prioridade_aula_sequencial
+        self.aulas_em_blocos = prioridade_aula_sequencial == AULAS_EM_BLOCOS
+        self.sugere_horarios_sequencia = bool(prioridade_aula_sequencial) and not self.aulas_em_blocos
+        self.mascara_inicios_bloco = None
+        self.perfil = perfil
+
+    def __getstate__(self):
+        """
+        Estado da instância serializado pelo pickle, como ao enviá-la aos processos de colore_componentes() e de
+        colore_multiplos_inicios(). A planilha, já lida, e o perfil, cujas medições ficam no processo principal, não
+        são enviados.
+
+        Returns:
+            (dict): Atributos da instância.
+        """
+        estado = self.__dict__.copy()
+        estado['planilha'] = None
+        estado['perfil'] = None
+        return estado
+
+    def etapa(self, nome):
+        """
+        Mede o tempo de uma etapa, se houver um perfil. Deve ser utilizado com o with.
+
+        Args:
+            nome (str): Nome da etapa.
+
+        Returns:
+            Gerenciador de contexto que acumula o tempo do bloco no perfil, ou que não faz nada se não houver perfil.
+        """
+        return nullcontext() if self.perfil is None else self.perfil.etapa(nome)
+
+    @property
+    def horarios_utilizados(self):
+        return self.solucao.horarios_utilizados
+
+    @property
+    def quantidade_vertices_sem_horario(self):
+        return self.solucao.quantidade_vertices_sem_horario
+
+    @property
+    def preferencias_atendidas(self):
+        return self.solucao.preferencias_atendidas
+
+    def arquivo_cache(self, diretorio_cache):
+        """
+        Define o caminho do arquivo de cache da instância.
+
+        O nome do arquivo é o hash do conteúdo da planilha, das opções do algoritmo e da versão do formato do cache.
+        Assim, qualquer alteração na planilha gera um novo arquivo, invalidando o cache anterior automaticamente.
+
+        Args:
+            diretorio_cache (str): Diretório do cache.
+
+        Returns:
+            (str): Caminho do arquivo de cache.
+        """
+        resumo = hashlib.sha256()
+        for nome_arquivo in self.arquivos_instancia(self.arquivo):
+            resumo.update(path.basename(nome_arquivo).encode() + b'\0')
+            if not path.exists(nome_arquivo):
+                continue
+            with open(nome_arquivo, 'rb') as arquivo:
+                for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                    resumo.update(bloco)
+        resumo.update('|versao={}|sequencial={}'.format(self.VERSAO_CACHE, self.prioridade_aula_sequencial).encode())
+        return path.join(diretorio_cache, resumo.hexdigest() + '.npz')
+
+    def salva_cache(self, arquivo_cache):
+        """
+        Salva a instância lida em um arquivo binário (.npz) para que possa ser carregada rapidamente depois.
+
+        São salvos os horários, as turmas e os professores com suas restrições e preferências, os vértices e os vetores
+        do núcleo do grafo, incluindo as restrições e preferências já atualizadas de cada vértice. Caso algum nome não
+        possa ser representado em JSON, o cache não é salvo.
+
+        Args:
+            arquivo_cache (str): Caminho do arquivo de cache.
+        """
+        dias = list(self.horarios.keys())
+        materias = dict()
+        for vertice in self.vertices:
+            materias.setdefault(vertice.materia, len(materias))
+
+        try:
+            metadados = json.dumps({
+                'dias': dias,
+                'horas': list(self.horarios[dias[0]].keys()) if len(dias) > 0 else [],
+                'materias': list(materias),
+                'turmas': [[turma.nome, turma.restricoes] for turma in self.turmas.values()],
+                'professores': [[professor.nome, professor.restricoes,
+                                 [horario.indice for horario in professor.preferencias]]
+                                for professor in self.professores.values()],
+                'total_preferencias': self.total_preferencias,
+            })
+        except TypeError:
+            return
+
+        vetores = {nome: getattr(self.grafo, nome) for nome in Grafo.VETORES_ESTRUTURA}
+        vetores['materia'] = np.array([materias[vertice.materia] for vertice in self.vertices], dtype=np.int32)
+        vetores['restricoes'] = mascaras_para_bytes(self.grafo.restricoes, len(self.lista_de_horarios))
+        vetores['preferencias'] = mascaras_para_bytes(self.grafo.preferencias, len(self.lista_de_horarios))
+        vetores['metadados'] = np.frombuffer(metadados.encode(), dtype=np.uint8)
+
+        os.makedirs(path.dirname(arquivo_cache) or '.', exist_ok=True)
+        # O arquivo é escrito com outro nome e renomeado ao final, para que um cache incompleto nunca seja lido.
+        temporario = '{}.{}.tmp.npz'.format(arquivo_cache[:-len('.npz')], os.getpid())
+        np.savez(temporario, **vetores)
+        os.replace(temporario, arquivo_cache)
+
+    def carrega_cache(self, arquivo_cache):
+        """
+        Carrega uma instância salva por salva_cache(), sem ler a planilha.
+
+        Args:
+            arquivo_cache (str): Caminho do arquivo de cache.
+
+        Raises:
+            OSError, ValueError, KeyError, zipfile.BadZipFile: Caso o arquivo esteja truncado ou corrompido (ver
+                ERROS_CACHE). A instância pode ficar parcialmente carregada.
+        """
+        with np.load(arquivo_cache, allow_pickle=False) as dados:
+            vetores = {nome: dados[nome] for nome in dados.files}
+        metadados = json.loads(vetores['metadados'].tobytes().decode())
+
+        for dia in metadados['dias']:
+            for hora in metadados['horas']:
+                self.adiciona_horario(dia, hora)
+            self.aulas_por_dia = len(metadados['horas'])
+
+        turmas = []
+        for nome, restricoes in metadados['turmas']:
+            turma = Restricao(nome)
+            turma.restricoes = restricoes
+            self.turmas[nome] = turma
+            turmas.append(turma)
+
+        professores = []
+        for nome, restricoes, preferencias in metadados['professores']:
+            professor = Professor(nome)
+            professor.restricoes = restricoes
+            for indice in preferencias:
+                professor.add_preferencia(self.lista_de_horarios[indice])
+            self.professores[nome] = professor
+            professores.append(professor)
+
+        self.total_preferencias = metadados['total_preferencias']
+
+        self.grafo = Grafo.a_partir_de_vetores(vetores)
+        self.grafo.restricoes = bytes_para_mascaras(vetores['restricoes'])
+        self.grafo.preferencias = bytes_para_mascaras(vetores['preferencias'])
+
+        materias = metadados['materias']
+        for indice, (materia, turma, professor) in enumerate(zip(vetores['materia'].tolist(),
+                                                                 self.grafo.turma.tolist(),
+                                                                 self.grafo.professor.tolist())):
+            vertice = Vertice(materias[materia], turmas[turma], professores[professor], indice)
+            vertice.horarios_de_aula = self
+            self.vertices.append(vertice)
+
+    @staticmethod
+    def limpa_cache(diretorio_cache):
+        """
+        Remove todos os arquivos do cache de instâncias.
+
+        Args:
+            diretorio_cache (str): Diretório do cache.
+
+        Returns:
+            (int): Quantidade de arquivos removidos.
+        """
+        if not path.isdir(diretorio_cache):
+            return 0
+
+        removidos = 0
+        for nome in os.listdir(diretorio_cache):
+            if nome.endswith('.npz'):
+                os.remove(path.join(diretorio_cache, nome))
+                removidos += 1
+        return removidos
+
+    @staticmethod
+    def arquivos_instancia(arquivo):
+        """
+        Lista os arquivos lidos de uma instância: um arquivo .csv por planilha para os diretórios e o próprio arquivo
+        para os demais formatos.
+
+        Args:
+            arquivo (str): Caminho da instância.
+
+        Returns:
+            (list of str): Caminhos dos arquivos, que podem não existir no caso das planilhas .csv.
+        """
+        if HorarioDeAulas.identifica_formato(arquivo) == 'csv':
+            return [path.join(arquivo, nome + '.csv') for nome in PLANILHAS]
+        return [arquivo]
+
+    @staticmethod
+    def identifica_formato(arquivo):
+        """
+        Identifica o formato de uma instância a partir de seu caminho.
+
+        Args:
+            arquivo (str): Caminho da instância.
+
+        Returns:
+            (str): 'csv' para diretórios, 'jsonl' para arquivos .jsonl e 'xlsx' para os demais arquivos.
+        """
+        if path.isdir(arquivo):
+            return 'csv'
+        if arquivo.lower().endswith('.jsonl'):
+            return 'jsonl'
+        return 'xlsx'
+
+    def linhas(self, nome_planilha, colunas):
+        """
+        Percorre as linhas de uma planilha, ignorando o cabeçalho.
+
+        As linhas são lidas sob demanda (streaming), sem carregar a planilha inteira na memória, qualquer que seja o
+        formato da instância.
+
+        Args:
+            nome_planilha (str): Nome da planilha.
+            colunas (int): Quantidade de colunas lidas de cada linha. Linhas menores são completadas com None.
+
+        Yields:
+            tuple: Valores das células da linha.
+        """
+        if self.formato == 'csv':
+            leitor = self.linhas_csv(nome_planilha)
+        elif self.formato == 'jsonl':
+            leitor = self.linhas_jsonl(nome_planilha)
+        else:
+            leitor = self.planilha[nome_planilha].iter_rows(min_row=2, max_col=colunas, values_only=True)
+
+        for linha in leitor:
+            linha = tuple(linha[:colunas])
+            if len(linha) < colunas:
+                linha = linha + (None,) * (colunas - len(linha))
+            yield linha
+
+    def linhas_csv(self, nome_planilha):
+        """
+        Percorre as linhas do arquivo .csv de uma planilha, ignorando o cabeçalho. Células vazias são lidas como None.
+
+        Caso o arquivo não exista, a planilha é considerada vazia.
+
+        Args:
+            nome_planilha (str): Nome da planilha.
+
+        Yields:
+            list: Valores das células da linha.
+        """
+        nome_arquivo = path.join(self.arquivo, nome_planilha + '.csv')
+        if not path.exists(nome_arquivo):
+            return
+
+        with open(nome_arquivo, newline='', encoding='utf-8') as arquivo:
+            leitor = csv.reader(arquivo)
+            next(leitor, None)  # Remove cabecalho
+            for linha in leitor:
+                yield [valor if valor != '' else None for valor in linha]
+
+    def linhas_jsonl(self, nome_planilha):
+        """
+        Percorre as linhas de uma planilha em um arquivo .jsonl.
+
+        Args:
+            nome_planilha (str): Nome da planilha.
+
+        Yields:
+            list: Valores das células da linha.
+        """
+        with open(self.arquivo, encoding='utf-8') as arquivo:
+            for texto in arquivo:
+                if texto.strip() == '':
+                    continue
+                linha = json.loads(texto)
+                if linha.get('planilha') == nome_planilha:
+                    yield linha.get('valores', [])
+
+    def encontra_horario(self, dia, hora):
+        """
+        Encontra o horário de um determinado dia e hora.
+
+        Args:
+            dia (str): Dia da semana.
+            hora (object): Hora de início da aula, como lida da planilha.
+
+        Returns:
+            (Horario|None): Horário encontrado ou None caso o dia não seja letivo ou a hora não seja um horário de
+            início de aula.
+        """
+        return self.horarios_por_dia_hora.get((dia, str(hora)))
+
+    def inicializa_vertices(self):
+        """
+        Lê a planilha Dados e cria vértices a partir desses dados.
+
+        Além disso, atribui valores às listas de professores e turmas.
+        """
+        # Laço para criar vertices com a tupla (Matéria, Turma, Professor)
+        for materia, turma, professor, quantidade in self.linhas('Dados', 4):
+            if materia is None and turma is None and professor is None and quantidade is None:
+                # Ignora linhas vazias.
+                continue
+
+            # Verifica se a turma já está no dicionario de turmas
+            # Se nao estiver, cria uma nova turma do tipo Restricao e adiciona ao dicionario
+            if turma in self.turmas:
+                turma = self.turmas[turma]
+            else:
+                turma = Restricao(turma)
+                self.turmas[turma.nome] = turma
+
+            # Verifica se o professor já está no dicionario de professores
+            # Se nao estiver, cria um novo professor do tipo Professor e adiciona ao dicionario
+            if professor in self.professores:
+                professor = self.professores[professor]
+            else:
+                professor = Professor(professor)
+                self.professores[professor.nome] = professor
+
+            # Insere os vertices
+            self.insere_vertice((materia, turma, professor), int(quantidade))
+
+    def inicializa_horarios(self):
+        """
+        Lê a planilha Configuracoes e instância objetos do tipo Horario.
+
+        Além disso, atribui valores ao dicionário de horários da classe.
+        """
+        horas = [str(linha[0]) for linha in self.linhas('Configuracoes', 1)]
+
+        if len(horas) == 0:
+            # Verifica se a planilha possui apenas o cabeçalho.
+            # Em caso verdadeiro, abandona aqui a execução do método.
+            return
+
+        dias = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta']
+        # Laço para inicializar horarios
+        for dia in dias:
+            for hora in horas:
+                self.adiciona_horario(dia, hora)
+
+            self.aulas_por_dia = len(self.horarios[dia])
+
+    def adiciona_horario(self, dia, hora):
+        """
+        Cria o próximo horário (cor) da instância e o adiciona a lista_de_horarios e aos dicionários de horários.
+
+        Args:
+            dia (str): Dia da semana.
+            hora (str): Hora de início da aula.
+
+        Returns:
+            (Horario): Horário criado.
+        """
+        horario = Horario(dia, hora, len(self.lista_de_horarios))
+        self.horarios.setdefault(dia, dict())[hora] = horario
+        self.horarios_por_dia_hora[(dia, hora)] = horario
+        self.lista_de_horarios.append(horario)
+        return horario
+
+    def define_restricoes_professores(self):
+        """
+        Lê a planilha Restricao e adiciona restrições aos objetos do tipo Professor.
+        """
+        for professor, hora, dia in self.linhas('Restricao', 3):
+            horario = self.encontra_horario(dia, hora)
+
+            if professor in self.professores and horario is not None:
+                # Verifica se o professor foi alocado em algum vértice,
+                # se o dia, é um dia letivo
+                # e se o horário é um horário de inicio de aula.
+                self.professores[professor].add_restricao(horario)
+
+    def define_restricoes_turmas(self):
+        """
+        Lê a planilha Restricao Turma e adiciona restrições aos objetos do tipo Turma.
+        """
+        for turma, hora, dia in self.linhas('Restricoes Turma', 3):
+            horario = self.encontra_horario(dia, hora)
+
+            if turma in self.turmas and horario is not None:
+                # Verifica se a turma exite na lista de turmas,
+                # se o dia é um dia letivo
+                # e se o horário é um horário de início de aula.
+                self.turmas[turma].add_restricao(horario)
+
+    def define_preferencias_professores(self):
+        """
+        Lê a planilha Preferencias e adiciona as preferências aos objetos do tipo Professor.
+        """
+        for professor, hora, dia in self.linhas('Preferencias', 3):
+            horario = self.encontra_horario(dia, hora)
+
+            if professor in self.professores and horario is not None:
+                # Verifica se o professor foi alocado em algum vértice,
+                # se o dia, é um dia letivo
+                # e se o horário é um horário de inicio de aula.
+                self.professores[professor].add_preferencia(horario)
+                self.total_preferencias += 1
+
+    def atualiza_restricoes_preferencias_vertices(self):
+        """
+        Atualiza, no núcleo do grafo, as restrições e as preferências de cada aula de acordo com seu professor e sua
+        turma.
+        """
+        grafo = self.grafo
+        for aula, copias in enumerate(np.split(grafo.copias, grafo.inicio_copias[1:-1])):
+            vertice = self.vertices[copias[0]]
+            restricoes = vertice.professor.restricoes | vertice.turma.restricoes
+            grafo.restricoes[aula] = restricoes
+            grafo.preferencias[aula] = vertice.professor.mascara_preferencias & ~restricoes
+
+    def define_arestas(self):
+        """
+        Monta o núcleo do grafo (Grafo), onde as arestas são definidas de forma implícita.
+
+        Dois vértices são vizinhos se possuem a mesma turma ou o mesmo professor, ou seja, o grafo é a união das cliques
+        formadas pelas aulas de cada turma e de cada professor. Ao invés de comparar cada par de vértices e armazenar a
+        lista de adjacência, o núcleo agrupa os vértices por turma e por professor. A construção é linear na quantidade
+        de vértices.
+        """
+        indice_turma = {turma: indice for indice, turma in enumerate(self.turmas.values())}
+        indice_professor = {professor: indice for indice, professor in enumerate(self.professores.values())}
+        indice_aula = dict()
+
+        turma = []
+        professor = []
+        aula = []
+        for vertice in self.vertices:
+            turma.append(indice_turma[vertice.turma])
+            professor.append(indice_professor[vertice.professor])
+            aula.append(indice_aula.setdefault((vertice.materia, vertice.turma, vertice.professor), len(indice_aula)))
+
+        self.grafo = Grafo(turma, professor, aula)
+        for vertice in self.vertices:
+            vertice.horarios_de_aula = self
+
+    def insere_vertice(self, dados, qtd=1):
+        """
+        Cria objetos do tipo Vertice e adiciona-os à lista de vértices.
+
+        Args:
+            dados (tuple of (str, Restricao, Professor)): Dados do vértice (aula).
+            qtd (int): Quantidade que aulas desse tipo devem ser ministradas.
+        """
+        materia = dados[0]
+        turma = dados[1]
+        professor = dados[2]
+        for i in range(qtd):
+            self.vertices.append(Vertice(materia, turma, professor, len(self.vertices)))
+
+    '''
+    Aqui se inicia os algoritmos para coloração.
+
+    Foi utilizado o algoritmo de DSATUR com algumas adaptações.
+    No algoritmo original, prioriza-se apenas os vértices com maior grau de saturação.
+    Nessa heurística são priorizados em ordem:
+        - Vértices com maior número de restrições;
+        - Vértices com maior grau de saturação;
+        - Vértices com maior grau no grafo original;
+        - Vértices com possibilidade de horário em sequência;
+        - Vértices com mais preferências.
+    '''
+
+    def dsatur_com_heristica(self, semente=None, fixos=None, solucao=None, vertices=None):
+        """
+        Método para atribuição dos horários à cada aula.
+
+        A coloração é feita sobre o núcleo do grafo (Grafo), com os vértices representados por seus índices, e todo o
+        estado da coloração é guardado em uma Solucao. A instância não é alterada, de forma que o método pode ser
+        chamado várias vezes sobre a mesma instância.
+
+        Args:
+            semente (int|None): Semente para desempatar aleatoriamente os vértices com a mesma prioridade. None para
+                desempatar pela ordem dos vértices, como no algoritmo original.
+            fixos (list of (int, int)|None): Pares (vértice, índice do horário) já coloridos antes do início da
+                coloração, como as aulas mantidas de uma solução anterior. Devem respeitar as restrições e não conflitar
+                entre si.
+            solucao (Solucao|None): Solução vazia a ser colorida. None para colorir uma nova solução, que passa a ser
+                a solução atual da instância (self.solucao).
+            vertices (numpy.ndarray|None): Vértices a serem coloridos, como os de uma componente do grafo
+                (Grafo.componentes()). Os demais vértices não são alterados. None para colorir todos os vértices.
+
+        Returns:
+            list of Vertice: Lista de vértices com horário não definido.
+        """
+        if solucao is None:
+            self.solucao = Solucao(self.grafo)
+            solucao = self.solucao
+
+        with self.etapa('dsatur_com_heristica'):
+            lista_de_horarios = self.lista_de_horarios  # Lista com objetos Horario (cores) possiveis.
+
+            ordem = None if semente is None else self.ordem_desempate(semente)
+
+            if fixos and not self.sugere_horarios_sequencia:
+                # Os vértices fixos são coloridos de uma só vez, antes da montagem do índice de prioridade.
+                self.fixa_horarios(fixos, solucao)
+
+            vertices_nao_coloridos = IndiceDePrioridade(solucao, ordem, vertices)
+            vertices_nao_alocados = []
+            # Horários dos vértices fixos que ainda não formam bloco, por aula (modo de blocos).
+            sem_bloco = self.blocos_fixos(fixos, lista_de_horarios, solucao) if fixos and self.aulas_em_blocos else None
+
+            if fixos:
+                # A escolha dos demais vértices parte do melhor vértice dentre todos.
+                for vertice_escolhido, indice in fixos:
+                    vertices_nao_coloridos.remove(vertice_escolhido)
+                    if self.sugere_horarios_sequencia:
+                        # A prioridade de aulas sequenciais depende da ordem de coloração, então os vértices fixos
+                        # são coloridos um a um.
+                        self.define_horario(vertice_escolhido, lista_de_horarios[indice], lista_de_horarios,
+                                            vertices_nao_coloridos)
+                vertice_escolhido = None
+            elif len(vertices_nao_coloridos) > 0:
+                # Inicia aqui a escolha do vertice a ser colorido
+                # e o processo de coloração (atribuição dos horários)
+                vertice_escolhido = vertices_nao_coloridos.melhor()
+                vertices_nao_coloridos.remove(vertice_escolhido)
+                if not (self.aulas_em_blocos
+                        and self.define_bloco(vertice_escolhido, lista_de_horarios, vertices_nao_coloridos)):
+                    horario = self.escolher_horario(vertice_escolhido, lista_de_horarios, solucao)
+                    # O primeiro vértice é o mais restrito e, como no laço abaixo, pode não ter horário permitido.
+                    if (horario is not None
+                            and not solucao.restricoes[self.grafo.aula[vertice_escolhido]] & horario.mascara):
+                        self.define_horario(vertice_escolhido, horario, lista_de_horarios, vertices_nao_coloridos)
+                    else:
+                        vertices_nao_alocados.append(self.vertices[vertice_escolhido])
+
+            while len(vertices_nao_coloridos) > 0:
+                vertice_escolhido = (None if vertice_escolhido is None
+                                     else vertices_nao_coloridos.melhor_vizinho(vertice_escolhido))
+                # Se não houver vizinhos sem cor, escolhe um vértice dentre todos os vértices não coloridos.
+                vertice_escolhido = (vertices_nao_coloridos.melhor() if vertice_escolhido is None
+                                     else vertice_escolhido)
+                vertices_nao_coloridos.remove(vertice_escolhido)
+                if self.aulas_em_blocos and self.define_bloco(vertice_escolhido, lista_de_horarios,
+                                                              vertices_nao_coloridos, sem_bloco):
+                    # O vértice e a próxima cópia da sua aula foram coloridos em dois horários seguidos.
+                    continue
+                horario = self.escolher_horario(vertice_escolhido, lista_de_horarios, solucao)
+
+                if horario is not None:
+                    # Se encontrar um horário em que o vértice se encaixa, define esse horário.
+                    if not solucao.restricoes[self.grafo.aula[vertice_escolhido]] & horario.mascara:
+                        self.define_horario(vertice_escolhido, horario, lista_de_horarios, vertices_nao_coloridos)
+                    else:
+                        vertices_nao_alocados.append(self.vertices[vertice_escolhido])
+                else:
+                    # Caso não encontre um horário para o vértice, o separa em uma lista.
+                    vertices_nao_alocados.append(self.vertices[vertice_escolhido])
+
+        if self.perfil is not None:
+            self.perfil.conta('vertices_escolhidos',
+                              self.grafo.quantidade_vertices if vertices is None else len(vertices))
+            self.perfil.conta('entradas_heap_descartadas', vertices_nao_coloridos.descartadas)
+            self.perfil.conta('atualizacoes_prioridade', vertices_nao_coloridos.atualizacoes)
+
+        return vertices_nao_alocados
+
+    def ordem_desempate(self, semente):
+        """
+        Sorteia a ordem de desempate dos vértices para uma semente.
+
+        A última ordem sorteada é guardada, para que a coloração das componentes do grafo com a mesma semente não
+        sorteie a ordem de todos os vértices novamente a cada componente.
+
+        Args:
+            semente (int): Semente do sorteio.
+
+        Returns:
+            (list of int): Ordem de desempate de cada vértice.
+        """
+        if self.ultima_ordem_desempate[0] != semente:
+            ordem = list(range(self.grafo.quantidade_vertices))
+            random.Random(semente).shuffle(ordem)
+            self.ultima_ordem_desempate = (semente, ordem)
+        return self.ultima_ordem_desempate[1]
+
+    def colore_componentes(self, semente=None, solucao=None, processos=1):
+        """
+        Colore cada componente conexa do grafo de forma independente e junta os horários em uma única solução.
+
+        Como aulas de componentes diferentes não conflitam, cada componente é colorida pelo dsatur_com_heristica() como
+        se fosse o grafo inteiro, inclusive nos horários utilizados, que são reiniciados a cada componente. Assim, o
+        resultado é o mesmo com qualquer quantidade de processos. Com mais de um processo, as componentes são
+        distribuídas entre eles (colore_grupo_componentes()), que recebem a instância em memória. Um grafo com uma única
+        componente é colorido diretamente pelo dsatur_com_heristica().
+
+        Args:
+            semente (int|None): Semente do desempate aleatório, utilizada em todas as componentes.
+            solucao (Solucao|None): Solução vazia a ser colorida. None para colorir uma nova solução, que passa a ser
+                a solução atual da instância (self.solucao).
+            processos (int): Quantidade de processos utilizados.
+
+        Returns:
+            list of Vertice: Lista de vértices com horário não definido.
+        """
+        componentes = self.grafo.componentes()
+        if self.perfil is not None:
+            self.perfil.conta('componentes', len(componentes))
+        if len(componentes) <= 1:
+            return self.dsatur_com_heristica(semente, solucao=solucao)
+
+        if solucao is None:
+            self.solucao = Solucao(self.grafo)
+            solucao = self.solucao
+
+        if processos > 1:
+            # Cada grupo recebe a próxima maior componente enquanto for o grupo com menos vértices.
+            grupos = [[] for _ in range(min(processos, len(componentes)))]
+            tamanhos = [0] * len(grupos)
+            for vertices in sorted(componentes, key=len, reverse=True):
+                grupo = tamanhos.index(min(tamanhos))
+                grupos[grupo].append(vertices)
+                tamanhos[grupo] += len(vertices)
+
+            with self.etapa('componentes_em_processos'):
+                # Os processos recebem esta instância (inicializa_processo()), e não uma nova leitura da planilha.
+                with ProcessPoolExecutor(max_workers=len(grupos), initializer=inicializa_processo,
+                                         initargs=(self,)) as executor:
+                    resultados = list(executor.map(colore_grupo_componentes, grupos, [semente] * len(grupos)))
+
+            horarios = np.full(self.grafo.quantidade_vertices, -1, dtype=np.int32)
+            for grupo, horarios_grupo in zip(grupos, resultados):
+                for vertices, horarios_componente in zip(grupo, horarios_grupo):
+                    horarios[vertices] = horarios_componente
+            self.aplica_solucao(horarios.tolist(), solucao)
+            return [self.vertices[vertice] for vertice in np.flatnonzero(horarios < 0).tolist()]
+
+        vertices_nao_alocados = []
+        horarios_utilizados = 0
+        for vertices in componentes:
+            solucao.horarios_utilizados = 0
+            vertices_nao_alocados += self.dsatur_com_heristica(semente, solucao=solucao, vertices=vertices)
+            horarios_utilizados |= solucao.horarios_utilizados
+        solucao.horarios_utilizados = horarios_utilizados
+        return vertices_nao_alocados
+
+    def estatisticas_componentes(self):
+        """
+        Calcula as estatísticas da solução atual em cada componente conexa do grafo.
+
+        Returns:
+            (list of dict): Para cada componente, as estatísticas de estatisticas_vertices().
+        """
+        return [self.estatisticas_vertices(vertices) for vertices in self.grafo.componentes()]
+
+    def estatisticas_vertices(self, vertices):
+        """
+        Calcula as estatísticas da solução atual em um conjunto de vértices.
+
+        Args:
+            vertices (numpy.ndarray): Índices dos vértices.
+
+        Returns:
+            (dict): Quantidade de aulas, turmas e professores, quantidade de horários utilizados, aulas sem horário e
+            preferências atendidas.
+        """
+        grafo = self.grafo
+        horario = self.solucao.horario
+        horarios = horario[vertices]
+        coloridos = vertices[horarios >= 0]
+        preferencias = sum(1 for vertice, indice in zip(coloridos.tolist(), horario[coloridos].tolist())
+                           if self.vertices[vertice].professor.tem_preferencia(self.lista_de_horarios[indice]))
+        return {
+            'aulas': len(vertices),
+            'turmas': len(np.unique(grafo.turma[vertices])),
+            'professores': len(np.unique(grafo.professor[vertices])),
+            'cores': len(np.unique(horarios[horarios >= 0])),
+            'sem_horario': int(np.count_nonzero(horarios < 0)),
+            'preferencias_atendidas': preferencias,
+        }
+
+    def grau(self, vertice):
+        """
+        Retorna o grau de um vértice no grafo original.
+
+        Args:
+            vertice (Vertice): Vértice que se deseja saber o grau.
+
+        Returns:
+            (int): Quantidade de vizinhos do vértice.
+        """
+        return int(self.grafo.grau[vertice.indice])
+
+    def vizinhos(self, vertice):
+        """
+        Encontra todos os vizinhos de um determinado vértice a partir das cliques de sua turma e de seu professor.
+
+        Args:
+            vertice (Vertice): Vértice que se deseja encontrar a vizinhança.
+
+        Returns:
+            (list of Vertice): Vizinhos do vértice.
+        """
+        return [self.vertices[vizinho] for vizinho in self.grafo.vizinhos(vertice.indice).tolist()]
+
+    def vertices_de_maior_grau(self, lista_de_vertices):
+        """
+        Encontra os vértices com maior grau no grafo original dentre uma lista de vertices.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+
+        Returns:
+            (list of Vertice): Lista com os vértices de maior grau.
+        """
+        vertices = []
+        maior_grau = 0
+
+        for vertice in lista_de_vertices:
+            grau = self.grau(vertice)
+            if grau > maior_grau:
+                maior_grau = grau
+                vertices = [vertice]
+            elif grau == maior_grau:
+                vertices.append(vertice)
+
+        return vertices
+
+    def vertices_maior_grau_saturacao(self, lista_de_vertices):
+        """
+        Encontra os vértices de maior grau de saturação dentre uma lista de vertices.
+
+        Caso haja empate, encontra os vértices com maior grau no grafo original dentre os empatados.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+
+        Returns:
+            (list of Vertice): Lista com os vértices de maior grau de saturação.
+        """
+        vertices = []
+        maior_grau = 0
+
+        for vertice in lista_de_vertices:
+            grau = vertice.grau_saturacao
+            if grau > maior_grau:
+                maior_grau = grau
+                vertices = [vertice]
+            elif grau == maior_grau:
+                vertices.append(vertice)
+
+        return self.vertices_de_maior_grau(vertices)
+
+    def vertices_com_mais_restricoes(self, lista_de_vertices):
+        """
+        Encontra os vértices de maior quantidade de restrições dentre uma lista de vertices.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+
+        Returns:
+            (list of Vertice): Lista com os vértices de maior quantidade de restrições.
+        """
+
+        vertices = []
+        maior_quantidade = 0
+
+        for vertice in lista_de_vertices:
+            quantidade = vertice.qtd_restricao()
+            if quantidade > maior_quantidade:
+                maior_quantidade = quantidade
+                vertices = [vertice]
+            elif quantidade == maior_quantidade:
+                vertices.append(vertice)
+
+        return vertices
+
+    def vertices_com_horario_sequencia(self, lista_de_vertices):
+        """
+        Encontra os vértices que possuem sugestão de horário em sequencia dentre uma lista de vertices.
+
+        Caso nenhum vértice possua a sugestão, a lista passada como argumento é retornada.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+
+        Returns:
+            (list of Vertice): Lista com os vértices que possuem sugestão de horário.
+        """
+        lista_aux = [vertice for vertice in lista_de_vertices if vertice.tem_horario_sequencia()]
+
+        return lista_aux if len(lista_aux) > 0 else lista_de_vertices
+
+    def vertices_com_mais_preferencias(self, lista_de_vertices):
+        """
+        Encontra os vértices com maior quantidade de preferências dentre uma lista de vertices.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para comparação.
+
+        Returns:
+            (list of Vertice): Lista com os vértices de maior quantidade de preferências.
+        """
+        vertices = []
+        maior_quantidade = 0
+
+        for vertice in lista_de_vertices:
+            quantidade = vertice.qtd_preferencia()
+            if quantidade > maior_quantidade:
+                maior_quantidade = quantidade
+                vertices = [vertice]
+            elif quantidade == maior_quantidade:
+                vertices.append(vertice)
+
+        return vertices
+
+    def escolher_vertice(self, lista_de_vertices):
+        """
+        Escolhe o melhor vértice para aplicação da coloração de acordo com a heurística.
+
+        Aplica-se, em sequência que respeite os critérios da heurística, os métodos para filtrar os vértices da lista
+        até que se encontre o melhor vértice. O método dsatur_com_heristica() utiliza o IndiceDePrioridade, que
+        produz as mesmas escolhas sem percorrer a lista de vértices a cada passo.
+
+        Args:
+            lista_de_vertices (list of Vertice): Lista com os vértices para busca.
+
+        Returns:
+            (Vertice): Melhor vértice encontrado ou None caso não encontre nenhum.
+
+        """
+        lista_de_vertices = self.vertices_com_mais_restricoes(lista_de_vertices)
+        lista_de_vertices = self.vertices_maior_grau_saturacao(lista_de_vertices)
+        lista_de_vertices = self.vertices_com_horario_sequencia(lista_de_vertices)
+        lista_de_vertices = self.vertices_com_mais_preferencias(lista_de_vertices)
+
+        return None if len(lista_de_vertices) == 0 else lista_de_vertices[0]
+
+    def escolher_horario(self, vertice, lista_de_horarios, solucao=None):
+        """
+        Escolhe o melhor horário (cor) para um determinado vértice dada uma lista de horários.
+
+        A escolha é feita diretamente sobre as máscaras de bits da aula do vértice na solução, que define_horario()
+        atualiza a cada vizinho colorido, na mesma ordem de Vertice.horarios_preferidos(): primeiro os horários que são
+        preferência e sugestão de horário em sequência, depois os que são apenas preferência (ambos na ordem das
+        preferências do professor) e depois os que são apenas sugestão de horário em sequência. Sem nenhum deles, o
+        primeiro horário livre a partir do menor horário utilizado e, por fim, um horário com restrição leve.
+
+        Args:
+            vertice (int): Índice do vértice que se deseja definir horário (cor).
+            lista_de_horarios (list of Horario): Lista de horários (cores) disponíveis.
+            solucao (Solucao|None): Solução em coloração. None para utilizar a solução atual.
+
+        Returns:
+            (Horario|None): Melhor horário encontrado ou None caso não encontre nenhum horário.
+        """
+        solucao = self.solucao if solucao is None else solucao
+        aula = self.grafo.aula[vertice]
+        restricoes = solucao.restricoes[aula]
+        restricoes_leves = solucao.restricoes_leves[aula]
+        preferencias = solucao.preferencias[aula]
+        # As preferências nunca contêm horários restritos, pois Solucao.add_restricoes() os retira delas. Já os
+        # horários em sequência são acrescentados por define_horario() sem considerar as restrições do vértice.
+        horarios_sequencia = solucao.horarios_sequencia[aula] & ~restricoes
+
+        if self.perfil is not None:
+            self.perfil.conta('escolher_horario')
+
+        candidatos = (preferencias & horarios_sequencia) or preferencias
+        if candidatos:
+            for horario in self.vertices[vertice].professor.preferencias:
+                if candidatos & horario.mascara:
+                    return horario
+        if horarios_sequencia:
+            return lista_de_horarios[primeiro_bit(horarios_sequencia)]
+        else:
+            # Se não houver horários preferidos, deve-se buscar dentre todos os horários disponíveis iniciando do menor
+            # horário utilizado até o momento.
+            qtd_horarios = len(lista_de_horarios)
+            inicio = self.indice_menor_horario_utilizado(lista_de_horarios, solucao) % qtd_horarios
+            todos = (1 << qtd_horarios) - 1
+
+            indice = primeiro_bit(todos & ~(restricoes | restricoes_leves), inicio)
+            if indice is None:
+                # Se o vértice possui apenas restrição leve (restrição de 3 aulas em sequência) em algum horário, esse
+                # horário é utilizado.
+                indice = primeiro_bit(restricoes_leves & ~restricoes, inicio)
+                if self.perfil is not None:
+                    self.perfil.conta('buscas_restricao_leve')
+            if self.perfil is not None:
+                self.perfil.conta('buscas_horario_livre')
+
+            return None if indice is None else lista_de_horarios[indice]
+
+    def escolher_bloco(self, vertice, lista_de_horarios, solucao):
+        """
+        Escolhe o primeiro horário de um bloco de duas aulas seguidas, no mesmo dia, para a aula de um vértice (modo de
+        blocos).
+
+        Os dois horários do bloco devem estar livres para a aula e não possuir restrição leve. A escolha segue a ordem
+        de escolher_horario(): primeiro os blocos com os dois horários preferidos pelo professor, depois os blocos com
+        um deles preferido e, por fim, o primeiro bloco livre a partir do menor horário utilizado.
+
+        Args:
+            vertice (int): Índice do vértice.
+            lista_de_horarios (list of Horario): Lista de horários (cores) disponíveis.
+            solucao (Solucao): Solução em coloração.
+
+        Returns:
+            (int|None): Índice do primeiro horário do bloco ou None caso não haja dois horários seguidos livres.
+        """
+        qtd_horarios = len(lista_de_horarios)
+        if self.mascara_inicios_bloco is None:
+            # Horários que não são os últimos do dia, ou seja, que podem iniciar um bloco.
+            self.mascara_inicios_bloco = sum(1 << indice for indice in range(qtd_horarios)
+                                             if indice % self.aulas_por_dia != self.aulas_por_dia - 1)
+
+        aula = self.grafo.aula[vertice]
+        livres = ((1 << qtd_horarios) - 1) & ~(solucao.restricoes[aula] | solucao.restricoes_leves[aula])
+        blocos = livres & (livres >> 1) & self.mascara_inicios_bloco
+        preferencias = solucao.preferencias[aula]
+
+        candidatos = (blocos & preferencias & (preferencias >> 1)) or (blocos & (preferencias | preferencias >> 1))
+        if candidatos:
+            return primeiro_bit(candidatos)
+        inicio = self.indice_menor_horario_utilizado(lista_de_horarios, solucao) % qtd_horarios
+        return primeiro_bit(blocos, inicio)
+
+    def define_bloco(self, vertice, lista_de_horarios, vertices_nao_coloridos, sem_bloco=None):
+        """
+        Colore um vértice e a próxima cópia não colorida da sua aula em dois horários seguidos do mesmo dia (modo de
+        blocos), como uma única unidade.
+
+        Os horários imediatamente antes e depois do bloco passam a ser restrições leves da aula, para que as demais
+        cópias não formem uma terceira aula seguida da mesma matéria (R5). Assim, R5 só é violada quando uma cópia não
+        encontra nenhum outro horário.
+
+        Se a aula possuir um vértice fixo sem bloco com o horário seguinte ou o anterior do mesmo dia livre, o vértice
+        é colorido nesse horário e completa o bloco do vértice fixo.
+
+        Args:
+            vertice (int): Índice do vértice, já retirado do índice de prioridade.
+            lista_de_horarios (list of Horario): Lista de horários disponíveis.
+            vertices_nao_coloridos (IndiceDePrioridade): Índice dos vértices não coloridos da solução em coloração.
+            sem_bloco (dict|None): Horários dos vértices fixos sem bloco de cada aula, como retornado por
+                blocos_fixos(). O horário do vértice fixo é retirado quando o seu bloco é completado.
+
+        Returns:
+            (bool): True se o bloco foi colorido. False caso a aula não possua outra cópia não colorida ou não haja dois
+            horários seguidos livres, quando o vértice deve ser colorido sozinho.
+        """
+        solucao = vertices_nao_coloridos.solucao
+        aula = self.grafo.aula[vertice]
+        if sem_bloco and aula in sem_bloco and self.completa_bloco(vertice, sem_bloco, lista_de_horarios,
+                                                                   vertices_nao_coloridos):
+            return True
+        copias = vertices_nao_coloridos.restantes[aula]
+        if len(copias) == 0:
+            return False
+        inicio = self.escolher_bloco(vertice, lista_de_horarios, solucao)
+        if inicio is None:
+            return False
+
+        parceiro = copias[-1]
+        vertices_nao_coloridos.remove(parceiro)
+        self.define_horario(vertice, lista_de_horarios[inicio], lista_de_horarios, vertices_nao_coloridos)
+        self.define_horario(parceiro, lista_de_horarios[inicio + 1], lista_de_horarios, vertices_nao_coloridos)
+
+        solucao.add_restricoes_leves(aula, self.mascara_adjacentes_bloco(inicio, lista_de_horarios))
+        vertices_nao_coloridos.atualiza(aula)
+
+        if self.perfil is not None:
+            self.perfil.conta('blocos')
+        return True
+
+    def completa_bloco(self, vertice, sem_bloco, lista_de_horarios, vertices_nao_coloridos):
+        """
+        Colore um vértice ao lado de um vértice fixo da sua aula que ainda não forma bloco (modo de blocos).
+
+        Args:
+            vertice (int): Índice do vértice, já retirado do índice de prioridade.
+            sem_bloco (dict): Horários dos vértices fixos sem bloco de cada aula.
+            lista_de_horarios (list of Horario): Lista de horários disponíveis.
+            vertices_nao_coloridos (IndiceDePrioridade): Índice dos vértices não coloridos da solução em coloração.
+
+        Returns:
+            (bool): True se o vértice foi colorido. False caso nenhum vértice fixo da aula tenha o horário seguinte ou o
+            anterior do mesmo dia livre.
+        """
+        solucao = vertices_nao_coloridos.solucao
+        aula = self.grafo.aula[vertice]
+        indices = sem_bloco[aula]
+        for posicao, indice in enumerate(indices):
+            for vizinho in (indice + 1, indice - 1):
+                if (0 <= vizinho < len(lista_de_horarios)
+                        and vizinho // self.aulas_por_dia == indice // self.aulas_por_dia
+                        and not solucao.restricoes[aula] & lista_de_horarios[vizinho].mascara):
+                    del indices[posicao]
+                    if not indices:
+                        del sem_bloco[aula]
+                    self.define_horario(vertice, lista_de_horarios[vizinho], lista_de_horarios, vertices_nao_coloridos)
+                    solucao.add_restricoes_leves(aula, self.mascara_adjacentes_bloco(min(indice, vizinho),
+                                                                                     lista_de_horarios))
+                    vertices_nao_coloridos.atualiza(aula)
+                    if self.perfil is not None:
+                        self.perfil.conta('blocos')
+                    return True
+        return False
+
+    def blocos_fixos(self, fixos, lista_de_horarios, solucao):
+        """
+        Encontra os blocos formados pelos vértices fixos (modo de blocos), como os mantidos de uma solução anterior.
+
+        Dois vértices fixos da mesma aula em horários seguidos do mesmo dia formam um bloco, e os horários
+        imediatamente antes e depois do bloco passam a ser restrições leves da aula, como em define_bloco(). Os demais
+        vértices fixos ficam à espera de uma cópia da sua aula, colorida no horário vizinho por define_bloco().
+
+        Args:
+            fixos (list of (int, int)): Pares (vértice, índice do horário) já coloridos.
+            lista_de_horarios (list of Horario): Lista de horários disponíveis.
+            solucao (Solucao): Solução em coloração.
+
+        Returns:
+            (dict): Índices dos horários dos vértices fixos sem bloco de cada aula.
+        """
+        indices_aula = dict()
+        for vertice, indice in fixos:
+            indices_aula.setdefault(int(self.grafo.aula[vertice]), []).append(indice)
+
+        sem_bloco = dict()
+        for aula, indices in indices_aula.items():
+            indices.sort()
+            i = 0
+            while i < len(indices):
+                indice = indices[i]
+                if i + 1 < len(indices) and indices[i + 1] == indice + 1 and (indice + 1) % self.aulas_por_dia != 0:
+                    solucao.add_restricoes_leves(aula, self.mascara_adjacentes_bloco(indice, lista_de_horarios))
+                    i += 2
+                else:
+                    sem_bloco.setdefault(aula, []).append(indice)
+                    i += 1
+        return sem_bloco
+
+    def mascara_adjacentes_bloco(self, inicio, lista_de_horarios):
+        """
+        Calcula a máscara dos horários imediatamente antes e depois de um bloco, no mesmo dia.
+
+        Args:
+            inicio (int): Índice do primeiro horário do bloco.
+            lista_de_horarios (list of Horario): Lista de horários disponíveis.
+
+        Returns:
+            (int): Máscara dos horários adjacentes ao bloco.
+        """
+        adjacentes = 0
+        if inicio % self.aulas_por_dia != 0:
+            adjacentes |= lista_de_horarios[inicio - 1].mascara
+        if inicio + 2 < len(lista_de_horarios) and (inicio + 2) % self.aulas_por_dia != 0:
+            adjacentes |= lista_de_horarios[inicio + 2].mascara
+        return adjacentes
+
+    def define_horario(self, vertice, horario, lista_de_horarios, vertices_nao_coloridos):
+        """
+        Define horário (colore) de um determinado vértice.
+
+        Args:
+            vertice (int): Índice do vértice que será definido um horário (cor).
+            horario (Horario): Horário (cor) definido para o vértice.
+            lista_de_horarios (list of Horario): Lista de horários disponíveis.
+            vertices_nao_coloridos (IndiceDePrioridade): Índice dos vértices não coloridos da solução em coloração.
+        """
+        solucao = vertices_nao_coloridos.solucao
+        grafo = self.grafo
+        professor = self.vertices[vertice].professor
+        solucao.horario[vertice] = horario.indice
+        solucao.horarios_utilizados |= horario.mascara
+        solucao.quantidade_vertices_sem_horario -= 1
+        # Verifica se horário é preferência do professor e incrementa em um a quantidade de preferências atendidas.
+        if professor.tem_preferencia(horario):
+            solucao.preferencias_atendidas_professor[grafo.professor[vertice]] += 1
+            solucao.preferencias_atendidas = solucao.preferencias_atendidas + 1
+
+        horario_seguinte = horario.indice + 1
+        horario_anterior = horario.indice - 1
+
+        # Não faz sentido dar preferencia em aula em sequencia, caso ela seja a primeira do dia seguinte por isso a
+        # condicao após o and
+        horario_seguinte = (horario_seguinte if (horario_seguinte < len(lista_de_horarios)
+                                                 and horario_seguinte % self.aulas_por_dia != 0)
+                            else None)
+
+        # Não faz sentido dar preferencia em aula em sequencia, caso ela seja a última do dia anterior por isso a
+        # condicao após o and
+        horario_anterior = (horario_anterior if (horario_anterior >= 0
+                                                 and horario_anterior % self.aulas_por_dia != self.aulas_por_dia - 1)
+                            else None)
+
+        # Máscara com os horários anterior e seguinte, quando existirem.
+        adjacentes = 0
+        if horario_seguinte is not None:
+            adjacentes |= lista_de_horarios[horario_seguinte].mascara
+        if horario_anterior is not None:
+            adjacentes |= lista_de_horarios[horario_anterior].mascara
+        aula = grafo.aula[vertice]
+        em_sequencia = solucao.horarios_sequencia[aula] & horario.mascara
+
+        # As cópias não coloridas de uma aula são vizinhas do vértice ou nenhuma delas é, e são atualizadas de uma vez.
+        vizinhos = self.vizinhos_nao_coloridos(vertice, vertices_nao_coloridos)
+        solucao.grau_saturacao[vizinhos] += 1
+        for vizinho in vizinhos.tolist():
+            # Adiciona o horário que está sendo colorido como restrição a todos os vértices vizinhos.
+            solucao.add_restricoes(vizinho, horario.mascara)
+            if self.sugere_horarios_sequencia and vizinho == aula:
+                if em_sequencia:
+                    # Se o vértice que está sendo definido o horario já for uma aula em sequência, adiciona o horário seguinte e
+                    # anterior como restrição leve aos vértices vizinhos que são a mesma materia e turma.
+                    solucao.add_restricoes_leves(vizinho, adjacentes)
+                else:
+                    # Se não for aula em sequência, adiciona o horário seguinte e anterior como preferencia aos vértices iguais.
+                    solucao.horarios_sequencia[vizinho] |= adjacentes
+
+            # A prioridade do vizinho é atualizada, já que seus atributos foram alterados.
+            vertices_nao_coloridos.atualiza(vizinho)
+
+    def aplica_solucao(self, horarios, solucao=None):
+        """
+        Substitui a solução atual por outra coloração, como a encontrada pela BuscaTabu.
+
+        Os horários dos vértices, os horários utilizados e as contagens de vértices sem horário e de preferências
+        atendidas são calculados a partir da nova coloração. As restrições e a saturação dos vértices da nova solução
+        são as iniciais, já que só são utilizadas durante a coloração.
+
+        Args:
+            horarios (list of int): Índice do horário de cada vértice, ou -1 para vértices sem horário.
+            solucao (Solucao|None): Solução vazia que recebe a coloração. None para criar uma nova solução, que passa
+                a ser a solução atual da instância (self.solucao).
+        """
+        if solucao is None:
+            self.solucao = Solucao(self.grafo)
+            solucao = self.solucao
+        solucao.horario[:] = horarios
+        for vertice, indice in zip(self.vertices, horarios):
+            if indice < 0:
+                continue
+            horario = self.lista_de_horarios[indice]
+            solucao.horarios_utilizados |= horario.mascara
+            solucao.quantidade_vertices_sem_horario -= 1
+            if vertice.professor.tem_preferencia(horario):
+                solucao.preferencias_atendidas_professor[self.grafo.professor[vertice.indice]] += 1
+                solucao.preferencias_atendidas += 1
+
+    def le_solucao_anterior(self, arquivo):
+        """
+        Lê uma solução gerada anteriormente e encontra o horário anterior de cada vértice.
+
+        São aceitos o arquivo gerado por gerar_solucao() (.csv ou .jsonl) e o arquivo .xlsx gerado com os horários das
+        turmas. As aulas são associadas aos vértices pela matéria, turma e professor, e não pelo índice do vértice, já
+        que a planilha Dados pode ter sido alterada desde a solução anterior. Aulas cuja matéria, turma e professor não
+        existam mais, ou cujo dia e hora não sejam mais horários de aula, são ignoradas.
+
+        Args:
+            arquivo (str): Caminho da solução anterior.
+
+        Returns:
+            (list of int): Índice do horário anterior de cada vértice, ou -1 caso o vértice não tenha horário anterior.
+        """
+        return self.associa_solucao_anterior(self.linhas_solucao(arquivo))
+
+    def associa_solucao_anterior(self, aulas):
+        """
+        Associa as aulas de uma solução anterior aos vértices pela matéria, turma e professor (ver
+        le_solucao_anterior()).
+
+        Args:
+            aulas (iterable of tuple): Matéria, turma, professor, dia e hora de cada aula com horário definido, como
+                as de linhas_solucao() ou aulas_solucao().
+
+        Returns:
+            (list of int): Índice do horário anterior de cada vértice, ou -1 caso o vértice não tenha horário anterior.
+        """
+        horarios_anteriores = dict()
+        for materia, turma, professor, dia, hora in aulas:
+            horario = self.encontra_horario(dia, hora)
+            if horario is not None:
+                chave = (str(materia), str(turma), str(professor))
+                horarios_anteriores.setdefault(chave, []).append(horario.indice)
+
+        anteriores = []
+        for vertice in self.vertices:
+            horarios = horarios_anteriores.get((str(vertice.materia), str(vertice.turma.nome),
+                                                str(vertice.professor.nome)))
+            anteriores.append(horarios.pop(0) if horarios else -1)
+        return anteriores
+
+    @staticmethod
+    def linhas_solucao(arquivo):
+        """
+        Percorre as aulas de uma solução gerada anteriormente.
+
+        Args:
+            arquivo (str): Arquivo gerado por gerar_solucao() ou arquivo .xlsx com os horários das turmas.
+
+        Yields:
+            tuple: Matéria, turma, professor, dia e hora de cada aula com horário definido.
+        """
+        if arquivo.lower().endswith('.xlsx'):
+            # Cada planilha é uma turma: a primeira linha possui o nome da turma, a segunda os dias e as demais a hora
+            # seguida das aulas no formato 'Matéria (Professor)'.
+            planilha = load_workbook(arquivo, read_only=True)
+            for grade in planilha.worksheets:
+                linhas = grade.iter_rows(values_only=True)
+                turma = next(linhas)[0]
+                dias = next(linhas)[1:]
+                for linha in linhas:
+                    for dia, aula in zip(dias, linha[1:]):
+                        if aula is not None:
+                            materia, professor = str(aula).rsplit(' (', 1)
+                            yield materia, turma, professor[:-1], dia, linha[0]
+            planilha.close()
+            return
+
+        with open(arquivo, newline='', encoding='utf-8') as entrada:
+            registros = (csv.DictReader(entrada) if arquivo.lower().endswith('.csv')
+                         else (json.loads(linha) for linha in entrada if linha.strip()))
+            for registro in registros:
+                if registro['dia'] not in (None, '') and registro['hora'] not in (None, ''):
+                    yield (registro['materia'], registro['turma'], registro['professor'], registro['dia'],
+                           registro['hora'])
+
+    def aulas_solucao(self):
+        """
+        Percorre as aulas com horário definido da solução atual, no mesmo formato de linhas_solucao().
+
+        Yields:
+            tuple: Matéria, turma, professor, dia e hora de cada aula com horário definido.
+        """
+        for vertice, indice in zip(self.vertices, self.solucao.horario.tolist()):
+            if indice >= 0:
+                horario = self.lista_de_horarios[indice]
+                yield vertice.materia, vertice.turma.nome, vertice.professor.nome, horario.dia, horario.hora
+
+    def altera_restricoes(self, alteracoes):
+        """
+        Adiciona ou remove restrições de professores e turmas na instância já lida, sem reler a planilha. A solução
+        atual não é alterada: para refazê-la a partir dela, utilize recolore().
+
+        Args:
+            alteracoes (list of dict): Alterações, cada uma com o tipo ('professor' ou 'turma'), o nome, o dia e a hora
+                do horário e, opcionalmente, remover igual a True para retirar a restrição.
+
+        Raises:
+            ValueError: Caso o tipo, o professor, a turma ou o horário de alguma alteração não exista. Nesse caso,
+                nenhuma alteração é aplicada.
+        """
+        # Todas as alterações são validadas antes de aplicar a primeira, para não deixar a instância pela metade.
+        validas = []
+        for alteracao in alteracoes:
+            grupos = {'professor': self.professores, 'turma': self.turmas}.get(alteracao.get('tipo'))
+            if grupos is None:
+                raise ValueError('Tipo de restrição inválido: {}.'.format(alteracao.get('tipo')))
+            if alteracao.get('nome') not in grupos:
+                raise ValueError('{} não encontrado: {}.'.format(alteracao['tipo'].capitalize(), alteracao.get('nome')))
+            horario = self.encontra_horario(alteracao.get('dia'), alteracao.get('hora'))
+            if horario is None:
+                raise ValueError('Horário não encontrado: {} {}.'.format(alteracao.get('dia'), alteracao.get('hora')))
+            validas.append((alteracao, grupos, horario))
+
+        for alteracao, grupos, horario in validas:
+            if alteracao.get('remover', False):
+                grupos[alteracao['nome']].restricoes &= ~horario.mascara
+            else:
+                grupos[alteracao['nome']].add_restricao(horario)
+
+        self.atualiza_restricoes_preferencias_vertices()
+        # Os limites e o verificador dependem das restrições e são refeitos na próxima chamada.
+        self.limites = None
+        self.verificador = None
+
+    def recolore(self, anteriores):
+        """
+        Refaz a coloração a partir de uma solução anterior (início a quente), mantendo o máximo possível de aulas.
+
+        As aulas cujo horário anterior ainda respeita as restrições dos professores e das turmas, sem conflitar com
+        outra aula mantida, são fixadas, e apenas as demais são coloridas pelo dsatur_com_heristica(). Se alguma aula
+        que tinha horário na solução anterior ficar sem horário, a coloração é refeita liberando também as aulas da
+        mesma turma e do mesmo professor dessas aulas (sua vizinhança no grafo), e é mantida a melhor das duas
+        colorações: menos aulas sem horário e, depois, menos aulas movidas.
+
+        Args:
+            anteriores (list of int): Índice do horário anterior de cada vértice, ou -1, como retornado por
+                le_solucao_anterior().
+
+        Returns:
+            (int): Quantidade de aulas com horário anterior que mudaram de horário.
+        """
+        grafo = self.grafo
+
+        fixos = []
+        ocupados_turma = set()
+        ocupados_professor = set()
+        aulas = grafo.aula.tolist()
+        for vertice, indice in enumerate(anteriores):
+            turma = (int(grafo.turma[vertice]), indice)
+            professor = (int(grafo.professor[vertice]), indice)
+            if (indice >= 0 and not grafo.restricoes[aulas[vertice]] >> indice & 1
+                    and turma not in ocupados_turma and professor not in ocupados_professor):
+                fixos.append((vertice, indice))
+                ocupados_turma.add(turma)
+                ocupados_professor.add(professor)
+
+        with self.etapa('recolore'):
+            melhor = Solucao(grafo)
+            self.dsatur_com_heristica(fixos=fixos, solucao=melhor)
+            resultado = self.resultado_recoloracao(anteriores, melhor)
+
+            # Apenas as aulas que tinham horário na solução anterior e o perderam liberam sua vizinhança.
+            perdidas = [vertice for vertice in np.flatnonzero(melhor.horario < 0).tolist() if anteriores[vertice] >= 0]
+            if len(perdidas) > 0:
+                liberados = set()
+                for vertice in perdidas:
+                    liberados.update(grafo.vizinhos(vertice).tolist())
+
+                solucao = Solucao(grafo)
+                self.dsatur_com_heristica(fixos=[(vertice, indice) for vertice, indice in fixos
+                                                 if vertice not in liberados], solucao=solucao)
+                if self.resultado_recoloracao(anteriores, solucao) < resultado:
+                    melhor = solucao
+                    resultado = self.resultado_recoloracao(anteriores, solucao)
+
+        self.solucao = melhor
+        return resultado[1]
+
+    def resultado_recoloracao(self, anteriores, solucao):
+        """
+        Avalia uma coloração em relação a uma solução anterior.
+
+        Args:
+            anteriores (list of int): Índice do horário anterior de cada vértice, ou -1.
+            solucao (Solucao): Coloração avaliada.
+
+        Returns:
+            tuple of (int, int): Quantidade de aulas sem horário e quantidade de aulas com horário anterior que mudaram
+            de horário.
+        """
+        movidas = sum(1 for anterior, atual in zip(anteriores, solucao.horario.tolist())
+                      if anterior >= 0 and anterior != atual)
+        return solucao.quantidade_vertices_sem_horario, movidas
+
+    def busca_tabu(self, limite_tempo, semente=None):
+        """
+        Melhora a coloração atual com uma busca tabu limitada pelo tempo (ver BuscaTabu) e aplica a melhor solução.
+
+        Args:
+            limite_tempo (float): Tempo limite da busca, em segundos.
+            semente (int|None): Semente do sorteio dos vértices.
+
+        Returns:
+            (list of tuple): Evolução da melhor solução: (tempo, aulas sem horário, penalidade).
+        """
+        with self.etapa('busca_tabu'):
+            busca = BuscaTabu(self)
+            self.aplica_solucao(busca.executa(limite_tempo, semente))
+        return busca.curva
+
+    def editor(self):
+        """
+        Cria um editor (Editor) a partir da solução atual, para consultar e aplicar movimentos e trocas de aulas.
+
+        Returns:
+            (Editor): Editor da solução atual.
+        """
+        return Editor(self)
+
+    def fixa_horarios(self, fixos, solucao):
+        """
+        Define o horário de um conjunto de vértices de uma só vez, com o mesmo efeito de chamar define_horario() para
+        cada um deles quando não há prioridade de aulas sequenciais.
+
+        Ao invés de percorrer os vizinhos de cada vértice fixo, os horários fixos são agrupados por turma e por
+        professor, e cada aula com cópias não fixas recebe as restrições e a saturação da sua turma e do seu professor.
+        O custo é linear na quantidade de vértices.
+
+        Args:
+            fixos (list of (int, int)): Pares (vértice, índice do horário), sem conflitos entre si.
+            solucao (Solucao): Solução em coloração, ainda sem nenhum vértice colorido.
+        """
+        grafo = self.grafo
+        mascaras_turma = [0] * (len(grafo.inicio_turma) - 1)
+        mascaras_professor = [0] * (len(grafo.inicio_professor) - 1)
+        # Quantidade de vértices fixos de cada turma, de cada professor e de cada par (turma, professor). Um vértice
+        # fixo com a mesma turma e o mesmo professor de outro é vizinho por ambos, mas conta uma única vez na saturação.
+        fixos_turma = [0] * len(mascaras_turma)
+        fixos_professor = [0] * len(mascaras_professor)
+        fixos_par = dict()
+
+        for vertice, indice in fixos:
+            horario = self.lista_de_horarios[indice]
+            professor = self.vertices[vertice].professor
+            turma_vertice = int(grafo.turma[vertice])
+            professor_vertice = int(grafo.professor[vertice])
+
+            solucao.horario[vertice] = indice
+            solucao.horarios_utilizados |= horario.mascara
+            solucao.quantidade_vertices_sem_horario -= 1
+            if professor.tem_preferencia(horario):
+                solucao.preferencias_atendidas_professor[professor_vertice] += 1
+                solucao.preferencias_atendidas += 1
+
+            mascaras_turma[turma_vertice] |= horario.mascara
+            mascaras_professor[professor_vertice] |= horario.mascara
+            fixos_turma[turma_vertice] += 1
+            fixos_professor[professor_vertice] += 1
+            par = (turma_vertice, professor_vertice)
+            fixos_par[par] = fixos_par.get(par, 0) + 1
+
+        # As cópias não fixas de uma aula recebem as mesmas restrições e a mesma saturação.
+        nao_fixas = np.unique(grafo.aula[solucao.horario < 0]).tolist()
+        for aula, turma, professor in zip(nao_fixas, grafo.turma_aula[nao_fixas].tolist(),
+                                          grafo.professor_aula[nao_fixas].tolist()):
+            solucao.add_restricoes(aula, mascaras_turma[turma] | mascaras_professor[professor])
+            solucao.grau_saturacao[aula] += (fixos_turma[turma] + fixos_professor[professor]
+                                             - fixos_par.get((turma, professor), 0))
+
+    def vizinhos_nao_coloridos(self, vertice, vertices_nao_coloridos):
+        """
+        Encontra as aulas com cópias vizinhas de um determinado vértice que ainda não estão coloridas, incluindo as
+        demais cópias da aula do próprio vértice.
+
+        Args:
+            vertice (int): Índice do vértice que se deseja encontrar a vizinha descolorida.
+            vertices_nao_coloridos (IndiceDePrioridade): Índice dos vértices não coloridos.
+
+        Return:
+            (numpy.ndarray): Índices das aulas com cópias vizinhas não coloridas.
+        """
+        vizinhas = self.grafo.aulas_vizinhas(self.grafo.aula[vertice])
+        versao = vertices_nao_coloridos.versao
+        if self.perfil is not None:
+            self.perfil.conta('vizinhos_nao_coloridos')
+            self.perfil.conta('vizinhos_analisados', len(vizinhas))
+        return vizinhas[[versao[vizinha] >= 0 for vizinha in vizinhas.tolist()]]
+
+    def indice_menor_horario_utilizado(self, lista_de_horarios, solucao=None):
+        """
+        Encontra o horário de menor índice utilizado em uma determinada lista de horários.
+
+        Args:
+            lista_de_horarios (list of Horario): Lista de horários.
+            solucao (Solucao|None): Solução consultada. None para utilizar a solução atual.
+
+        Returns:
+            (int): Menor índice como horário utilizado.
+        """
+        indice = primeiro_bit((self.solucao if solucao is None else solucao).horarios_utilizados)
+        return len(lista_de_horarios) if indice is None else indice
+
+    def proporcao_preferencias_atendidas(self):
+        """
+        Calcula a proporção entre a quantidade de preferências atendidas e o total de preferências existentes.
+
+        Returns:
+            (float): Proporção entre quantidade de preferências atendidas e o total de preferências existentes, ou 1.0
+            caso os professores não tenham preferências.
+        """
+        return self.preferencias_atendidas / self.total_preferencias if self.total_preferencias > 0 else 1.0
+
+    def qualidade(self, solucao=None):
+        """
+        Retorna a qualidade da coloração, para comparação entre soluções. Quanto menor, melhor.
+
+        Args:
+            solucao (Solucao|None): Solução avaliada. None para avaliar a solução atual.
+
+        Returns:
+            tuple of (int, int, float): Quantidade de vértices sem horário, quantidade de horários utilizados e a
+            proporção de preferências atendidas com sinal negativo.
+        """
+        solucao = self.solucao if solucao is None else solucao
+        proporcao = solucao.preferencias_atendidas / self.total_preferencias if self.total_preferencias > 0 else 1.0
+        return (solucao.quantidade_vertices_sem_horario, quantidade_bits(solucao.horarios_utilizados), -proporcao)
+
+    def limites_inferiores(self):
+        """
+        Calcula os limites inferiores da instância (LimitesInferiores), apenas na primeira chamada.
+
+        Returns:
+            (LimitesInferiores): Limites inferiores da quantidade de aulas sem horário e de cores.
+        """
+        if self.limites is None:
+            with self.etapa('limites_inferiores'):
+                self.limites = LimitesInferiores(self.grafo, len(self.lista_de_horarios))
+        return self.limites
+
+    def verifica(self, horarios=None):
+        """
+        Verifica as restrições obrigatórias e calcula as penalidades das desejáveis de uma solução (Verificador). O
+        verificador é montado apenas na primeira chamada.
+
+        Args:
+            horarios (list of int|numpy.ndarray|None): Índice do horário de cada vértice, ou -1. None para verificar a
+                solução atual.
+
+        Returns:
+            (dict): Resultado de Verificador.verifica().
+        """
+        with self.etapa('verifica'):
+            if self.verificador is None:
+                self.verificador = Verificador(self)
+            return self.verificador.verifica(self.solucao.horario if horarios is None else horarios)
+
+    def imprimir_verificacao(self, verificacao):
+        """
+        Imprime o resultado de uma verificação (verifica()).
+
+        Args:
+            verificacao (dict): Resultado da verificação.
+        """
+        print('\nVerificação da solução:')
+        print('Violações das restrições obrigatórias:', len(verificacao['violacoes']))
+        for violacao in verificacao['violacoes']:
+            indice = violacao['horario']
+            horario = (self.lista_de_horarios[indice].dados() if 0 <= indice < len(self.lista_de_horarios)
+                       else 'horário inexistente ({})'.format(indice))
+            print('  {} - {}: {}'.format(violacao['restricao'], horario,
+                                         '; '.join(self.vertices[vertice].dados() for vertice in violacao['vertices'])))
+        print('Aulas sem horário (R3):', verificacao['sem_horario'])
+        print('Penalidades (R5, R6, R7): {R5}, {R6}, {R7}'.format(**verificacao))
+
+    def atingiu_limite_inferior(self, solucao=None):
+        """
+        Verifica se uma solução é ótima por ter todas as aulas alocadas e a quantidade de cores do limite inferior.
+
+        Args:
+            solucao (Solucao|None): Solução verificada. None para verificar a solução atual.
+
+        Returns:
+            (bool): True caso a solução não possa ser melhorada em aulas sem horário nem em cores.
+        """
+        solucao = self.solucao if solucao is None else solucao
+        return (solucao.quantidade_vertices_sem_horario == 0
+                and quantidade_bits(solucao.horarios_utilizados) <= self.limites_inferiores().cores)
+
+    def quantidade_horarios_utilizados(self):
+        """
+        Encontra a quantidade de horários (cores) utilizados.
+
+        Returns:
+            (int): Quantidade de horários utilizados.
+        """
+        return quantidade_bits(self.horarios_utilizados)
+
+    def vertices_coloridos(self):
+        """
+        Encontra os vértices que possuem horário definido, ordenados pelo horário (cor) e, em seguida, pelo índice.
+
+        Returns:
+            (list of Vertice): Vértices coloridos.
+        """
+        horario = self.solucao.horario
+        coloridos = np.flatnonzero(horario >= 0)
+        ordem = coloridos[np.argsort(horario[coloridos], kind='stable')]
+        return [self.vertices[vertice] for vertice in ordem.tolist()]
+
+    def gerar_horarios_por_turma(self, nome_arquivo_saida):
+        """
+        Gera um arquivo .xlsx com os horários das turmas.
+
+        Args:
+            nome_arquivo_saida (str): Nome do arquivo de saída.
+        """
+        self.gerar_horarios(nome_arquivo_turmas=nome_arquivo_saida)
+
+    def gerar_horarios_por_professor(self, nome_arquivo_saida):
+        """
+        Gera um arquivo .xlsx com os horários dos professores.
+
+        Args:
+            nome_arquivo_saida (str): Nome do arquivo de saída.
+        """
+        self.gerar_horarios(nome_arquivo_professores=nome_arquivo_saida)
+
+    def gerar_horarios(self, nome_arquivo_turmas=None, nome_arquivo_professores=None):
+        """
+        Gera os arquivos .xlsx com os horários das turmas e/ou dos professores.
+
+        As grades de todas as turmas e de todos os professores são montadas em memória como vetores, em uma única
+        passagem pelos vértices coloridos. Depois, cada grade é escrita linha a linha no modo write_only da biblioteca
+        openpyxl, de forma que o tempo e a memória sejam lineares na quantidade de aulas.
+
+        Args:
+            nome_arquivo_turmas (str|None): Nome do arquivo de saída com os horários das turmas, ou None para não
+                gerá-lo.
+            nome_arquivo_professores (str|None): Nome do arquivo de saída com os horários dos professores, ou None para
+                não gerá-lo.
+        """
+        with self.etapa('monta_grades'):
+            dias, horas, turmas, grade_turmas, professores, grade_professores = self.monta_grades()
+
+        if nome_arquivo_turmas:
+            with self.etapa('exporta_turmas'):
+                self.salva_grades(nome_arquivo_turmas, [str(turma.nome) for turma in turmas], grade_turmas, dias,
+                                  horas)
+
+        if nome_arquivo_professores:
+            with self.etapa('exporta_professores'):
+                ordem = sorted(range(len(professores)), key=lambda indice: professores[indice].nome)
+                self.salva_grades(nome_arquivo_professores, [str(professores[indice].nome) for indice in ordem],
+                                  grade_professores[ordem], dias, horas)
+
+    def monta_grades(self):
+        """
+        Monta as grades de horários de todas as turmas e de todos os professores.
+
+        Returns:
+            (tuple): Dias, horas, lista de turmas, grade das turmas, lista de professores e grade dos professores. As
+            grades são vetores com dimensões (turmas ou professores, horas, dias) com o texto de cada aula.
+        """
+        dias = list(self.horarios.keys())
+        horas = list(self.horarios[dias[0]].keys())
+        grafo = self.grafo
+        horario = self.solucao.horario
+
+        # O índice de um horário é dia * aulas_por_dia + hora, pois a lista de horários é ordenada por dia e hora.
+        coloridos = np.flatnonzero(horario >= 0)
+        dia = horario[coloridos] // self.aulas_por_dia
+        hora = horario[coloridos] % self.aulas_por_dia
+        vertices = [self.vertices[vertice] for vertice in coloridos.tolist()]
+
+        textos_turmas = np.empty(len(vertices), dtype=object)
+        textos_turmas[:] = ['{} ({})'.format(vertice.materia, vertice.professor.nome) for vertice in vertices]
+        textos_professores = np.empty(len(vertices), dtype=object)
+        textos_professores[:] = ['{} ({})'.format(vertice.turma.nome, vertice.materia) for vertice in vertices]
+
+        turmas = list(self.turmas.values())
+        grade_turmas = np.empty((len(turmas), len(horas), len(dias)), dtype=object)
+        grade_turmas[grafo.turma[coloridos], hora, dia] = textos_turmas
+
+        professores = list(self.professores.values())
+        grade_professores = np.empty((len(professores), len(horas), len(dias)), dtype=object)
+        grade_professores[grafo.professor[coloridos], hora, dia] = textos_professores
+
+        return dias, horas, turmas, grade_turmas, professores, grade_professores
+
+    @staticmethod
+    def salva_grades(nome_arquivo_saida, nomes, grades, dias, horas):
+        """
+        Escreve um arquivo .xlsx com uma planilha para cada grade, no modo write_only da biblioteca openpyxl.
+
+        Args:
+            nome_arquivo_saida (str): Nome do arquivo de saída, sem a extensão.
+            nomes (list of str): Nome de cada planilha.
+            grades (numpy.ndarray): Grades com dimensões (planilhas, horas, dias).
+            dias (list of str): Dias da semana.
+            horas (list of str): Horas de início das aulas.
+        """
+        planilha = Workbook(write_only=True)
+        for nome, grade in zip(nomes, grades):
+            horario = planilha.create_sheet(nome)
+            for coluna in range(2, len(dias) + 2):
+                horario.column_dimensions[get_column_letter(coluna)].width = 20
+
+            horario.append([nome])
+            horario.append([None] + dias)
+            for hora, linha in zip(horas, grade.tolist()):
+                horario.append([hora] + linha)
+
+        planilha.save(nome_arquivo_saida + '.xlsx')
+
+    def gerar_arquivos(self, diretorio_saida, horario_turma=False, horario_professor=False, solucao=False):
+        """
+        Gera os arquivos de saída da escola em um diretório, com o nome da escola seguido do nome informado. Por
+        exemplo, com horario_turma igual a 'turmas', os horários das turmas da Escola_A.xlsx são salvos em
+        Escola_A_turmas.xlsx.
+
+        Args:
+            diretorio_saida (str): Diretório dos arquivos de saída.
+            horario_turma (str|bool): Nome do arquivo com os horários das turmas, ou False para não gerá-lo.
+            horario_professor (str|bool): Nome do arquivo com os horários dos professores, ou False para não gerá-lo.
+            solucao (str|bool): Nome do arquivo com o horário de cada aula, ou False para não gerá-lo.
+        """
+        prefixo = path.join(diretorio_saida, self.nome_escola() + '_')
+        if horario_turma or horario_professor:
+            self.gerar_horarios(prefixo + horario_turma if horario_turma else None,
+                                prefixo + horario_professor if horario_professor else None)
+        if solucao:
+            self.gerar_solucao(prefixo + solucao)
+
+    def nome_escola(self):
+        """
+        Retorna o nome da escola, obtido a partir do nome do arquivo (ou diretório) da instância.
+
+        Returns:
+            (str): Nome da escola.
+        """
+        return path.splitext(path.basename(path.normpath(self.arquivo)))[0]
+
+    def gerar_solucao(self, nome_arquivo_saida):
+        """
+        Gera um arquivo com o horário definido para cada aula (vértice), para ser lido por outros sistemas.
+
+        O arquivo é escrito linha a linha. Se o nome terminar em .csv, é gerado um arquivo CSV com as colunas vertice,
+        materia, turma, professor, dia e hora. Caso contrário, é gerado um arquivo JSON-lines com um objeto por aula,
+        com os mesmos campos. Aulas sem horário definido possuem dia e hora vazios (None).
+
+        Args:
+            nome_arquivo_saida (str): Nome do arquivo de saída.
+        """
+        campos = ['vertice', 'materia', 'turma', 'professor', 'dia', 'hora']
+        csv_saida = nome_arquivo_saida.lower().endswith('.csv')
+
+        with self.etapa('gerar_solucao'):
+            with open(nome_arquivo_saida, 'w', newline='', encoding='utf-8') as arquivo:
+                escritor = csv.writer(arquivo) if csv_saida else None
+                if csv_saida:
+                    escritor.writerow(campos)
+
+                for vertice, indice_horario in zip(self.vertices, self.solucao.horario.tolist()):
+                    horario = self.lista_de_horarios[indice_horario] if indice_horario >= 0 else None
+                    valores = [vertice.indice, vertice.materia, vertice.turma.nome, vertice.professor.nome,
+                               None if horario is None else horario.dia,
+                               None if horario is None else horario.hora]
+                    if csv_saida:
+                        escritor.writerow(valores)
+                    else:
+                        arquivo.write(json.dumps(dict(zip(campos, valores)), ensure_ascii=False) + '\n')
+
+    def imprimir_resultados(self):
+        """
+        Método para impressão dos resultados obtidos.
+        """
+        print(self.nome_escola() + ':')
+        print('\nQuantidade de cores:', self.quantidade_horarios_utilizados())
+        print('\nVértices não coloridos:', self.quantidade_vertices_sem_horario)
+        print('\nPreferências atendidas sobre o total de preferências:', self.proporcao_preferencias_atendidas())
+        limites = self.limites_inferiores()
+        print('\nLimite inferior de vértices não coloridos:', limites.sem_horario)
+        print('\nLimite inferior da quantidade de cores (com todos os vértices coloridos):', limites.cores)
+        if self.quantidade_vertices_sem_horario == 0:
+            print('Diferença para o limite inferior:', self.quantidade_horarios_utilizados() - limites.cores)
+        print('\nQuantidade de preferências não atendidas para cada professor (somente dos professores que possuem preferências):')
+        atendidas = dict(zip(self.professores, self.solucao.preferencias_atendidas_professor))
+        for professor in sorted(self.professores):
+            nao_atendidas = self.professores[professor].qtd_preferencias_nao_atendidas(atendidas[professor])
+            if nao_atendidas is not None:
+                print('{}: {}'.format(professor, nao_atendidas))
+
+        componentes = self.estatisticas_componentes()
+        if len(componentes) > 1:
+            print('\nComponentes independentes (aulas, turmas, professores, cores, sem horário, preferências '
+                  'atendidas):')
+            for numero, componente in enumerate(componentes, 1):
+                print('  {}: {aulas}, {turmas}, {professores}, {cores}, {sem_horario}, {preferencias_atendidas}'.format(
+                    numero, **componente))
+
+
+class Distrito(HorarioDeAulas):
+    """
+    Várias escolas resolvidas em conjunto, em um único grafo (modo distrito).
+
+    Cada escola é lida por uma instância própria de HorarioDeAulas, inclusive com o cache, e as escolas são juntas em
+    uma única instância. Os professores são identificados pelo nome em todas as escolas, de forma que um professor que
+    leciona em mais de uma escola nunca recebe duas aulas no mesmo horário (R1), e suas restrições e preferências são a
+    união das informadas em cada escola. As turmas são identificadas pelo nome da escola e da turma, separados por '/'.
+
+    Os horários do distrito são a união dos horários das escolas, identificados pelo dia e pela hora de início e
+    ordenados pela hora. Assim, aulas de escolas diferentes no mesmo dia e hora conflitam para um professor
+    compartilhado, e as turmas de cada escola recebem como restrição os horários que não existem na sua escola.
+
+    A coloração e as demais operações são as de HorarioDeAulas sobre o grafo do distrito. As escolas que não
+    compartilham professores formam componentes independentes do grafo, coloridas separadamente e, com mais de um
+    processo, em paralelo (colore_componentes()). Os arquivos de saída são gerados por escola, com a parte da solução
+    do distrito correspondente às suas aulas.
+
+    Attributes:
+        escolas (list of HorarioDeAulas): Instância de cada escola, na ordem dos arquivos.
+        horarios_escola (list of (list of int)): Índice, no distrito, de cada horário de cada escola.
+        inicio_escola (numpy.ndarray): Índice do primeiro vértice de cada escola no distrito. Os vértices de cada escola
+            mantêm a ordem da escola.
+    """
+
+    def __init__(self, arquivos, prioridade_aula_sequencial=False, diretorio_cache=None, perfil=None):
+        """
+        Construtor da classe Distrito.
+
+        Args:
+            arquivos (list of str): Caminhos das instâncias das escolas.
+            prioridade_aula_sequencial (bool|str): True para priorizar o máximo de aulas em sequencia igual a 2.
+            diretorio_cache (str|None): Diretório do cache de instâncias já lidas. None para não utilizar o cache.
+            perfil (Perfil|None): Registro dos tempos das etapas e dos contadores, ou None para não medir a execução.
+
+        Raises:
+            ValueError: Caso duas escolas possuam o mesmo nome.
+        """
+        self.inicializa_atributos(list(arquivos), prioridade_aula_sequencial, diretorio_cache, perfil)
+        self.escolas = [HorarioDeAulas(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                                       diretorio_cache=diretorio_cache, perfil=perfil) for arquivo in self.arquivo]
+        self.horarios_escola = []
+        self.inicio_escola = np.zeros(len(self.escolas) + 1, dtype=np.int64)
+
+        with self.etapa('junta_escolas'):
+            self.junta_escolas()
+        with self.etapa('define_arestas'):
+            self.define_arestas()
+        with self.etapa('atualiza_restricoes_preferencias_vertices'):
+            self.atualiza_restricoes_preferencias_vertices()
+
+        self.solucao = Solucao(self.grafo)
+
+    def junta_escolas(self):
+        """
+        Junta os horários, as turmas, os professores e os vértices de todas as escolas.
+
+        Raises:
+            ValueError: Caso duas escolas possuam o mesmo nome.
+        """
+        nomes = [escola.nome_escola() for escola in self.escolas]
+        for nome in nomes:
+            if nomes.count(nome) > 1:
+                raise ValueError('Há mais de uma escola com o nome {}.'.format(nome))
+
+        dias = []
+        horas = []
+        for escola in self.escolas:
+            for dia, horas_dia in escola.horarios.items():
+                if dia not in dias:
+                    dias.append(dia)
+                horas += [hora for hora in horas_dia if hora not in horas]
+        for dia in dias:
+            for hora in sorted(horas, key=self.chave_hora):
+                self.adiciona_horario(dia, hora)
+        self.aulas_por_dia = len(horas)
+        todos = (1 << len(self.lista_de_horarios)) - 1
+
+        for numero, (nome, escola) in enumerate(zip(nomes, self.escolas)):
+            mapa = [self.horarios_por_dia_hora[(horario.dia, horario.hora)].indice
+                    for horario in escola.lista_de_horarios]
+            self.horarios_escola.append(mapa)
+
+            def mascara_distrito(mascara):
+                return sum(1 << mapa[indice] for indice in range(len(mapa)) if mascara >> indice & 1)
+
+            # Os horários que não existem na escola são restritos às suas turmas.
+            fora_da_escola = todos & ~mascara_distrito((1 << len(mapa)) - 1)
+            turmas = dict()
+            for turma in escola.turmas.values():
+                turmas[turma.nome] = Restricao('{}/{}'.format(nome, turma.nome))
+                turmas[turma.nome].restricoes = mascara_distrito(turma.restricoes) | fora_da_escola
+                self.turmas[turmas[turma.nome].nome] = turmas[turma.nome]
+
+            for professor in escola.professores.values():
+                if professor.nome not in self.professores:
+                    self.professores[professor.nome] = Professor(professor.nome)
+                do_distrito = self.professores[professor.nome]
+                do_distrito.restricoes |= mascara_distrito(professor.restricoes)
+                for horario in professor.preferencias:
+                    horario = self.lista_de_horarios[mapa[horario.indice]]
+                    # Uma preferência informada por mais de uma escola é contada uma única vez.
+                    if not do_distrito.tem_preferencia(horario):
+                        do_distrito.add_preferencia(horario)
+                        self.total_preferencias += 1
+
+            for vertice in escola.vertices:
+                self.insere_vertice((vertice.materia, turmas[vertice.turma.nome],
+                                     self.professores[vertice.professor.nome]))
+            self.inicio_escola[numero + 1] = len(self.vertices)
+
+    @staticmethod
+    def chave_hora(hora):
+        """
+        Chave de ordenação das horas de início das aulas. Horas no formato H:MM ou H:MM:SS são ordenadas pelo valor, e
+        as demais, depois delas, pelo texto.
+
+        Args:
+            hora (str): Hora de início da aula.
+
+        Returns:
+            tuple: Chave de ordenação.
+        """
+        try:
+            return 0, tuple(int(parte) for parte in hora.split(':'))
+        except ValueError:
+            return 1, hora
+
+    def nome_escola(self):
+        """
+        Retorna o nome do distrito, formado pelos nomes das escolas.
+
+        Returns:
+            (str): Nome do distrito.
+        """
+        return 'Distrito ({})'.format(', '.join(escola.nome_escola() for escola in self.escolas))
+
+    def distribui_solucao(self):
+        """
+        Aplica a solução atual do distrito à instância de cada escola, convertendo os horários do distrito nos horários
+        da escola.
+        """
+        horario = self.solucao.horario
+        for numero, (escola, mapa) in enumerate(zip(self.escolas, self.horarios_escola)):
+            # A última posição converte as aulas sem horário (-1) em -1.
+            para_escola = np.full(len(self.lista_de_horarios) + 1, -1, dtype=np.int32)
+            para_escola[mapa] = np.arange(len(mapa))
+            escola.aplica_solucao(para_escola[horario[self.inicio_escola[numero]:self.inicio_escola[numero + 1]]]
+                                  .tolist())
+
+    def gerar_arquivos(self, diretorio_saida, horario_turma=False, horario_professor=False, solucao=False):
+        """
+        Gera os arquivos de saída de cada escola (HorarioDeAulas.gerar_arquivos()) com a solução atual do distrito.
+
+        Args:
+            diretorio_saida (str): Diretório dos arquivos de saída.
+            horario_turma (str|bool): Nome do arquivo com os horários das turmas, ou False para não gerá-lo.
+            horario_professor (str|bool): Nome do arquivo com os horários dos professores, ou False para não gerá-lo.
+            solucao (str|bool): Nome do arquivo com o horário de cada aula, ou False para não gerá-lo.
+        """
+        self.distribui_solucao()
+        for escola in self.escolas:
+            escola.gerar_arquivos(diretorio_saida, horario_turma, horario_professor, solucao)
+
+    def estatisticas_escolas(self):
+        """
+        Calcula as estatísticas da solução atual em cada escola.
+
+        Returns:
+            (list of dict): Para cada escola, o nome ('escola') e as estatísticas de estatisticas_vertices().
+        """
+        estatisticas = []
+        for numero, escola in enumerate(self.escolas):
+            vertices = np.arange(self.inicio_escola[numero], self.inicio_escola[numero + 1])
+            estatisticas.append(dict(escola=escola.nome_escola(), **self.estatisticas_vertices(vertices)))
+        return estatisticas
+
+    def imprimir_resultados(self):
+        """
+        Imprime os resultados do distrito e as estatísticas de cada escola.
+        """
+        super().imprimir_resultados()
+        print('\nEscolas (aulas, turmas, professores, cores, sem horário, preferências atendidas):')
+        for escola in self.estatisticas_escolas():
+            print('  {escola}: {aulas}, {turmas}, {professores}, {cores}, {sem_horario}, '
+                  '{preferencias_atendidas}'.format(**escola))
+
+
+def carrega_instancia(arquivo, prioridade_aula_sequencial=False, diretorio_cache=None, perfil=None):
+    """
+    Lê uma escola ou, com uma lista de arquivos, um distrito.
+
+    Args:
+        arquivo (str|list of str): Caminho da instância ou, no modo distrito, das instâncias das escolas.
+        prioridade_aula_sequencial (bool|str): Opção de priorizar aulas sequenciais.
+        diretorio_cache (str|None): Diretório do cache de instâncias.
+        perfil (Perfil|None): Registro dos tempos e contadores.
+
+    Returns:
+        (HorarioDeAulas): Instância lida, do tipo Distrito no modo distrito.
+    """
+    if isinstance(arquivo, (list, tuple)):
+        return Distrito(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                        diretorio_cache=diretorio_cache, perfil=perfil)
+    return HorarioDeAulas(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                          diretorio_cache=diretorio_cache, perfil=perfil)
+
+
+# Instância enviada a cada processo de colore_multiplos_inicios() e de HorarioDeAulas.colore_componentes()
+# (inicializa_processo()).
+INSTANCIA_PROCESSO = None
+
+
+def inicializa_processo(horarios_de_aula):
+    """
+    Guarda no processo a instância do processo principal, recebida uma única vez na criação do processo. Assim, os
+    processos colorem exatamente a instância em memória, inclusive com as alterações feitas após a leitura (como as de
+    HorarioDeAulas.altera_restricoes()), sem ler a planilha novamente.
+
+    Args:
+        horarios_de_aula (HorarioDeAulas): Instância do processo principal.
+    """
+    global INSTANCIA_PROCESSO
+    INSTANCIA_PROCESSO = horarios_de_aula
+
+
+def executa_inicio(semente):
+    """
+    Executa um início do algoritmo de coloração sobre a instância do processo (inicializa_processo()).
+
+    Função utilizada pelos processos de colore_multiplos_inicios().
+
+    Args:
+        semente (int|None): Semente do desempate aleatório.
+
+    Returns:
+        tuple: Qualidade da coloração (HorarioDeAulas.qualidade()) e a semente utilizada.
+    """
+    solucao = Solucao(INSTANCIA_PROCESSO.grafo)
+    INSTANCIA_PROCESSO.colore_componentes(semente, solucao=solucao)
+    return INSTANCIA_PROCESSO.qualidade(solucao), semente
+
+
+def colore_grupo_componentes(componentes, semente):
+    """
+    Colore um grupo de componentes do grafo sobre a instância do processo (inicializa_processo()).
+
+    Função utilizada pelos processos de HorarioDeAulas.colore_componentes(). As componentes são coloridas uma após a
+    outra sobre uma nova solução, com os horários utilizados reiniciados a cada componente.
+
+    Args:
+        componentes (list of numpy.ndarray): Vértices de cada componente do grupo.
+        semente (int|None): Semente do desempate aleatório.
+
+    Returns:
+        (list of numpy.ndarray): Índice do horário de cada vértice de cada componente, ou -1.
+    """
+    horarios_de_aula = INSTANCIA_PROCESSO
+    solucao = Solucao(horarios_de_aula.grafo)
+    for vertices in componentes:
+        solucao.horarios_utilizados = 0
+        horarios_de_aula.dsatur_com_heristica(semente, solucao=solucao, vertices=vertices)
+    return [solucao.horario[vertices] for vertices in componentes]
+
+
+def multiplos_inicios(arquivo, prioridade_aula_sequencial=False, diretorio_cache=None, inicios=1, processos=1,
+                      perfil=None):
+    """
+    Executa o algoritmo de coloração várias vezes, com desempates aleatórios diferentes, e mantém a melhor solução.
+
+    O primeiro início utiliza o desempate original (sem semente) e os demais utilizam as sementes 1, 2, ..., de forma
+    que o resultado nunca é pior que o de uma única execução. As soluções são comparadas por HorarioDeAulas.qualidade():
+    menor quantidade de vértices sem horário, depois menor quantidade de horários utilizados e, por fim, maior proporção
+    de preferências atendidas. Os inícios são interrompidos assim que uma solução sem aulas sem horário atinge o limite
+    inferior de cores (HorarioDeAulas.limites_inferiores()). Cada início colore as componentes do grafo separadamente
+    (colore_componentes()). Com um único processo, ou com um único início, cada início colore uma nova Solucao sobre a
+    mesma instância, e os processos são utilizados para as componentes. Com mais inícios e processos, os inícios são
+    distribuídos entre eles, e a melhor solução é refeita no processo principal a partir de sua semente, já que a
+    coloração é determinística para uma mesma semente.
+
+    Args:
+        arquivo (str|list of str): Caminho da instância ou, no modo distrito, das instâncias das escolas.
+        prioridade_aula_sequencial (bool|str): Opção de priorizar aulas sequenciais.
+        diretorio_cache (str|None): Diretório do cache de instâncias.
+        inicios (int): Quantidade de execuções do algoritmo.
+        processos (int): Quantidade de processos utilizados para os inícios ou, com um único início, para as
+            componentes do grafo.
+        perfil (Perfil|None): Registro dos tempos e contadores. Mede a leitura da instância e as colorações feitas no
+            processo principal e, com mais de um processo, o tempo total dos inícios ou das componentes distribuídos.
+
+    Returns:
+        (HorarioDeAulas): Instância (ou Distrito) colorida com a melhor solução encontrada.
+    """
+    # A instância é lida antes de criar os processos, para que eles encontrem o cache já preenchido.
+    horarios_de_aula = carrega_instancia(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                                         diretorio_cache=diretorio_cache, perfil=perfil)
+    return colore_multiplos_inicios(horarios_de_aula, inicios, processos)
+
+
+def colore_multiplos_inicios(horarios_de_aula, inicios=1, processos=1):
+    """
+    Executa os inícios de multiplos_inicios() sobre uma instância já lida.
+
+    Args:
+        horarios_de_aula (HorarioDeAulas): Instância lida. Com mais de um processo, a instância em memória é enviada a
+            cada processo (inicializa_processo()).
+        inicios (int): Quantidade de execuções do algoritmo.
+        processos (int): Quantidade de processos utilizados para os inícios ou, com um único início, para as
+            componentes do grafo.
+
+    Returns:
+        (HorarioDeAulas): A própria instância, com a melhor solução encontrada.
+    """
+    sementes = [None] + list(range(1, inicios))
+
+    if inicios > 1 and processos > 1:
+        limite = (0, horarios_de_aula.limites_inferiores().cores)
+        with horarios_de_aula.etapa('multiplos_inicios'):
+            with ProcessPoolExecutor(max_workers=processos, initializer=inicializa_processo,
+                                     initargs=(horarios_de_aula,)) as executor:
+                futuros = [executor.submit(executa_inicio, semente) for semente in sementes]
+                # Os resultados são lidos na ordem das sementes, de forma que a semente escolhida não depende da ordem
+                # em que os processos terminam. Os inícios restantes são cancelados ao atingir o limite inferior.
+                resultados = []
+                for futuro in futuros:
+                    resultados.append(futuro.result())
+                    if resultados[-1][0][:2] <= limite:
+                        for restante in futuros:
+                            restante.cancel()
+                        break
+
+        # Em caso de empate, mantém a semente de menor posição na lista.
+        melhor = min(range(len(resultados)), key=lambda indice: resultados[indice][0])
+        horarios_de_aula.colore_componentes(sementes[melhor])
+        return horarios_de_aula
+
+    # Cada coloração acumula seu tempo na etapa dsatur_com_heristica do perfil.
+    melhor = None
+    for semente in sementes:
+        solucao = Solucao(horarios_de_aula.grafo)
+        horarios_de_aula.colore_componentes(semente, solucao=solucao, processos=processos)
+        # Em caso de empate, mantém a solução de menor posição na lista.
+        if melhor is None or horarios_de_aula.qualidade(solucao) < horarios_de_aula.qualidade(melhor):
+            melhor = solucao
+        if inicios > 1 and horarios_de_aula.atingiu_limite_inferior(melhor):
+            break
+    horarios_de_aula.solucao = melhor
+    return horarios_de_aula
+
+
+def resolve_escola(arquivo, prioridade_aula_sequencial=False, diretorio_cache=None, inicios=1, limite_tempo=0,
+                   diretorio_saida='.', horario_turma=False, horario_professor=False, solucao=False, verificar=False,
+                   arquivo_perfil=False, arquivo_cprofile=False):
+    """
+    Resolve uma escola e gera seus arquivos de saída. Função utilizada pelos processos do modo em lote.
+
+    Os arquivos de saída são gerados em diretorio_saida por HorarioDeAulas.gerar_arquivos(). Os arquivos de perfil
+    seguem a mesma regra de nomes: o nome da escola seguido do nome informado.
+
+    Args:
+        arquivo (str): Caminho da instância.
+        prioridade_aula_sequencial (bool|str): Opção de priorizar aulas sequenciais.
+        diretorio_cache (str|None): Diretório do cache de instâncias.
+        inicios (int): Quantidade de execuções do algoritmo, executadas no próprio processo.
+        limite_tempo (float): Tempo da busca tabu, em segundos. 0 para não executá-la.
+        diretorio_saida (str): Diretório dos arquivos de saída.
+        horario_turma (str|bool): Nome do arquivo com os horários das turmas, ou False para não gerá-lo.
+        horario_professor (str|bool): Nome do arquivo com os horários dos professores, ou False para não gerá-lo.
+        solucao (str|bool): Nome do arquivo com o horário de cada aula, ou False para não gerá-lo.
+        verificar (bool): True para verificar a solução final (HorarioDeAulas.verifica()).
+        arquivo_perfil (str|bool): Nome do arquivo .json com os tempos e os contadores da escola (Perfil), ou False
+            para não gerá-lo.
+        arquivo_cprofile (str|bool): Nome do arquivo com as estatísticas do cProfile da escola, ou False para não
+            gerá-lo.
+
+    Returns:
+        (dict): Nome da escola, quantidade de cores, aulas sem horário, proporção de preferências atendidas, tempo de
+        cada fase (carga, coloração e exportação) e, com verificar, a quantidade de violações das restrições
+        obrigatórias ('violacoes').
+    """
+    perfil = Perfil()
+    perfilador = cProfile.Profile() if arquivo_cprofile else None
+    if perfilador is not None:
+        perfilador.enable()
+
+    horarios_de_aula = multiplos_inicios(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                                         diretorio_cache=diretorio_cache, inicios=inicios, perfil=perfil)
+    if limite_tempo > 0:
+        horarios_de_aula.busca_tabu(limite_tempo, semente=0)
+
+    horarios_de_aula.gerar_arquivos(diretorio_saida, horario_turma, horario_professor, solucao)
+
+    prefixo = path.join(diretorio_saida, horarios_de_aula.nome_escola() + '_')
+    if perfilador is not None:
+        perfilador.disable()
+        perfilador.dump_stats(prefixo + arquivo_cprofile)
+    if arquivo_perfil:
+        perfil.salva(prefixo + arquivo_perfil)
+
+    resumo = {
+        'escola': horarios_de_aula.nome_escola(),
+        'cores': horarios_de_aula.quantidade_horarios_utilizados(),
+        'sem_horario': horarios_de_aula.quantidade_vertices_sem_horario,
+        'preferencias': -horarios_de_aula.qualidade()[2],
+    }
+    if verificar:
+        resumo['violacoes'] = len(horarios_de_aula.verifica()['violacoes'])
+    for fase, etapas in FASES_PERFIL.items():
+        resumo[fase] = perfil.soma(etapas)
+    return resumo
+
+
+def arquivos_lote(lote):
+    """
+    Encontra os arquivos do modo em lote.
+
+    Args:
+        lote (str): Diretório com arquivos .xlsx ou padrão glob (por exemplo, 'escolas/*.xlsx').
+
+    Returns:
+        (list of str): Caminhos dos arquivos, em ordem alfabética.
+    """
+    padrao = path.join(lote, '*.xlsx') if path.isdir(lote) else lote
+    # Arquivos temporários do Excel (~$Escola.xlsx) não são planilhas válidas.
+    return sorted(arquivo for arquivo in glob.glob(padrao) if not path.basename(arquivo).startswith('~$'))
+
+
+def resolve_lote(arquivos, processos=1, **opcoes):
+    """
+    Resolve várias escolas em paralelo, uma por processo.
+
+    Cada processo lê e resolve uma escola por vez, de forma que a leitura das próximas planilhas acontece enquanto as
+    anteriores são resolvidas pelos demais processos. Cada processo é iniciado uma única vez, evitando o custo de
+    iniciar o Python e importar as bibliotecas para cada escola.
+
+    Args:
+        arquivos (list of str): Caminhos das instâncias.
+        processos (int): Quantidade de processos utilizados.
+        **opcoes: Demais argumentos de resolve_escola().
+
+    Returns:
+        (list of dict): Resumo de cada escola, na ordem dos arquivos. Escolas com erro possuem apenas as chaves 'escola'
+        e 'erro'.
+    """
+    resumos = []
+    with ProcessPoolExecutor(max_workers=max(1, processos)) as executor:
+        tarefas = [executor.submit(resolve_escola, arquivo, **opcoes) for arquivo in arquivos]
+        for arquivo, tarefa in zip(arquivos, tarefas):
+            try:
+                resumos.append(tarefa.result())
+            except Exception as erro:
+                resumos.append({'escola': path.basename(arquivo), 'erro': str(erro)})
+    return resumos
+
+
+def imprime_resumo_lote(resumos):
+    """
+    Imprime uma tabela com o resumo de todas as escolas do modo em lote. A coluna de violações só é exibida quando as
+    soluções foram verificadas.
+
+    Args:
+        resumos (list of dict): Resumos retornados por resolve_lote().
+    """
+    largura = max([len(resumo['escola']) for resumo in resumos] + [6])
+    verificados = any('violacoes' in resumo for resumo in resumos)
+    print('%-*s %5s %11s %11s %9s %9s %9s' % (largura, 'Escola', 'Cores', 'Sem horário', 'Preferência', 'Carga',
+                                              'Coloração', 'Exportar') + (' %9s' % 'Violações' if verificados else ''))
+    for resumo in resumos:
+        if 'erro' in resumo:
+            print('%-*s Erro: %s' % (largura, resumo['escola'], resumo['erro']))
+        else:
+            print('%-*s %5d %11d %11.3f %8.3fs %8.3fs %8.3fs'
+                  % (largura, resumo['escola'], resumo['cores'], resumo['sem_horario'], resumo['preferencias'],
+                     resumo['carga'], resumo['coloracao'], resumo['exportacao'])
+                  + (' %9d' % resumo['violacoes'] if verificados else ''))
+
+
+# Instâncias mantidas em memória por cada processo do modo serviço, indexadas pelo arquivo (ou arquivos, no modo
+# distrito). Cada valor é um dicionário com a instância, suas opções, a assinatura dos arquivos lidos e as edições
+# aplicadas (ação edita).
+INSTANCIAS_SERVICO = dict()
+
+
+def assinatura_arquivos(arquivo):
+    """
+    Calcula a assinatura dos arquivos de uma instância (data de modificação e tamanho), utilizada para identificar
+    alterações na planilha sem relê-la.
+
+    Args:
+        arquivo (str|list of str): Caminho da instância ou, no modo distrito, das instâncias das escolas.
+
+    Returns:
+        (tuple): Caminho, data de modificação e tamanho de cada arquivo existente.
+    """
+    arquivos = arquivo if isinstance(arquivo, (list, tuple)) else [arquivo]
+    assinatura = []
+    for nome_arquivo in arquivos:
+        for lido in HorarioDeAulas.arquivos_instancia(nome_arquivo):
+            if path.exists(lido):
+                estado = os.stat(lido)
+                assinatura.append((lido, estado.st_mtime_ns, estado.st_size))
+    return tuple(assinatura)
+
+
+def resumo_servico(horarios_de_aula):
+    """
+    Resume a solução atual de uma instância do modo serviço.
+
+    Args:
+        horarios_de_aula (HorarioDeAulas): Instância.
+
+    Returns:
+        (dict): Nome da escola, quantidade de cores, aulas sem horário, proporção de preferências atendidas e
+        penalidade das restrições desejáveis.
+    """
+    return {
+        'escola': horarios_de_aula.nome_escola(),
+        'cores': horarios_de_aula.quantidade_horarios_utilizados(),
+        'sem_horario': horarios_de_aula.quantidade_vertices_sem_horario,
+        'preferencias': horarios_de_aula.proporcao_preferencias_atendidas(),
+        'penalidade': horarios_de_aula.verifica()['penalidade'],
+    }
+
+
+def modo_aulas_sequenciais(valor):
+    """
+    Converte a opção de aulas sequenciais de uma requisição do modo serviço no valor de prioridade_aula_sequencial.
+
+    Args:
+        valor (bool|str): true, false, AULAS_EM_BLOCOS ('blocos') ou uma das opções de --aulas-sequenciais ('S', 'N'
+            ou 'B').
+
+    Returns:
+        (bool|str): Valor de prioridade_aula_sequencial.
+
+    Raises:
+        ValueError: Caso o valor não seja nenhum dos aceitos.
+    """
+    if isinstance(valor, bool) or valor == AULAS_EM_BLOCOS:
+        return valor
+    if valor in MODOS_AULAS_SEQUENCIAIS:
+        return MODOS_AULAS_SEQUENCIAIS[valor]
+    raise ValueError('Opção de aulas sequenciais inválida: {!r}. Utilize true, false, \'blocos\', \'S\', \'N\' ou '
+                     '\'B\'.'.format(valor))
+
+
+def atende_requisicao(requisicao, diretorio_cache):
+    """
+    Atende uma requisição do modo serviço no processo atual, reutilizando as instâncias já lidas por ele
+    (INSTANCIAS_SERVICO). Função utilizada pelos processos de Servico.
+
+    As ações aceitas são:
+        - resolve: lê a instância, caso ainda não esteja em memória, e a resolve com 'inicios' inícios e busca tabu de
+          'limite_tempo' segundos, com a opção 'aulas_sequenciais' (modo_aulas_sequenciais()). Uma instância já
+          resolvida é refeita a quente a partir da solução atual (HorarioDeAulas.recolore()), a menos que 'reinicia'
+          seja True ou que a opção de aulas sequenciais tenha mudado, quando é resolvida do zero. Se a planilha foi
+          alterada desde a última leitura, ela é lida novamente, as edições anteriores são refeitas na nova
+          instância ('edicoes_reaplicadas', e 'edicoes_descartadas' com as que deixaram de ser válidas) e a solução
+          parte da anterior;
+        - edita: aplica as 'alteracoes' de restrições (HorarioDeAulas.altera_restricoes()) à instância em memória,
+          guardando-as para refazê-las caso a planilha seja lida novamente, e refaz a solução a quente;
+        - exporta: gera os arquivos da solução atual (HorarioDeAulas.gerar_arquivos()) em 'diretorio_saida', com os
+          nomes informados em 'horario_turma', 'horario_professor' e 'solucao';
+        - verifica: verifica a solução atual (HorarioDeAulas.verifica());
+        - descarta: remove a instância da memória.
+    As ações, exceto resolve e descarta, exigem uma instância já resolvida.
+
+    Args:
+        requisicao (dict): Requisição, com a ação ('acao'), o arquivo da instância ('arquivo', ou uma lista de arquivos
+            no modo distrito) e as opções da ação.
+        diretorio_cache (str|None): Diretório do cache de instâncias.
+
+    Returns:
+        (dict): Resposta, com o resumo da solução (resumo_servico()) e, quando a solução foi refeita a quente, a
+        quantidade de aulas que mudaram de horário ('movidas').
+
+    Raises:
+        ValueError: Caso a ação ou a opção de aulas sequenciais seja inválida, ou a instância ainda não tenha sido
+            resolvida.
+    """
+    acao = requisicao.get('acao')
+    arquivo = requisicao.get('arquivo')
+    chave = tuple(arquivo) if isinstance(arquivo, list) else arquivo
+    estado = INSTANCIAS_SERVICO.get(chave)
+    resposta = dict()
+
+    if acao == 'descarta':
+        INSTANCIAS_SERVICO.pop(chave, None)
+        return resposta
+
+    if acao == 'resolve':
+        prioridade_aula_sequencial = modo_aulas_sequenciais(requisicao.get('aulas_sequenciais', False))
+        assinatura = assinatura_arquivos(arquivo)
+        if (estado is None or estado['prioridade_aula_sequencial'] != prioridade_aula_sequencial
+                or estado['assinatura'] != assinatura):
+            anterior = estado
+            estado = {
+                'horarios_de_aula': carrega_instancia(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial,
+                                                      diretorio_cache=diretorio_cache),
+                'prioridade_aula_sequencial': prioridade_aula_sequencial,
+                'assinatura': assinatura,
+                'alteracoes': [],
+            }
+            INSTANCIAS_SERVICO[chave] = estado
+            horarios_de_aula = estado['horarios_de_aula']
+            if anterior is not None and len(anterior['alteracoes']) > 0:
+                # As edições feitas na instância anterior são refeitas na nova. As que deixaram de ser válidas, como
+                # as de um professor retirado da planilha, são descartadas e informadas na resposta.
+                descartadas = []
+                for alteracao in anterior['alteracoes']:
+                    try:
+                        horarios_de_aula.altera_restricoes([alteracao])
+                        estado['alteracoes'].append(alteracao)
+                    except ValueError as erro:
+                        descartadas.append({'alteracao': alteracao, 'erro': str(erro)})
+                resposta['edicoes_reaplicadas'] = len(estado['alteracoes'])
+                resposta['edicoes_descartadas'] = descartadas
+            # A solução anterior só é aproveitada quando a planilha mudou. Com outra opção de aulas sequenciais, a
+            # instância é resolvida do zero, pois partir da solução anterior manteria a disposição da opção antiga.
+            if (anterior is not None and anterior['prioridade_aula_sequencial'] == prioridade_aula_sequencial
+                    and not requisicao.get('reinicia', False)):
+                antigas = anterior['horarios_de_aula'].aulas_solucao()
+                resposta['movidas'] = horarios_de_aula.recolore(horarios_de_aula.associa_solucao_anterior(antigas))
+            else:
+                colore_multiplos_inicios(horarios_de_aula, int(requisicao.get('inicios', 1)))
+        elif requisicao.get('reinicia', False):
+            horarios_de_aula = estado['horarios_de_aula']
+            colore_multiplos_inicios(horarios_de_aula, int(requisicao.get('inicios', 1)))
+        else:
+            # Sem mudanças na planilha, a solução atual, inclusive a refeita pelas edições, é o ponto de partida.
+            horarios_de_aula = estado['horarios_de_aula']
+            resposta['movidas'] = horarios_de_aula.recolore(horarios_de_aula.solucao.horario.tolist())
+        if float(requisicao.get('limite_tempo', 0)) > 0:
+            horarios_de_aula.busca_tabu(float(requisicao['limite_tempo']), semente=0)
+        resposta.update(resumo_servico(horarios_de_aula))
+        return resposta
+
+    if estado is None:
+        raise ValueError('A instância {} ainda não foi resolvida.'.format(arquivo))
+    horarios_de_aula = estado['horarios_de_aula']
+
+    if acao == 'edita':
+        alteracoes = requisicao.get('alteracoes', [])
+        horarios_de_aula.altera_restricoes(alteracoes)
+        estado['alteracoes'].extend(alteracoes)
+        resposta['movidas'] = horarios_de_aula.recolore(horarios_de_aula.solucao.horario.tolist())
+    elif acao == 'exporta':
+        diretorio_saida = requisicao.get('diretorio_saida', '.')
+        os.makedirs(diretorio_saida, exist_ok=True)
+        horarios_de_aula.gerar_arquivos(diretorio_saida, requisicao.get('horario_turma', False),
+                                        requisicao.get('horario_professor', False), requisicao.get('solucao', False))
+    elif acao == 'verifica':
+        resposta['verificacao'] = horarios_de_aula.verifica()
+    else:
+        raise ValueError('Ação inválida: {}.'.format(acao))
+    resposta.update(resumo_servico(horarios_de_aula))
+    return resposta
+
+
+class Servico(object):
+    """
+    Modo serviço: processo de longa duração que mantém as instâncias lidas e suas últimas soluções em memória, para
+    atender rapidamente a várias requisições sobre as mesmas escolas, como refazer o horário após cada alteração de
+    restrição.
+
+    As requisições são objetos JSON, um por linha, e as respostas são escritas da mesma forma, com o 'id' da
+    requisição, 'ok' e o tempo desde o recebimento da requisição ('tempo'), além do resultado de atende_requisicao()
+    ou da mensagem de erro ('erro'). Cada escola é atendida sempre pelo mesmo processo, onde fica a sua instância, e as
+    escolas são distribuídas entre os processos. Assim, as requisições de uma escola são atendidas na ordem em que
+    chegam, e escolas diferentes são atendidas em paralelo. As respostas são escritas na ordem em que ficam prontas,
+    e não na ordem das requisições, então devem ser associadas às requisições pelo 'id'. Linhas que não podem ser
+    atendidas, como um JSON mal formado, são respondidas imediatamente (erro_requisicao()). A ação 'encerra' termina o
+    serviço após atender as requisições pendentes.
+
+    Attributes:
+        diretorio_cache (str|None): Diretório do cache de instâncias.
+        executores (list of ProcessPoolExecutor): Um executor com um único processo para cada grupo de escolas.
+        processo_escola (dict): Índice do executor de cada escola.
+        saida (file): Arquivo onde as respostas são escritas.
+        trava (threading.Lock): Trava da escrita das respostas.
+    """
+
+    def __init__(self, processos=1, diretorio_cache=None, saida=None):
+        """
+        Construtor da classe Servico.
+
+        Args:
+            processos (int): Quantidade de processos que atendem as requisições.
+            diretorio_cache (str|None): Diretório do cache de instâncias.
+            saida (file|None): Arquivo onde as respostas são escritas. None para a saída padrão.
+        """
+        self.diretorio_cache = diretorio_cache
+        self.executores = [ProcessPoolExecutor(max_workers=1) for _ in range(max(1, processos))]
+        self.processo_escola = dict()
+        self.saida = sys.stdout if saida is None else saida
+        self.trava = threading.Lock()
+
+    def responde(self, resposta):
+        """
+        Escreve uma resposta em uma linha da saída.
+
+        Args:
+            resposta (dict): Resposta.
+        """
+        with self.trava:
+            self.saida.write(json.dumps(resposta, ensure_ascii=False, default=str) + '\n')
+            self.saida.flush()
+
+    def atende(self, entrada):
+        """
+        Lê e atende as requisições até o fim da entrada ou até a ação 'encerra'.
+
+        Args:
+            entrada (iterable of str): Linhas com as requisições, como a entrada padrão.
+        """
+        try:
+            for numero, linha in enumerate(entrada, 1):
+                if linha.strip() == '':
+                    continue
+                try:
+                    requisicao = json.loads(linha)
+                except ValueError as erro:
+                    self.responde(self.erro_requisicao(linha, numero, 'Requisição inválida: {}'.format(erro)))
+                    continue
+                if not isinstance(requisicao, dict):
+                    self.responde(self.erro_requisicao(linha, numero, 'A requisição deve ser um objeto JSON.'))
+                    continue
+                if requisicao.get('acao') == 'encerra':
+                    break
+                arquivo = requisicao.get('arquivo')
+                if not (isinstance(arquivo, str)
+                        or isinstance(arquivo, list) and all(isinstance(item, str) for item in arquivo)):
+                    self.responde(self.erro_requisicao(linha, numero, 'O arquivo deve ser um caminho ou uma lista de '
+                                                                      'caminhos.'))
+                    continue
+                self.envia(requisicao)
+        finally:
+            for executor in self.executores:
+                executor.shutdown(wait=True)
+
+    @staticmethod
+    def erro_requisicao(linha, numero, mensagem):
+        """
+        Monta a resposta de uma linha que não pode ser enviada aos processos, como um JSON mal formado. O 'id' é
+        recuperado da linha sempre que possível, mesmo que o restante dela seja inválido.
+
+        Args:
+            linha (str): Linha lida.
+            numero (int): Número da linha na entrada.
+            mensagem (str): Mensagem de erro.
+
+        Returns:
+            (dict): Resposta com 'id' (ou None), 'ok' igual a False, 'erro' e o número da linha ('linha').
+        """
+        identificador = None
+        encontrado = re.search(r'"id"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)', linha)
+        if encontrado is not None:
+            try:
+                identificador = json.loads(encontrado.group(1))
+            except ValueError:
+                pass
+        return {'id': identificador, 'ok': False, 'erro': mensagem, 'linha': numero}
+
+    def envia(self, requisicao):
+        """
+        Envia uma requisição ao processo da sua escola. A resposta é escrita quando a requisição for atendida.
+
+        Args:
+            requisicao (dict): Requisição.
+        """
+        arquivo = requisicao.get('arquivo')
+        chave = tuple(arquivo) if isinstance(arquivo, list) else arquivo
+        if chave not in self.processo_escola:
+            self.processo_escola[chave] = len(self.processo_escola) % len(self.executores)
+        inicio = time.time()
+        futuro = self.executores[self.processo_escola[chave]].submit(atende_requisicao, requisicao,
+                                                                     self.diretorio_cache)
+
+        def ao_terminar(futuro):
+            resposta = {'id': requisicao.get('id'), 'acao': requisicao.get('acao')}
+            try:
+                resposta.update(futuro.result())
+                resposta['ok'] = True
+            except Exception as erro:
+                resposta['ok'] = False
+                resposta['erro'] = str(erro)
+            resposta['tempo'] = time.time() - inicio
+            self.responde(resposta)
+
+        futuro.add_done_callback(ao_terminar)
+
+
+def main():
+    argumentos = argparse.ArgumentParser()
+    argumentos.add_argument('--file', action='store', dest='arquivo',
+                        default='', required=False,
+                        help='Arquivo de extensão .xlxs ou .jsonl, ou diretório com arquivos .csv, com os dados da '
+                             'escola. Obrigatório, exceto com --limpar-cache.')
+
+    argumentos.add_argument('--batch', action='store', dest='lote',
+                        default='', required=False,
+                        help='Diretório com arquivos .xlsx, ou padrão glob, com várias escolas a serem resolvidas em '
+                             'paralelo, com --jobs processos. Substitui o --file.')
+
+    argumentos.add_argument('--district', action='store', dest='distrito',
+                        default='', required=False,
+                        help='Diretório com arquivos .xlsx, ou padrão glob, com as escolas de um distrito, resolvidas '
+                             'em conjunto para que os professores compartilhados (identificados pelo nome) não tenham '
+                             'conflitos entre escolas. Os arquivos são gerados por escola em --diretorio-saida. '
+                             'Substitui o --file.')
+
+    argumentos.add_argument('--serve', action='store_true', dest='servico',
+                        help='Modo serviço: lê requisições JSON, uma por linha, da entrada padrão e escreve as '
+                             'respostas na saída padrão, mantendo as instâncias em memória entre as requisições. As '
+                             'escolas são distribuídas entre --jobs processos.')
+
+    argumentos.add_argument('--diretorio-saida', action='store', dest='diretorio_saida',
+                        default='.', required=False,
+                        help='Diretório dos arquivos gerados nos modos em lote e distrito, cujos nomes são o nome da '
+                             'escola seguido do nome informado em cada opção de geração de arquivo.')
+
+    argumentos.add_argument('--aulas-sequenciais', action='store', dest='aulas_sequenciais',
+                        default='N', choices=['S', 'N', 'B'], required=False,
+                        help='[S/N/B] Opção de priorizar aulas sequencias. B para colorir as aulas da mesma matéria '
+                             'e turma em blocos de duas aulas seguidas.')
+
+    argumentos.add_argument('--gerar-horarios-turmas', action='store', dest='horario_turma',
+                        default=False, required=False,
+                        help='Nome do desejado para o arquivo gerado com os horários de aula por turmas.')
+
+    argumentos.add_argument('--gerar-horarios-professores', action='store', dest='horario_professor',
+                        default=False, required=False,
+                        help='Nome do desejado para o arquivo gerado com os horários de aula por professores.')
+
+    argumentos.add_argument('--gerar-solucao', action='store', dest='solucao',
+                        default=False, required=False,
+                        help='Nome do arquivo (.csv ou .jsonl) gerado com o horário de cada aula.')
+
+    argumentos.add_argument('--starts', action='store', dest='inicios', type=int,
+                        default=1, required=False,
+                        help='Quantidade de execuções do algoritmo com desempates aleatórios. A melhor é mantida.')
+
+    argumentos.add_argument('--jobs', action='store', dest='processos', type=int,
+                        default=1, required=False,
+                        help='Quantidade de processos utilizados para as execuções do algoritmo, para as componentes '
+                             'independentes do grafo (com uma única execução), ou para as escolas do modo em lote.')
+
+    argumentos.add_argument('--warm-start', action='store', dest='solucao_anterior',
+                        default=False, required=False,
+                        help='Solução anterior (arquivo gerado com --gerar-solucao ou com --gerar-horarios-turmas) '
+                             'usada como ponto de partida. As aulas que continuam válidas são mantidas e apenas as '
+                             'demais são coloridas novamente.')
+
+    argumentos.add_argument('--time-limit', action='store', dest='limite_tempo', type=float,
+                        default=0, required=False,
+                        help='Tempo, em segundos, da busca tabu executada após a coloração para reduzir as aulas sem '
+                             'horário e as penalidades das restrições desejáveis. 0 para não executar.')
+
+    argumentos.add_argument('--verify', action='store_true', dest='verificar',
+                        help='Verifica a solução final (restrições R1 a R4 e penalidades R5 a R7) e termina com código '
+                             'de saída 1 caso alguma restrição obrigatória seja violada. No modo em lote, a quantidade '
+                             'de violações de cada escola é exibida na tabela.')
+
+    argumentos.add_argument('--profile', action='store', dest='perfil',
+                        default=False, required=False,
+                        help='Nome do arquivo .json gerado com o tempo de cada etapa e os contadores das operações '
+                             'mais executadas. No modo em lote, é gerado um arquivo por escola em --diretorio-saida.')
+
+    argumentos.add_argument('--cprofile', action='store', dest='cprofile',
+                        default=False, required=False,
+                        help='Nome do arquivo gerado com as estatísticas do cProfile, para leitura com o módulo '
+                             'pstats. No modo em lote, é gerado um arquivo por escola em --diretorio-saida.')
+
+    argumentos.add_argument('--diretorio-cache', action='store', dest='diretorio_cache',
+                        default=DIRETORIO_CACHE, required=False,
+                        help='Diretório do cache de instâncias já lidas.')
+
+    argumentos.add_argument('--sem-cache', action='store_true', dest='sem_cache',
+                        help='Lê a planilha sem consultar nem atualizar o cache.')
+
+    argumentos.add_argument('--limpar-cache', action='store_true', dest='limpar_cache',
+                        help='Remove todos os arquivos do cache antes da execução.')
 
     args = argumentos.parse_args()
+    if not args.arquivo and not args.lote and not args.distrito and not args.servico and not args.limpar_cache:
+        argumentos.error('o argumento --file, --batch, --district ou --serve é obrigatório.')
+    if args.distrito and args.solucao_anterior:
+        argumentos.error('o argumento --warm-start não pode ser utilizado com --district.')
+    if args.lote and args.solucao_anterior:
+        argumentos.error('o argumento --warm-start não pode ser utilizado com --batch.')
+    if args.solucao_anterior and (args.inicios != 1 or args.processos != 1):
+        # O início a quente é uma única coloração, feita no processo principal.
+        argumentos.error('os argumentos --starts e --jobs não podem ser utilizados com --warm-start.')
     arquivo = args.arquivo
-    aulas_sequenciais = True if args.aulas_sequenciais == 'S' else False
+    aulas_sequenciais = MODOS_AULAS_SEQUENCIAIS[args.aulas_sequenciais]
     horario_turma = args.horario_turma
     horario_professor = args.horario_professor
+    diretorio_cache = None if args.sem_cache else args.diretorio_cache
 
-    if not path.exists(arquivo):
+    if args.limpar_cache:
+        print('Arquivos removidos do cache:', HorarioDeAulas.limpa_cache(args.diretorio_cache))
+        if not arquivo and not args.lote and not args.distrito and not args.servico:
+            return
+
+    if args.servico:
+        Servico(args.processos, diretorio_cache).atende(sys.stdin)
+        return
+
+    if args.distrito:
+        arquivo = arquivos_lote(args.distrito)
+        if len(arquivo) == 0:
+            print("Nenhum arquivo encontrado.")
+            return
+        if not path.isdir(args.diretorio_saida):
+            os.makedirs(args.diretorio_saida)
+
+    if args.lote:
+        arquivos = arquivos_lote(args.lote)
+        if len(arquivos) == 0:
+            print("Nenhum arquivo encontrado.")
+            return
+        if not path.isdir(args.diretorio_saida):
+            os.makedirs(args.diretorio_saida)
+
+        tempo_1 = time.time()
+        resumos = resolve_lote(arquivos, args.processos, prioridade_aula_sequencial=aulas_sequenciais,
+                               diretorio_cache=diretorio_cache, inicios=args.inicios, limite_tempo=args.limite_tempo,
+                               diretorio_saida=args.diretorio_saida, horario_turma=horario_turma,
+                               horario_professor=horario_professor, solucao=args.solucao, verificar=args.verificar,
+                               arquivo_perfil=args.perfil, arquivo_cprofile=args.cprofile)
+        tempo_2 = time.time()
+
+        imprime_resumo_lote(resumos)
+        print('Tempo de execução:', tempo_2-tempo_1)
+        if any(resumo.get('violacoes', 0) > 0 for resumo in resumos):
+            raise SystemExit(1)
+    elif not args.distrito and not path.exists(arquivo):
         print("Arquivo não encontrado.")
     else:
-        horarios_de_aula = HorarioDeAulas(arquivo, prioridade_aula_sequencial=aulas_sequenciais)
+        perfil = Perfil() if args.perfil else None
+        perfilador = cProfile.Profile() if args.cprofile else None
+        if perfilador is not None:
+            perfilador.enable()
+
         tempo_1 = time.time()
-        vertices_sem_horario = horarios_de_aula.dsatur_com_heristica()
+        movidas = None
+        if args.solucao_anterior:
+            horarios_de_aula = HorarioDeAulas(arquivo, prioridade_aula_sequencial=aulas_sequenciais,
+                                              diretorio_cache=diretorio_cache, perfil=perfil)
+            movidas = horarios_de_aula.recolore(horarios_de_aula.le_solucao_anterior(args.solucao_anterior))
+        else:
+            horarios_de_aula = multiplos_inicios(arquivo, prioridade_aula_sequencial=aulas_sequenciais,
+                                                 diretorio_cache=diretorio_cache, inicios=args.inicios,
+                                                 processos=args.processos, perfil=perfil)
+        curva = horarios_de_aula.busca_tabu(args.limite_tempo, semente=0) if args.limite_tempo > 0 else []
         tempo_2 = time.time()
+        verificacao = horarios_de_aula.verifica() if args.verificar else None
+
+        if args.distrito:
+            horarios_de_aula.gerar_arquivos(args.diretorio_saida, horario_turma, horario_professor, args.solucao)
+        else:
+            if(horario_turma or horario_professor):
+                horarios_de_aula.gerar_horarios(horario_turma, horario_professor)
+
+            if(args.solucao):
+                horarios_de_aula.gerar_solucao(args.solucao)
 
-        if(horario_turma):
-            horarios_de_aula.gerar_horarios_por_turma(horario_turma)
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(args.cprofile)
 
-        if(horario_professor):
-            horarios_de_aula.gerar_horarios_por_professor(horario_professor)
+        if perfil is not None:
+            perfil.salva(args.perfil)
 
         horarios_de_aula.imprimir_resultados()
+        if movidas is not None:
+            print('\nAulas que mudaram de horário em relação à solução anterior:', movidas)
+        if len(curva) > 0:
+            print('\nBusca tabu (tempo, aulas sem horário, penalidade):')
+            for tempo, nao_alocadas, penalidade in curva:
+                print('  %.3f s: %d, %d' % (tempo, nao_alocadas, penalidade))
+        if verificacao is not None:
+            horarios_de_aula.imprimir_verificacao(verificacao)
         print('Tempo de execução:', tempo_2-tempo_1)
+        if verificacao is not None and len(verificacao['violacoes']) > 0:
+            raise SystemExit(1)
 
 if __name__ == '__main__':
     main()
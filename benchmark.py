@@ -0,0 +1,323 @@
+"""
+Benchmark do algoritmo de horários de aula.
+
+Executa as instâncias reais da pasta instancias e escolas sintéticas geradas a partir de uma semente, medindo o tempo de
+cada fase (leitura da planilha, coloração e exportação), o pico de memória, a quantidade de cores utilizadas e a
+quantidade de aulas sem horário. Os resultados são comparados com os ótimos conhecidos de cores, que alocam todas as
+aulas, e, opcionalmente, com uma referência salva anteriormente na mesma máquina. Qualquer regressão além da
+tolerância encerra o programa com código de saída 1.
+
+Cada instância é executada em um processo novo, para que o pico de memória medido seja apenas o da instância.
+"""
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from os import path
+
+from openpyxl import Workbook
+
+from HorarioDeAulas import HorarioDeAulas, Perfil
+
+DIRETORIO_INSTANCIAS = path.join(path.dirname(path.abspath(__file__)), 'instancias')
+
+# Quantidade ótima de cores das instâncias reais (instancias/README.txt). None quando não é conhecida.
+INSTANCIAS_REAIS = {
+    'Escola_A.xlsx': 30,
+    'Escola_B.xlsx': 25,
+    'Escola_C.xlsx': 21,
+    'Escola_D.xlsx': 25,
+    'exemplinho.xlsx': None,
+}
+
+FASES = ('carga', 'coloracao', 'exportacao')
+
+DIAS = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta']
+
+# Quantidade de horários da semana nas escolas sintéticas, com o número padrão de aulas por dia.
+AULAS_SEMANA = len(DIAS) * 6
+
+
+def gera_escola(caminho, turmas, professores, aulas_semanais, densidade_restricoes=0.05, aulas_por_dia=6,
+                semente=0):
+    """
+    Gera a planilha de uma escola sintética, no mesmo formato das instâncias reais.
+
+    Cada turma recebe aulas_semanais aulas, divididas em matérias de 2 a 5 aulas. Cada matéria é atribuída ao professor
+    com menos aulas dentre alguns sorteados, o que distribui a carga entre os professores. Cada professor e cada turma
+    recebe como restrição uma fração densidade_restricoes dos horários, e cada professor recebe algumas preferências.
+
+    Args:
+        caminho (str): Caminho da planilha gerada.
+        turmas (int): Quantidade de turmas.
+        professores (int): Quantidade de professores.
+        aulas_semanais (int): Quantidade de aulas semanais de cada turma.
+        densidade_restricoes (float): Fração dos horários restritos de cada professor e de cada turma.
+        aulas_por_dia (int): Quantidade de aulas por dia.
+        semente (int): Semente do gerador, para que a mesma escola seja gerada sempre.
+    """
+    aleatorio = random.Random(semente)
+    horas = [datetime.time(7 + hora, 0) for hora in range(aulas_por_dia)]
+    horarios = [(hora, dia) for dia in DIAS for hora in horas]
+    carga = [0] * professores
+
+    planilha = Workbook(write_only=True)
+
+    dados = planilha.create_sheet('Dados')
+    dados.append(['Matéria:', 'Turma:', 'Professor:', 'Quantidade de Aulas:'])
+    for turma in range(turmas):
+        restantes = aulas_semanais
+        materia = 0
+        while restantes > 0:
+            quantidade = min(restantes, aleatorio.randint(2, 5))
+            professor = min(aleatorio.sample(range(professores), min(3, professores)), key=lambda p: carga[p])
+            carga[professor] += quantidade
+            dados.append(['Matéria %d' % materia, 'Turma %d' % turma, 'Professor %d' % professor, quantidade])
+            restantes -= quantidade
+            materia += 1
+
+    configuracoes = planilha.create_sheet('Configuracoes')
+    configuracoes.append(['Horários de início das aulas:'])
+    for hora in horas:
+        configuracoes.append([hora])
+
+    quantidade_restricoes = int(round(densidade_restricoes * len(horarios)))
+
+    restricoes_professores = planilha.create_sheet('Restricao')
+    restricoes_professores.append(['Professor:', 'Horário:', 'Dia:'])
+    for professor in range(professores):
+        for hora, dia in aleatorio.sample(horarios, quantidade_restricoes):
+            restricoes_professores.append(['Professor %d' % professor, hora, dia])
+
+    restricoes_turmas = planilha.create_sheet('Restricoes Turma')
+    restricoes_turmas.append(['Turma:', 'Horário:', 'Dia:'])
+    for turma in range(turmas):
+        for hora, dia in aleatorio.sample(horarios, quantidade_restricoes):
+            restricoes_turmas.append(['Turma %d' % turma, hora, dia])
+
+    preferencias = planilha.create_sheet('Preferencias')
+    preferencias.append(['Professor:', 'Horário:', 'Dia:'])
+    for professor in range(professores):
+        for hora, dia in aleatorio.sample(horarios, aleatorio.randint(0, 3)):
+            preferencias.append(['Professor %d' % professor, hora, dia])
+
+    planilha.save(caminho)
+
+
+def mede_instancia(arquivo, prioridade_aula_sequencial=False):
+    """
+    Executa uma instância e mede o tempo de cada fase. Deve ser executada em um processo novo, já que o pico de memória
+    é o do processo todo.
+
+    Args:
+        arquivo (str): Caminho da instância.
+        prioridade_aula_sequencial (bool): Opção de priorizar aulas sequenciais.
+
+    Returns:
+        (dict): Tempos de cada fase, tempos e contadores detalhados do Perfil, pico de memória (em MiB), cores
+        utilizadas, aulas sem horário e proporção de preferências atendidas.
+    """
+    tempos = dict()
+    perfil = Perfil()
+
+    inicio = time.perf_counter()
+    horarios_de_aula = HorarioDeAulas(arquivo, prioridade_aula_sequencial=prioridade_aula_sequencial, perfil=perfil)
+    tempos['carga'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    horarios_de_aula.colore_componentes()
+    tempos['coloracao'] = time.perf_counter() - inicio
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        horarios_de_aula.gerar_horarios(path.join(diretorio, 'turmas.xlsx'), path.join(diretorio, 'professores.xlsx'))
+        tempos['exportacao'] = time.perf_counter() - inicio
+
+    return {
+        'tempos': tempos,
+        'perfil': perfil.como_dicionario(),
+        'memoria': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'cores': horarios_de_aula.quantidade_horarios_utilizados(),
+        'sem_horario': horarios_de_aula.quantidade_vertices_sem_horario,
+        'preferencias': -horarios_de_aula.qualidade()[2],
+    }
+
+
+def executa_isolado(arquivo, prioridade_aula_sequencial=False):
+    """
+    Executa mede_instancia() em um processo novo.
+
+    Args:
+        arquivo (str): Caminho da instância.
+        prioridade_aula_sequencial (bool): Opção de priorizar aulas sequenciais.
+
+    Returns:
+        (dict): Resultado de mede_instancia().
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as processo:
+        return processo.apply(mede_instancia, (arquivo, prioridade_aula_sequencial))
+
+
+def compara(nome, resultado, otimo, referencia, tolerancia, tempo_minimo):
+    """
+    Compara o resultado de uma instância com o ótimo de cores e com a referência. Os ótimos conhecidos são de
+    colorações completas, então uma instância com ótimo conhecido também não pode ter aulas sem horário.
+
+    Tempos abaixo de tempo_minimo segundos não são comparados, já que nesses casos a variação entre execuções é maior
+    que a tolerância.
+
+    Args:
+        nome (str): Nome da instância.
+        resultado (dict): Resultado de mede_instancia().
+        otimo (int|None): Quantidade ótima de cores, ou None se não for conhecida.
+        referencia (dict|None): Resultado de referência da instância, ou None se não houver.
+        tolerancia (float): Aumento relativo máximo de tempo e de memória em relação à referência.
+        tempo_minimo (float): Tempo mínimo, em segundos, para que a fase seja comparada.
+
+    Returns:
+        (list of str): Descrição das regressões encontradas.
+    """
+    regressoes = []
+    if otimo is not None and resultado['cores'] > otimo:
+        regressoes.append('%s: %d cores, ótimo %d' % (nome, resultado['cores'], otimo))
+    if otimo is not None and resultado['sem_horario'] > 0:
+        regressoes.append('%s: %d aulas sem horário, o ótimo de %d cores aloca todas'
+                          % (nome, resultado['sem_horario'], otimo))
+
+    if referencia is None:
+        return regressoes
+
+    if resultado['sem_horario'] > referencia['sem_horario']:
+        regressoes.append('%s: %d aulas sem horário, referência %d'
+                          % (nome, resultado['sem_horario'], referencia['sem_horario']))
+    if resultado['cores'] > referencia['cores']:
+        regressoes.append('%s: %d cores, referência %d' % (nome, resultado['cores'], referencia['cores']))
+
+    for fase in FASES:
+        tempo = resultado['tempos'][fase]
+        tempo_referencia = referencia['tempos'][fase]
+        if tempo >= tempo_minimo and tempo > tempo_referencia * (1 + tolerancia):
+            regressoes.append('%s: %s levou %.3f s, referência %.3f s' % (nome, fase, tempo, tempo_referencia))
+
+    if resultado['memoria'] > referencia['memoria'] * (1 + tolerancia):
+        regressoes.append('%s: pico de memória de %.1f MiB, referência %.1f MiB'
+                          % (nome, resultado['memoria'], referencia['memoria']))
+    return regressoes
+
+
+def imprime_tabela(resultados):
+    """
+    Imprime uma tabela com os resultados de todas as instâncias.
+
+    Args:
+        resultados (dict of str: dict): Resultado de mede_instancia() de cada instância.
+    """
+    largura = max([len(nome) for nome in resultados] + [9])
+    print('%-*s %9s %9s %9s %9s %5s %11s %11s' % (largura, 'Instância', 'Carga', 'Coloração', 'Exportar', 'Memória',
+                                                 'Cores', 'Sem horário', 'Preferência'))
+    for nome, resultado in resultados.items():
+        tempos = resultado['tempos']
+        print('%-*s %8.3fs %8.3fs %8.3fs %6.1fMiB %5d %11d %11.3f'
+              % (largura, nome, tempos['carga'], tempos['coloracao'], tempos['exportacao'], resultado['memoria'],
+                 resultado['cores'], resultado['sem_horario'], resultado['preferencias']))
+
+
+def main():
+    argumentos = argparse.ArgumentParser()
+    argumentos.add_argument('--sinteticas', action='store', dest='sinteticas',
+                        default='50,200', required=False,
+                        help='Quantidades de turmas das escolas sintéticas, separadas por vírgula. Vazio para não '
+                             'gerar escolas sintéticas.')
+
+    argumentos.add_argument('--aulas-semanais', action='store', dest='aulas_semanais', type=int,
+                        default=25, required=False,
+                        help='Quantidade de aulas semanais de cada turma nas escolas sintéticas.')
+
+    argumentos.add_argument('--carga-professores', action='store', dest='carga_professores', type=float,
+                        default=0.8, required=False,
+                        help='Fração média dos horários da semana ocupada por cada professor nas escolas sintéticas. '
+                             'Define a quantidade de professores.')
+
+    argumentos.add_argument('--densidade-restricoes', action='store', dest='densidade_restricoes', type=float,
+                        default=0.05, required=False,
+                        help='Fração dos horários restritos de cada professor e turma nas escolas sintéticas.')
+
+    argumentos.add_argument('--semente', action='store', dest='semente', type=int,
+                        default=0, required=False,
+                        help='Semente do gerador de escolas sintéticas.')
+
+    argumentos.add_argument('--aulas-sequenciais', action='store', dest='aulas_sequenciais',
+                        default='N', choices=['S', 'N'], required=False,
+                        help='[S/N] Opção de priorizar aulas sequencias.')
+
+    argumentos.add_argument('--referencia', action='store', dest='referencia',
+                        default='benchmark_referencia.json', required=False,
+                        help='Arquivo JSON com os resultados de referência.')
+
+    argumentos.add_argument('--salvar-referencia', action='store_true', dest='salvar_referencia',
+                        help='Salva os resultados desta execução como referência, em vez de compará-los.')
+
+    argumentos.add_argument('--tolerancia', action='store', dest='tolerancia', type=float,
+                        default=0.25, required=False,
+                        help='Aumento relativo máximo de tempo e de memória em relação à referência.')
+
+    argumentos.add_argument('--tempo-minimo', action='store', dest='tempo_minimo', type=float,
+                        default=0.5, required=False,
+                        help='Tempo mínimo, em segundos, para que uma fase seja comparada com a referência.')
+
+    args = argumentos.parse_args()
+    aulas_sequenciais = True if args.aulas_sequenciais == 'S' else False
+
+    instancias = dict()
+    otimos = dict()
+    for nome, otimo in INSTANCIAS_REAIS.items():
+        instancias[nome] = path.join(DIRETORIO_INSTANCIAS, nome)
+        otimos[nome] = otimo
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for turmas in [int(turmas) for turmas in args.sinteticas.split(',') if turmas.strip()]:
+            nome = 'Sintetica_%d.xlsx' % turmas
+            instancias[nome] = path.join(diretorio, nome)
+            otimos[nome] = None
+            professores = int(math.ceil(turmas * args.aulas_semanais / (args.carga_professores * AULAS_SEMANA)))
+            gera_escola(instancias[nome], turmas, professores, args.aulas_semanais, args.densidade_restricoes,
+                        semente=args.semente)
+
+        resultados = dict()
+        for nome, arquivo in instancias.items():
+            resultados[nome] = executa_isolado(arquivo, aulas_sequenciais)
+
+    imprime_tabela(resultados)
+
+    if args.salvar_referencia:
+        with open(args.referencia, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print('\nReferência salva em', args.referencia)
+        return
+
+    referencias = dict()
+    if path.exists(args.referencia):
+        with open(args.referencia, encoding='utf-8') as arquivo:
+            referencias = json.load(arquivo)
+
+    regressoes = []
+    for nome, resultado in resultados.items():
+        regressoes += compara(nome, resultado, otimos[nome], referencias.get(nome), args.tolerancia,
+                              args.tempo_minimo)
+
+    if len(regressoes) > 0:
+        print('\nRegressões encontradas:')
+        for regressao in regressoes:
+            print('-', regressao)
+        sys.exit(1)
+    print('\nNenhuma regressão encontrada.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,459 @@
+"""
+Testes do HorarioDeAulas sobre as instâncias do diretório instancias, lidas também dos formatos .csv e .jsonl.
+
+Execute com: python -m pytest -q
+"""
+import collections
+import csv
+import functools
+import io
+import json
+import os
+import random
+
+import pytest
+from openpyxl import load_workbook
+
+from HorarioDeAulas import (AULAS_EM_BLOCOS, INSTANCIAS_SERVICO, BuscaTabu, Distrito, HorarioDeAulas, Perfil,
+                            Servico, atende_requisicao, resolve_escola)
+
+DIRETORIO_INSTANCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instancias')
+INSTANCIAS = ['exemplinho.xlsx', 'Escola_A.xlsx']
+
+
+def instancia_colorida(nome):
+    """
+    Lê uma instância do diretório instancias e a colore com o dsatur_com_heristica().
+
+    Args:
+        nome (str): Nome do arquivo da instância.
+
+    Returns:
+        (HorarioDeAulas): Instância colorida.
+    """
+    horarios_de_aula = HorarioDeAulas(os.path.join(DIRETORIO_INSTANCIAS, nome))
+    horarios_de_aula.dsatur_com_heristica()
+    return horarios_de_aula
+
+
+@pytest.fixture(params=INSTANCIAS)
+def horarios_de_aula(request):
+    """
+    Instância lida e colorida pelo dsatur_com_heristica().
+    """
+    return instancia_colorida(request.param)
+
+
+def converte_instancia(nome, destino):
+    """
+    Converte uma instância .xlsx do diretório instancias para um diretório com os arquivos .csv e para um arquivo
+    .jsonl, com as mesmas planilhas.
+
+    Args:
+        nome (str): Nome do arquivo da instância.
+        destino (str): Diretório onde as instâncias convertidas são gravadas.
+
+    Returns:
+        tuple of (str, str): Caminho do diretório com os arquivos .csv e do arquivo .jsonl.
+    """
+    base = os.path.join(destino, os.path.splitext(nome)[0])
+    os.makedirs(base, exist_ok=True)
+    planilha = load_workbook(os.path.join(DIRETORIO_INSTANCIAS, nome), read_only=True)
+    with open(base + '.jsonl', 'w', encoding='utf-8') as jsonl:
+        for folha in planilha.worksheets:
+            linhas = [[valor if valor is None or isinstance(valor, (int, float)) else str(valor) for valor in linha]
+                      for linha in folha.iter_rows(values_only=True)]
+            with open(os.path.join(base, folha.title + '.csv'), 'w', newline='', encoding='utf-8') as arquivo:
+                csv.writer(arquivo).writerows([['' if valor is None else valor for valor in linha]
+                                               for linha in linhas])
+            for linha in linhas[1:]:
+                jsonl.write(json.dumps({'planilha': folha.title, 'valores': linha}, ensure_ascii=False) + '\n')
+    planilha.close()
+    return base, base + '.jsonl'
+
+
+@pytest.mark.parametrize('nome', ['exemplinho.xlsx', 'Escola_A.xlsx', 'Escola_D.xlsx'])
+def test_formatos_de_entrada_geram_a_mesma_coloracao(tmp_path, nome):
+    diretorio, jsonl = converte_instancia(nome, str(tmp_path))
+    coloracoes = dict()
+    for arquivo, formato in ((os.path.join(DIRETORIO_INSTANCIAS, nome), 'xlsx'), (diretorio, 'csv'), (jsonl, 'jsonl')):
+        horarios_de_aula = HorarioDeAulas(arquivo)
+        assert horarios_de_aula.formato == formato
+        horarios_de_aula.dsatur_com_heristica()
+        coloracoes[formato] = horarios_de_aula.solucao.horario.tolist()
+
+    assert coloracoes['csv'] == coloracoes['xlsx']
+    assert coloracoes['jsonl'] == coloracoes['xlsx']
+
+
+@pytest.mark.parametrize('extensao', ['.csv', '.jsonl'])
+def test_solucao_gerada_pode_ser_lida_novamente(tmp_path, horarios_de_aula, extensao):
+    arquivo_solucao = os.path.join(str(tmp_path), 'solucao' + extensao)
+    horarios_de_aula.gerar_solucao(arquivo_solucao)
+
+    assert horarios_de_aula.le_solucao_anterior(arquivo_solucao) == horarios_de_aula.solucao.horario.tolist()
+
+
+@pytest.mark.parametrize('conteudo', [b'', b'nao e um arquivo npz', b'PK\x03\x04truncado'])
+def test_cache_invalido_e_descartado(tmp_path, conteudo):
+    arquivo = os.path.join(DIRETORIO_INSTANCIAS, 'Escola_A.xlsx')
+    diretorio_cache = str(tmp_path)
+    horarios_de_aula = HorarioDeAulas(arquivo, diretorio_cache=diretorio_cache)
+    horarios_de_aula.dsatur_com_heristica()
+    esperado = horarios_de_aula.solucao.horario.tolist()
+    arquivo_cache = horarios_de_aula.arquivo_cache(diretorio_cache)
+    with open(arquivo_cache, 'wb') as cache:
+        cache.write(conteudo)
+
+    perfil = Perfil()
+    horarios_de_aula = HorarioDeAulas(arquivo, diretorio_cache=diretorio_cache, perfil=perfil)
+    horarios_de_aula.dsatur_com_heristica()
+    assert perfil.contadores.get('cache_invalido') == 1
+    assert 'abre_planilha' in perfil.tempos
+    assert horarios_de_aula.solucao.horario.tolist() == esperado
+
+    # A planilha lida novamente é salva no cache, que volta a ser utilizado na leitura seguinte.
+    perfil = Perfil()
+    horarios_de_aula = HorarioDeAulas(arquivo, diretorio_cache=diretorio_cache, perfil=perfil)
+    horarios_de_aula.dsatur_com_heristica()
+    assert 'cache_invalido' not in perfil.contadores
+    assert 'carrega_cache' in perfil.tempos and 'abre_planilha' not in perfil.tempos
+    assert horarios_de_aula.solucao.horario.tolist() == esperado
+
+
+@pytest.mark.parametrize('nome', ['exemplinho.xlsx', 'Escola_A.xlsx', 'Escola_D.xlsx'])
+@pytest.mark.parametrize('prioridade_aula_sequencial', [False, True, AULAS_EM_BLOCOS])
+def test_limites_inferiores_nao_superam_a_solucao(nome, prioridade_aula_sequencial):
+    horarios_de_aula = HorarioDeAulas(os.path.join(DIRETORIO_INSTANCIAS, nome),
+                                      prioridade_aula_sequencial=prioridade_aula_sequencial)
+    horarios_de_aula.dsatur_com_heristica()
+    limites = horarios_de_aula.limites_inferiores()
+    verificacao = horarios_de_aula.verifica()
+
+    aulas_turma = collections.Counter(vertice.turma.nome for vertice in horarios_de_aula.vertices)
+    aulas_professor = collections.Counter(vertice.professor.nome for vertice in horarios_de_aula.vertices)
+
+    assert limites.maior_turma == max(aulas_turma.values())
+    assert limites.maior_professor == max(aulas_professor.values())
+    assert limites.sem_horario <= verificacao['sem_horario']
+    if verificacao['sem_horario'] == 0:
+        assert limites.cores <= cores_utilizadas(horarios_de_aula.solucao.horario.tolist())
+
+
+def test_distrito_professor_compartilhado_sem_conflito():
+    distrito = Distrito([os.path.join(DIRETORIO_INSTANCIAS, nome) for nome in ('Escola_A.xlsx', 'Escola_D.xlsx')])
+    distrito.dsatur_com_heristica()
+
+    escolas_professor = collections.defaultdict(set)
+    horarios_professor = collections.defaultdict(list)
+    for vertice in distrito.vertices:
+        escolas_professor[vertice.professor.nome].add(vertice.turma.nome.split('/')[0])
+        horario = distrito.solucao.horario[vertice.indice]
+        if horario >= 0:
+            horarios_professor[vertice.professor.nome].append(
+                (distrito.lista_de_horarios[horario].dia, distrito.lista_de_horarios[horario].hora))
+
+    assert len(distrito.vertices) == sum(len(escola.vertices) for escola in distrito.escolas)
+    assert any(len(escolas) > 1 for escolas in escolas_professor.values())
+    for horarios in horarios_professor.values():
+        assert len(horarios) == len(set(horarios))
+    assert distrito.verifica()['violacoes'] == []
+
+
+@pytest.mark.parametrize('nome', ['Escola_A.xlsx', 'Escola_D.xlsx'])
+def test_modo_de_blocos_agrupa_aulas_seguidas(nome):
+    arquivo = os.path.join(DIRETORIO_INSTANCIAS, nome)
+    sem_blocos = HorarioDeAulas(arquivo)
+    sem_blocos.dsatur_com_heristica()
+    em_blocos = HorarioDeAulas(arquivo, prioridade_aula_sequencial=AULAS_EM_BLOCOS)
+    em_blocos.dsatur_com_heristica()
+
+    assert aulas_em_bloco(em_blocos) > aulas_em_bloco(sem_blocos)
+    assert em_blocos.verifica()['violacoes'] == []
+
+
+def test_busca_tabu_nao_piora_solucao(horarios_de_aula):
+    antes = horarios_de_aula.verifica()
+    curva = horarios_de_aula.busca_tabu(0.5, semente=1)
+    depois = horarios_de_aula.verifica()
+
+    assert depois['violacoes'] == []
+    assert (depois['sem_horario'], depois['penalidade']) <= (antes['sem_horario'], antes['penalidade'])
+    assert curva[-1][1:] == (depois['sem_horario'], depois['penalidade'])
+
+
+def test_lote_verifica_cada_escola(tmp_path):
+    resumo = resolve_escola(os.path.join(DIRETORIO_INSTANCIAS, 'Escola_A.xlsx'), diretorio_saida=str(tmp_path),
+                            verificar=True)
+    assert resumo['violacoes'] == 0
+    assert 'violacoes' not in resolve_escola(os.path.join(DIRETORIO_INSTANCIAS, 'Escola_A.xlsx'),
+                                             diretorio_saida=str(tmp_path))
+
+
+def test_lote_gera_perfil_de_cada_escola(tmp_path):
+    resolve_escola(os.path.join(DIRETORIO_INSTANCIAS, 'exemplinho.xlsx'), diretorio_saida=str(tmp_path),
+                   arquivo_perfil='perfil.json', arquivo_cprofile='perfil.prof')
+    with open(os.path.join(str(tmp_path), 'exemplinho_perfil.json'), encoding='utf-8') as arquivo:
+        assert 'dsatur_com_heristica' in json.load(arquivo)['tempos']
+    assert os.path.getsize(os.path.join(str(tmp_path), 'exemplinho_perfil.prof')) > 0
+
+
+def violacao_injetada(horarios_de_aula, restricao):
+    """
+    Encontra um movimento de uma aula da solução atual que viola apenas uma restrição obrigatória.
+
+    Args:
+        horarios_de_aula (HorarioDeAulas): Instância colorida, sem violações.
+        restricao (str): Restrição a ser violada ('R1', 'R2', 'R3' ou 'R4').
+
+    Returns:
+        tuple of (int, int, list of int): Vértice movido, horário de destino e vértices da violação esperada.
+    """
+    vertices = horarios_de_aula.vertices
+    horario = horarios_de_aula.solucao.horario.tolist()
+    ocupante_turma = {(vertice.turma, horario[indice]): indice for indice, vertice in enumerate(vertices)}
+    ocupante_professor = {(vertice.professor, horario[indice]): indice for indice, vertice in enumerate(vertices)}
+
+    for indice, vertice in enumerate(vertices):
+        for destino in range(len(horarios_de_aula.lista_de_horarios)):
+            if horario[indice] < 0 or destino == horario[indice]:
+                continue
+            bit = 1 << destino
+            turma = ocupante_turma.get((vertice.turma, destino))
+            professor = ocupante_professor.get((vertice.professor, destino))
+            violadas = {
+                'R1': professor is not None,
+                'R2': turma is not None,
+                'R3': bool(vertice.turma.restricoes & bit),
+                'R4': bool(vertice.professor.restricoes & bit),
+            }
+            if violadas[restricao] and sum(violadas.values()) == 1:
+                outro = {'R1': professor, 'R2': turma}.get(restricao)
+                return indice, destino, sorted([indice] if outro is None else [indice, outro])
+    raise AssertionError('Nenhum movimento viola apenas {}.'.format(restricao))
+
+
+@pytest.mark.parametrize('restricao', ['R1', 'R2', 'R3', 'R4'])
+def test_verificador_encontra_violacao_injetada(restricao):
+    horarios_de_aula = instancia_colorida('Escola_A.xlsx')
+    assert horarios_de_aula.verifica()['violacoes'] == []
+
+    vertice, destino, envolvidos = violacao_injetada(horarios_de_aula, restricao)
+    horarios = horarios_de_aula.solucao.horario.tolist()
+    horarios[vertice] = destino
+    resultado = horarios_de_aula.verifica(horarios)
+
+    assert resultado['violacoes'] == [{'restricao': restricao, 'horario': destino, 'vertices': envolvidos}]
+
+
+def test_verificador_horario_inexistente_e_sem_horario(horarios_de_aula):
+    horarios = horarios_de_aula.solucao.horario.tolist()
+    quantidade_horarios = len(horarios_de_aula.lista_de_horarios)
+    sem_horario = horarios_de_aula.verifica(horarios)['sem_horario']
+    horarios[0] = quantidade_horarios
+    horarios[1] = -1
+    resultado = horarios_de_aula.verifica(horarios)
+
+    assert resultado['violacoes'] == [{'restricao': 'R3', 'horario': quantidade_horarios, 'vertices': [0]}]
+    assert resultado['sem_horario'] == sem_horario + (horarios_de_aula.solucao.horario[1] >= 0)
+
+
+def test_editor_movimentos_e_trocas_ida_e_volta(horarios_de_aula):
+    editor = horarios_de_aula.editor()
+    sorteio = random.Random(1)
+    original = list(editor.horario)
+    antes = horarios_de_aula.verifica(editor.horario)
+    aulas_turma = dict()
+    for vertice, turma in enumerate(editor.turma):
+        aulas_turma.setdefault(turma, []).append(vertice)
+
+    for _ in range(300):
+        vertice = sorteio.randrange(len(original))
+        # As trocas possíveis são, em geral, entre aulas da mesma turma.
+        outro = sorteio.choice(aulas_turma[editor.turma[vertice]])
+        livres = editor.horarios_livres(vertice)
+        horario = editor.horario[vertice]
+        if editor.pode_trocar(vertice, outro):
+            efeito = editor.troca(vertice, outro)
+            desfazer = functools.partial(editor.troca, vertice, outro)
+        elif livres and horario >= 0:
+            efeito = editor.move(vertice, sorteio.choice(livres))
+            desfazer = functools.partial(editor.move, vertice, horario)
+        else:
+            continue
+
+        depois = horarios_de_aula.verifica(editor.horario)
+        assert depois['violacoes'] == []
+        assert efeito['R5'] == depois['R5'] - antes['R5']
+        assert efeito['R6'] == depois['R6'] - antes['R6']
+        assert efeito['preferencias'] == antes['R7'] - depois['R7']
+        assert efeito['penalidade'] == depois['penalidade'] - antes['penalidade']
+        assert efeito['sem_horario'] == depois['sem_horario'] - antes['sem_horario']
+
+        volta = desfazer()
+        assert editor.horario == original
+        assert all(volta[chave] == -efeito[chave] for chave in efeito)
+        assert editor.penalidade() == antes['penalidade']
+
+
+def test_editor_recusa_movimento_invalido(horarios_de_aula):
+    editor = horarios_de_aula.editor()
+    vertice = next(vertice for vertice, horario in enumerate(editor.horario) if horario >= 0)
+    ocupado = editor.horario[vertice]
+    outro = next((outro for outro, horario in enumerate(editor.horario)
+                  if horario >= 0 and horario != ocupado and editor.turma[outro] == editor.turma[vertice]), None)
+
+    with pytest.raises(ValueError):
+        editor.move(vertice, editor.quantidade_horarios)
+    if outro is not None:
+        with pytest.raises(ValueError):
+            editor.move(vertice, editor.horario[outro])
+    assert editor.horario[vertice] == ocupado
+
+
+def cores_utilizadas(horarios):
+    """
+    Conta os horários utilizados por pelo menos uma aula.
+
+    Args:
+        horarios (list of int): Índice do horário de cada vértice, ou -1.
+
+    Returns:
+        (int): Quantidade de cores.
+    """
+    return len({horario for horario in horarios if horario >= 0})
+
+
+def aulas_em_bloco(horarios_de_aula):
+    """
+    Conta as aulas alocadas logo antes ou logo depois de outra aula da mesma matéria e turma, no mesmo dia.
+
+    Args:
+        horarios_de_aula (HorarioDeAulas): Instância colorida.
+
+    Returns:
+        (int): Quantidade de aulas em bloco.
+    """
+    horarios_aula = collections.defaultdict(set)
+    for vertice in horarios_de_aula.vertices:
+        horario = horarios_de_aula.solucao.horario[vertice.indice]
+        if horario >= 0:
+            horarios_aula[(vertice.turma.nome, vertice.materia)].add(int(horario))
+
+    aulas_por_dia = horarios_de_aula.aulas_por_dia
+    return sum(1 for horarios in horarios_aula.values() for horario in horarios
+               if (horario + 1 in horarios and (horario + 1) % aulas_por_dia != 0)
+               or (horario - 1 in horarios and horario % aulas_por_dia != 0))
+
+
+def test_variacao_igual_ao_recalculo_completo(horarios_de_aula):
+    busca = BuscaTabu(horarios_de_aula, pesos=(2, 3, 5))
+    sorteio = random.Random(2)
+    antes = horarios_de_aula.verifica(busca.horario)
+    cores_antes = cores_utilizadas(busca.horario)
+
+    for _ in range(100):
+        vertice = sorteio.randrange(len(busca.horario))
+        movimentos = list(busca.movimentos_insercao(vertice) if busca.horario[vertice] < 0
+                          else busca.movimentos_realocacao(vertice))
+        for _, alteracoes in movimentos:
+            variacao = busca.variacao(alteracoes)
+            avaliacao = busca.avalia(alteracoes)
+            desfazer = busca.altera(alteracoes)
+            depois = horarios_de_aula.verifica(busca.horario)
+
+            assert variacao == (depois['sem_horario'] - antes['sem_horario'], depois['R5'] - antes['R5'],
+                                depois['R6'] - antes['R6'], depois['R7'] - antes['R7'],
+                                cores_utilizadas(busca.horario) - cores_antes)
+            assert avaliacao == (depois['sem_horario'], 2 * depois['R5'] + 3 * depois['R6'] + 5 * depois['R7'])
+            busca.altera(desfazer)
+        if movimentos:
+            busca.altera(sorteio.choice(movimentos)[1])
+            antes = horarios_de_aula.verifica(busca.horario)
+            cores_antes = cores_utilizadas(busca.horario)
+
+
+@pytest.fixture
+def instancias_servico():
+    """
+    Esvazia as instâncias do modo serviço mantidas pelo processo antes e depois do teste.
+    """
+    INSTANCIAS_SERVICO.clear()
+    yield INSTANCIAS_SERVICO
+    INSTANCIAS_SERVICO.clear()
+
+
+def reescreve_csv(diretorio, planilha, substitui):
+    """
+    Reescreve o arquivo .csv de uma planilha, alterando a data de modificação e o conteúdo.
+
+    Args:
+        diretorio (str): Diretório da instância.
+        planilha (str): Nome da planilha.
+        substitui (callable): Função que recebe as linhas (sem o cabeçalho) e retorna as novas linhas.
+    """
+    nome_arquivo = os.path.join(diretorio, planilha + '.csv')
+    with open(nome_arquivo, newline='', encoding='utf-8') as arquivo:
+        cabecalho, *linhas = list(csv.reader(arquivo))
+    with open(nome_arquivo, 'w', newline='', encoding='utf-8') as arquivo:
+        csv.writer(arquivo).writerows([cabecalho] + substitui(linhas))
+    os.utime(nome_arquivo, ns=(os.stat(nome_arquivo).st_atime_ns, os.stat(nome_arquivo).st_mtime_ns + 10 ** 9))
+
+
+def test_servico_resolve_edita_e_rele_planilha(tmp_path, instancias_servico):
+    diretorio, _ = converte_instancia('exemplinho.xlsx', str(tmp_path))
+    resposta = atende_requisicao({'acao': 'resolve', 'arquivo': diretorio}, None)
+    assert resposta['sem_horario'] == 0 and 'movidas' not in resposta
+
+    horarios_de_aula = instancias_servico[diretorio]['horarios_de_aula']
+    restritos = dict()
+    for vertice, indice in zip(horarios_de_aula.vertices, horarios_de_aula.solucao.horario.tolist()):
+        horario = horarios_de_aula.lista_de_horarios[indice]
+        restritos.setdefault(vertice.professor.nome, {'tipo': 'professor', 'nome': vertice.professor.nome,
+                                                      'dia': horario.dia, 'hora': horario.hora})
+    resposta = atende_requisicao({'acao': 'edita', 'arquivo': diretorio, 'alteracoes': list(restritos.values())}, None)
+    assert resposta['sem_horario'] == 0 and resposta['movidas'] >= len(restritos)
+    assert atende_requisicao({'acao': 'verifica', 'arquivo': diretorio}, None)['verificacao']['violacoes'] == []
+
+    # A planilha muda e um dos professores editados deixa de existir.
+    removido, mantido = sorted(restritos)
+    reescreve_csv(diretorio, 'Dados', lambda linhas: [[linha[0], linha[1], 'Outro' if linha[2] == removido
+                                                       else linha[2], linha[3]] for linha in linhas])
+    resposta = atende_requisicao({'acao': 'resolve', 'arquivo': diretorio}, None)
+    assert resposta['edicoes_reaplicadas'] == 1
+    assert [descartada['alteracao']['nome'] for descartada in resposta['edicoes_descartadas']] == [removido]
+    assert resposta['sem_horario'] == 0 and 'movidas' in resposta
+
+    horarios_de_aula = instancias_servico[diretorio]['horarios_de_aula']
+    restrito = horarios_de_aula.encontra_horario(restritos[mantido]['dia'], restritos[mantido]['hora'])
+    assert horarios_de_aula.professores[mantido].restricoes & restrito.mascara
+    assert horarios_de_aula.verifica()['violacoes'] == []
+
+
+def test_servico_escola_sem_preferencias(tmp_path, instancias_servico):
+    diretorio, _ = converte_instancia('exemplinho.xlsx', str(tmp_path))
+    reescreve_csv(diretorio, 'Preferencias', lambda linhas: [])
+    requisicoes = [{'id': 1, 'acao': 'resolve', 'arquivo': diretorio, 'limite_tempo': 0.1},
+                   {'id': 2, 'acao': 'edita', 'arquivo': diretorio, 'alteracoes': []},
+                   {'id': 3, 'acao': 'verifica', 'arquivo': diretorio}]
+    saida = io.StringIO()
+    Servico(processos=1, saida=saida).atende([json.dumps(requisicao) for requisicao in requisicoes])
+
+    respostas = sorted((json.loads(linha) for linha in saida.getvalue().splitlines()), key=lambda r: r['id'])
+    assert [resposta['ok'] for resposta in respostas] == [True, True, True], respostas
+    assert all(resposta['preferencias'] == 1.0 and resposta['sem_horario'] == 0 for resposta in respostas)
+    assert respostas[2]['verificacao']['R7'] == 0
+
+
+@pytest.mark.parametrize('prioridade_aula_sequencial', [False, True, AULAS_EM_BLOCOS])
+def test_aula_sem_nenhum_horario_permitido(tmp_path, prioridade_aula_sequencial):
+    diretorio, _ = converte_instancia('exemplinho.xlsx', str(tmp_path))
+    horarios = HorarioDeAulas(diretorio).lista_de_horarios
+    reescreve_csv(diretorio, 'Restricao', lambda linhas: [['Pedro', horario.hora, horario.dia] for horario in horarios])
+
+    horarios_de_aula = HorarioDeAulas(diretorio, prioridade_aula_sequencial=prioridade_aula_sequencial)
+    nao_alocados = horarios_de_aula.dsatur_com_heristica()
+
+    assert sorted(vertice.professor.nome for vertice in nao_alocados) == ['Pedro', 'Pedro']
+    assert horarios_de_aula.limites_inferiores().sem_horario == 2
+    assert horarios_de_aula.verifica()['violacoes'] == []